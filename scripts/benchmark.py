@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+
+"""
+============================================================================
+Ski Resort Management System - Query Benchmark Harness (Python)
+COMP 345 Final Project
+Purpose: Time every workload query and view, and catch regressions
+
+Discovers the numbered queries in 07_queries.sql (by their "-- QUERY n:"
+headers) and every view in 03_views.sql. Each one is run with warm-up,
+then timed N times; EXPLAIN FORMAT=JSON and EXPLAIN ANALYZE are captured
+once per workload. Results go to a JSON file that `compare` diffs against
+a baseline, exiting non-zero when a workload got slower.
+
+Usage:
+    python3 scripts/benchmark.py run --iterations 20 --output after.json
+    python3 scripts/benchmark.py compare before.json after.json
+============================================================================
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+
+from mysql.connector import Error
+from tabulate import tabulate
+
+from db import Database
+from sql_objects import iter_object_definitions, parse_workload_queries
+
+
+# ANSI color codes
+class Colors:
+    RED = '\033[0;31m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    BLUE = '\033[0;34m'
+    NC = '\033[0m'
+
+
+# Configuration
+DB_CONFIG = {
+    'host': os.getenv('MYSQL_HOST', 'localhost'),
+    'port': int(os.getenv('MYSQL_PORT', '3306')),
+    'user': os.getenv('MYSQL_USER', 'root'),
+    'password': os.getenv('MYSQL_PASSWORD', ''),
+    'database': 'ski_resort'
+}
+
+SQL_DIR = Path(__file__).parent.parent / 'sql'
+
+# Every timed run reuses the same pooled session, so handshake and auth
+# costs stay out of the measurements
+DB = Database(DB_CONFIG, 'ski_resort_benchmark')
+
+RESULTS_VERSION = 1
+
+# name: "Q<n>" or the view name; kind: 'query' or 'view'
+Workload = namedtuple('Workload', ['name', 'kind', 'title', 'sql'])
+
+
+def print_header(message: str) -> None:
+    print(f"{Colors.BLUE}{'=' * 76}{Colors.NC}")
+    print(f"{Colors.BLUE}{message}{Colors.NC}")
+    print(f"{Colors.BLUE}{'=' * 76}{Colors.NC}")
+
+
+def print_success(message: str) -> None:
+    print(f"{Colors.GREEN}✓ {message}{Colors.NC}")
+
+
+def print_error(message: str) -> None:
+    print(f"{Colors.RED}✗ {message}{Colors.NC}")
+
+
+def print_info(message: str) -> None:
+    print(f"{Colors.YELLOW}ℹ {message}{Colors.NC}")
+
+
+# ---------------------------------------------------------------------------
+# Workload discovery
+# ---------------------------------------------------------------------------
+
+def discover_workloads(sql_dir: Path) -> list:
+    """Every numbered query in 07_queries.sql and every view in 03_views.sql."""
+    workloads = [
+        Workload(f"Q{q.number}", 'query', q.title, q.sql)
+        for q in parse_workload_queries(sql_dir / '07_queries.sql')
+    ]
+    workloads += [
+        Workload(obj.name, 'view', f"SELECT * FROM {obj.name}", f"SELECT * FROM {obj.name}")
+        for obj in iter_object_definitions(sql_dir / '03_views.sql')
+        if obj.object_type == 'VIEW'
+    ]
+    return workloads
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def timing_summary(samples_ms: list) -> dict:
+    ordered = sorted(samples_ms)
+    return {
+        'runs': len(ordered),
+        'min_ms': ordered[0],
+        'mean_ms': sum(ordered) / len(ordered),
+        'p50_ms': percentile(ordered, 50),
+        'p95_ms': percentile(ordered, 95),
+        'p99_ms': percentile(ordered, 99),
+        'max_ms': ordered[-1],
+    }
+
+
+def run_once(cursor, sql: str):
+    """Execute and fetch every row. Returns (elapsed ms, row count)."""
+    started = time.perf_counter()
+    cursor.execute(sql)
+    rows = len(cursor.fetchall())
+    elapsed = time.perf_counter() - started
+    DB.stats.add('query', elapsed)
+    return elapsed * 1000, rows
+
+
+def capture_plans(cursor, sql: str) -> dict:
+    """EXPLAIN FORMAT=JSON and EXPLAIN ANALYZE output (None if unsupported)."""
+    plans = {'explain_json': None, 'query_cost': None, 'explain_analyze': None}
+
+    try:
+        cursor.execute(f"EXPLAIN FORMAT=JSON {sql}")
+        plan = json.loads(cursor.fetchone()[0])
+        plans['explain_json'] = plan
+        cost = plan.get('query_block', {}).get('cost_info', {}).get('query_cost')
+        plans['query_cost'] = float(cost) if cost is not None else None
+    except (Error, ValueError) as e:
+        print_info(f"  EXPLAIN FORMAT=JSON unavailable: {e}")
+
+    try:
+        # Requires MySQL 8.0.18+
+        cursor.execute(f"EXPLAIN ANALYZE {sql}")
+        plans['explain_analyze'] = '\n'.join(row[0] for row in cursor.fetchall())
+    except Error as e:
+        print_info(f"  EXPLAIN ANALYZE unavailable: {e}")
+
+    return plans
+
+
+def benchmark_workload(cursor, workload: Workload, iterations: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        run_once(cursor, workload.sql)
+
+    samples = []
+    rows = 0
+    for _ in range(iterations):
+        elapsed, rows = run_once(cursor, workload.sql)
+        samples.append(elapsed)
+
+    result = {
+        'kind': workload.kind,
+        'title': workload.title,
+        'rows': rows,
+        'samples_ms': samples,
+    }
+    result.update(timing_summary(samples))
+    result.update(capture_plans(cursor, workload.sql))
+    return result
+
+
+def run_benchmark(args) -> int:
+    workloads = discover_workloads(args.sql_dir)
+    if args.only:
+        wanted = {name.strip() for name in args.only.split(',')}
+        workloads = [w for w in workloads if w.name in wanted]
+    if not workloads:
+        print_error("No workloads selected")
+        return 1
+
+    print_header("Query Benchmark (Ski Resort Management System)")
+    print_info(f"Database: {DB_CONFIG['database']} @ {DB_CONFIG['host']}:{DB_CONFIG['port']}")
+    print_info(f"{len(workloads)} workloads, {args.warmup} warm-up + {args.iterations} timed runs each")
+    print()
+
+    try:
+        connection = DB.checkout()
+        cursor = connection.cursor()
+        cursor.execute("SELECT VERSION()")
+        server_version = cursor.fetchone()[0]
+    except Error as e:
+        print_error(f"Cannot connect: {e}")
+        return 1
+
+    results = {}
+    rows = []
+    failed = 0
+
+    for workload in workloads:
+        print_info(f"{workload.name}: {workload.title}")
+        try:
+            result = benchmark_workload(cursor, workload, args.iterations, args.warmup)
+        except Error as e:
+            print_error(f"  {workload.name} failed: {e}")
+            failed += 1
+            continue
+        results[workload.name] = result
+        rows.append([
+            workload.name, result['rows'],
+            f"{result['p50_ms']:.2f}", f"{result['p95_ms']:.2f}", f"{result['p99_ms']:.2f}",
+            f"{result['query_cost']:.1f}" if result['query_cost'] is not None else '-',
+        ])
+
+    cursor.close()
+    connection.close()
+
+    print()
+    print(tabulate(rows, headers=['Workload', 'Rows', 'p50 ms', 'p95 ms', 'p99 ms', 'Cost'],
+                   tablefmt='grid'))
+    print()
+    print(tabulate(
+        [(kind, count, f"{total_ms:.1f}", f"{avg_ms:.2f}") for kind, count, total_ms, avg_ms
+         in DB.stats.rows()],
+        headers=['Connection', 'Count', 'Total ms', 'Avg ms'], tablefmt='grid'
+    ))
+
+    document = {
+        'version': RESULTS_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'server_version': server_version,
+        'database': DB_CONFIG['database'],
+        'iterations': args.iterations,
+        'warmup': args.warmup,
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+
+    print()
+    print_success(f"Results written to {args.output}")
+    return 1 if failed else 0
+
+
+# ---------------------------------------------------------------------------
+# Comparison
+# ---------------------------------------------------------------------------
+
+def compare_results(baseline: dict, current: dict, threshold: float, min_delta_ms: float):
+    """
+    Return (rows, regressions). A workload regresses when its p50 or p95
+    grew by more than threshold (a fraction) and by at least min_delta_ms.
+    """
+    rows = []
+    regressions = []
+
+    for name in sorted(set(baseline) | set(current), key=_workload_sort_key):
+        before, after = baseline.get(name), current.get(name)
+        if before is None or after is None:
+            rows.append([name, '-', '-', '-', 'new' if before is None else 'removed'])
+            continue
+
+        status = 'ok'
+        for metric in ('p50_ms', 'p95_ms'):
+            delta = after[metric] - before[metric]
+            if (before[metric] > 0 and delta / before[metric] > threshold
+                    and delta >= min_delta_ms):
+                status = 'REGRESSION'
+        if status == 'ok' and before.get('query_cost') and after.get('query_cost'):
+            if after['query_cost'] > before['query_cost'] * (1 + threshold):
+                status = 'cost up'
+
+        change = ((after['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100
+                  if before['p95_ms'] > 0 else 0.0)
+        rows.append([name, f"{before['p95_ms']:.2f}", f"{after['p95_ms']:.2f}",
+                     f"{change:+.1f}%", status])
+        if status == 'REGRESSION':
+            regressions.append(name)
+
+    return rows, regressions
+
+
+def _workload_sort_key(name: str):
+    # Q1..Q12 in numeric order, then views alphabetically
+    if name[:1] == 'Q' and name[1:].isdigit():
+        return (0, int(name[1:]), '')
+    return (1, 0, name)
+
+
+def run_compare(args) -> int:
+    try:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        with open(args.current, encoding='utf-8') as f:
+            current = json.load(f)
+    except (OSError, ValueError) as e:
+        print_error(f"Cannot read results: {e}")
+        return 2
+
+    print_header("Benchmark Comparison")
+    print_info(f"Baseline: {args.baseline} ({baseline.get('created_at')})")
+    print_info(f"Current:  {args.current} ({current.get('created_at')})")
+    print_info(f"Threshold: +{args.threshold * 100:.0f}% and +{args.min_delta_ms} ms")
+    print()
+
+    rows, regressions = compare_results(baseline['results'], current['results'],
+                                        args.threshold, args.min_delta_ms)
+    print(tabulate(rows, headers=['Workload', 'Base p95 ms', 'New p95 ms', 'Change', 'Status'],
+                   tablefmt='grid'))
+    print()
+
+    if regressions:
+        print_error(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print_success("No regressions")
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark workload queries and views")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run = subparsers.add_parser('run', help="Time every query and view")
+    run.add_argument('--iterations', type=int, default=20, metavar='N',
+                     help="Timed runs per workload (default: 20)")
+    run.add_argument('--warmup', type=int, default=3, metavar='N',
+                     help="Untimed runs before measuring (default: 3)")
+    run.add_argument('--only', metavar='NAMES',
+                     help="Comma-separated workloads to run, e.g. Q5,vw_customer_activity_masked")
+    run.add_argument('--output', type=Path, default=Path('benchmark_results.json'),
+                     metavar='PATH', help="Results file (default: benchmark_results.json)")
+    run.add_argument('--sql-dir', type=Path, default=SQL_DIR, help=argparse.SUPPRESS)
+
+    compare = subparsers.add_parser('compare', help="Flag regressions between two runs")
+    compare.add_argument('baseline', type=Path)
+    compare.add_argument('current', type=Path)
+    compare.add_argument('--threshold', type=float, default=0.20,
+                         help="Allowed p50/p95 slowdown as a fraction (default: 0.20)")
+    compare.add_argument('--min-delta-ms', type=float, default=1.0,
+                         help="Ignore slowdowns smaller than this (default: 1.0)")
+
+    args = parser.parse_args()
+    if args.command == 'run' and args.iterations < 1:
+        parser.error("--iterations must be at least 1")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    if args.command == 'run':
+        sys.exit(run_benchmark(args))
+    sys.exit(run_compare(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+"""
+============================================================================
+Ski Resort Management System - Shared Connection Layer (Python)
+COMP 345 Final Project
+Purpose: Pooled MySQL connections that keep their session between uses
+
+Opening a connection costs a TCP handshake plus authentication, which
+dwarfs a millisecond query. A Database opens its pool once and hands the
+same physical connections out again. Sessions are NOT reset on return, so
+settings such as the isolation level or SET profiling = 1 stay in effect
+across calls. Statements in session_sql run once per physical connection.
+Transactions do not carry over: connection() and query() roll back
+before returning the connection, so every use reads current data.
+
+Connect, checkout and query latencies are counted in Database.stats.
+============================================================================
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from mysql.connector import pooling
+
+
+class LatencyStats:
+    """Thread-safe counters for connect, checkout and query latency."""
+
+    KINDS = ('connect', 'checkout', 'query')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {kind: 0 for kind in self.KINDS}
+        self.seconds = {kind: 0.0 for kind in self.KINDS}
+
+    def add(self, kind, seconds, count=1):
+        with self._lock:
+            self.counts[kind] += count
+            self.seconds[kind] += seconds
+
+    def rows(self):
+        """[(kind, count, total ms, average ms)] for reporting."""
+        rows = []
+        for kind in self.KINDS:
+            count = self.counts[kind]
+            total_ms = self.seconds[kind] * 1000
+            rows.append((kind, count, total_ms, total_ms / count if count else 0.0))
+        return rows
+
+
+class Database:
+    """
+    A lazily created MySQLConnectionPool plus latency counters.
+
+    config is a mysql.connector config dict; extra keyword options (e.g.
+    allow_local_infile=True) are added to it. pool_size may be changed
+    until the first connection is requested.
+    """
+
+    def __init__(self, config, pool_name, pool_size=1, session_sql=(), **options):
+        self.config = dict(config, **options)
+        self.pool_name = pool_name
+        self.pool_size = pool_size
+        self.session_sql = list(session_sql)
+        self.stats = LatencyStats()
+        self._pool = None
+        self._lock = threading.Lock()
+        self._initialized = set()  # connection ids that ran session_sql
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                started = time.perf_counter()
+                self._pool = pooling.MySQLConnectionPool(
+                    pool_name=self.pool_name,
+                    pool_size=self.pool_size,
+                    pool_reset_session=False,
+                    **self.config
+                )
+                # The pool opens every connection up front
+                self.stats.add('connect', time.perf_counter() - started, self.pool_size)
+            return self._pool
+
+    def checkout(self, database=None):
+        """
+        Take a connection from the pool; close() returns it. When database
+        is given the connection selects it first.
+        """
+        pool = self._get_pool()
+        started = time.perf_counter()
+        connection = pool.get_connection()
+        self.stats.add('checkout', time.perf_counter() - started)
+
+        try:
+            # A reconnect gets a new id, so session_sql runs again after it
+            connection_id = connection.connection_id
+            if self.session_sql and connection_id not in self._initialized:
+                cursor = connection.cursor()
+                for statement in self.session_sql:
+                    cursor.execute(statement)
+                cursor.close()
+                self._initialized.add(connection_id)
+
+            if database:
+                cursor = connection.cursor()
+                cursor.execute(f"USE {database}")
+                cursor.close()
+        except Exception:
+            connection.close()
+            raise
+        return connection
+
+    @contextmanager
+    def connection(self, database=None):
+        """
+        Context manager around checkout(). The transaction is rolled back
+        before the connection goes back to the pool, whether or not the
+        block raised: anything the block did not commit is discarded, and
+        the next user does not inherit its REPEATABLE READ snapshot (a read
+        opens one too, as autocommit is off).
+        """
+        connection = self.checkout(database)
+        try:
+            yield connection
+        finally:
+            try:
+                connection.rollback()
+            except Exception:
+                pass  # e.g. dropped by stream(); the pool reconnects it
+            connection.close()
+
+    def query(self, sql, params=None, fetch=True, database=None):
+        """
+        Run one statement on a pooled connection and return (rows, columns),
+        or (None, None) when fetch is False. Counts toward query latency.
+        """
+        with self.connection(database) as connection:
+            cursor = connection.cursor()
+            try:
+                started = time.perf_counter()
+                cursor.execute(sql, params)
+                if fetch:
+                    rows = cursor.fetchall()
+                    columns = [desc[0] for desc in cursor.description] if cursor.description else []
+                else:
+                    rows, columns = None, None
+                self.stats.add('query', time.perf_counter() - started)
+                return rows, columns
+            finally:
+                cursor.close()
+
+    @contextmanager
+    def stream(self, sql, params=None, database=None):
+        """
+        Run one statement on an unbuffered cursor and yield the cursor, so
+        rows can be fetchmany()'d as the server sends them instead of being
+        held in memory all at once. Counts toward query latency (time to
+        the first row). If the block leaves rows unread, the connection is
+        dropped rather than drained; the pool reconnects it on next use.
+        """
+        with self.connection(database) as connection:
+            cursor = connection.cursor(buffered=False)
+            try:
+                started = time.perf_counter()
+                cursor.execute(sql, params)
+                self.stats.add('query', time.perf_counter() - started)
+                yield cursor
+            finally:
+                if connection.unread_result:
+                    connection.disconnect()
+                else:
+                    cursor.close()
+
+    def timed_execute(self, cursor, sql, params=None):
+        """cursor.execute() that counts toward query latency."""
+        started = time.perf_counter()
+        cursor.execute(sql, params)
+        self.stats.add('query', time.perf_counter() - started)
@@ -8,12 +8,17 @@ Purpose: Demonstrate query performance with and without indexes
 ============================================================================
 """
 
+import argparse
 import os
 import sys
-import mysql.connector
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
 from mysql.connector import Error
 from tabulate import tabulate
 
+from db import Database
+
 
 # ANSI color codes
 class Colors:
@@ -34,6 +39,10 @@ DB_CONFIG = {
     'database': 'ski_resort'
 }
 
+# Shared pooled connection: one handshake for the whole run, and session
+# settings persist between calls
+DB = Database(DB_CONFIG, 'ski_resort_explain')
+
 
 # ---------------------------------------------------------------------------
 # Helper printing functions
@@ -73,19 +82,7 @@ def execute_query(query: str, fetch_all: bool = True):
     For DDL (CREATE/DROP INDEX), use fetch_all=False.
     """
     try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        cursor = connection.cursor()
-        cursor.execute(query)
-
-        if fetch_all:
-            results = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description] if cursor.description else []
-        else:
-            results, columns = None, None
-
-        cursor.close()
-        connection.close()
-        return results, columns
+        return DB.query(query, fetch=fetch_all)
 
     except Error as e:
         print_error(f"Query execution failed: {e}")
@@ -318,6 +315,284 @@ def show_index_statistics() -> None:
         print()
 
 
+# ---------------------------------------------------------------------------
+# Index advisor: redundant and unused indexes
+# ---------------------------------------------------------------------------
+
+# One index from information_schema.STATISTICS; columns keep prefix lengths,
+# e.g. ('LastName', 'Email(20)')
+IndexInfo = namedtuple('IndexInfo', ['table', 'name', 'columns', 'unique', 'index_type'])
+
+# Per-index reads and per-table writes from performance_schema
+IndexUsage = namedtuple('IndexUsage', ['reads', 'table_writes'])
+
+
+def fetch_indexes() -> dict:
+    """Return {(table, index): IndexInfo} for every index in the database."""
+    results, _ = execute_query(f"""
+        SELECT TABLE_NAME, INDEX_NAME, NON_UNIQUE, INDEX_TYPE, COLUMN_NAME, SUB_PART
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = '{DB_CONFIG['database']}'
+        ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+    """)
+    columns = {}
+    details = {}
+    for table, name, non_unique, index_type, column, sub_part in results or []:
+        key = (table, name)
+        columns.setdefault(key, []).append(f"{column}({sub_part})" if sub_part else column)
+        details[key] = (not non_unique, index_type)
+    return {
+        key: IndexInfo(key[0], key[1], tuple(cols), details[key][0], details[key][1])
+        for key, cols in columns.items()
+    }
+
+
+def fetch_index_usage() -> dict:
+    """
+    Return {(table, index): IndexUsage} from
+    performance_schema.table_io_waits_summary_by_index_usage. Writes are
+    summed per table: every insert or delete maintains every secondary index.
+    Counters cover the time since server start (or the last TRUNCATE).
+    """
+    results, _ = execute_query(f"""
+        SELECT OBJECT_NAME, INDEX_NAME, COUNT_READ,
+               COUNT_INSERT + COUNT_UPDATE + COUNT_DELETE AS writes
+        FROM performance_schema.table_io_waits_summary_by_index_usage
+        WHERE OBJECT_SCHEMA = '{DB_CONFIG['database']}'
+    """)
+    table_writes = {}
+    for table, _, _, writes in results or []:
+        table_writes[table] = table_writes.get(table, 0) + int(writes)
+    return {
+        (table, name): IndexUsage(int(reads), table_writes[table])
+        for table, name, reads, _ in results or []
+        if name is not None
+    }
+
+
+def fetch_index_sizes() -> dict:
+    """Return {(table, index): bytes} from mysql.innodb_index_stats (empty if not readable)."""
+    try:
+        results, _ = DB.query(f"""
+            SELECT table_name, index_name, stat_value * @@innodb_page_size
+            FROM mysql.innodb_index_stats
+            WHERE database_name = '{DB_CONFIG['database']}' AND stat_name = 'size'
+        """)
+    except Error:
+        return {}
+    return {(table, name): int(size) for table, name, size in results}
+
+
+def fetch_foreign_keys() -> list:
+    """Return [(table, constraint, (columns...))] for every foreign key."""
+    results, _ = execute_query(f"""
+        SELECT TABLE_NAME, CONSTRAINT_NAME,
+               GROUP_CONCAT(COLUMN_NAME ORDER BY ORDINAL_POSITION)
+        FROM information_schema.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = '{DB_CONFIG['database']}'
+          AND REFERENCED_TABLE_NAME IS NOT NULL
+        GROUP BY TABLE_NAME, CONSTRAINT_NAME
+    """)
+    return [(table, name, tuple(cols.split(','))) for table, name, cols in results or []]
+
+
+def _droppable(index: IndexInfo) -> bool:
+    # Primary and unique keys enforce constraints; FULLTEXT/SPATIAL are not
+    # comparable by column prefix
+    return index.name != 'PRIMARY' and not index.unique and index.index_type == 'BTREE'
+
+
+def find_redundant_indexes(indexes: dict) -> dict:
+    """
+    Return {(table, index): covering IndexInfo} for every droppable index
+    whose columns are a left prefix of another index on the same table.
+    Of two identical indexes only the second (by name) is reported.
+    """
+    redundant = {}
+    for key, index in indexes.items():
+        if not _droppable(index):
+            continue
+        for other_key, other in indexes.items():
+            if other_key == key or other.table != index.table or other.index_type != 'BTREE':
+                continue
+            if other.columns[:len(index.columns)] != index.columns:
+                continue
+            if other.columns == index.columns and _droppable(other) and other.name > index.name:
+                continue  # keep the first of two duplicates
+            redundant[key] = other
+            break
+    return redundant
+
+
+def find_unused_indexes(indexes: dict, usage: dict) -> list:
+    """Droppable indexes with no reads recorded in performance_schema."""
+    return [
+        key for key, index in indexes.items()
+        if _droppable(index) and key in usage and usage[key].reads == 0
+    ]
+
+
+def _covers(other: IndexInfo, index: IndexInfo) -> bool:
+    return (other.table == index.table and other.index_type == 'BTREE'
+            and other.columns[:len(index.columns)] == index.columns)
+
+
+def plan_index_drops(candidates: list, indexes: dict, foreign_keys: list,
+                     redundant: dict = None):
+    """
+    Split candidate (table, index) keys into (drops, blocked), where blocked
+    maps a key to the reason it is kept. A drop is blocked when it would
+    leave a foreign key without an index whose leading columns match the
+    key columns (InnoDB refuses to drop it), or, for a key in redundant,
+    when no index left after the other drops still covers its columns.
+    """
+    redundant = redundant or {}
+    remaining = dict(indexes)
+    drops, blocked = [], {}
+
+    # Redundant indexes last, so a drop planned after them cannot take
+    # away the index that covers them
+    for key in sorted(candidates, key=lambda k: k in redundant):
+        if key in redundant and not any(
+                _covers(other, indexes[key]) for k, other in remaining.items() if k != key):
+            blocked[key] = "covering index also dropped"
+            continue
+
+        trial = {k: v for k, v in remaining.items() if k != key}
+        for table, constraint, fk_columns in foreign_keys:
+            if table != key[0]:
+                continue
+            supported = any(
+                ix.table == table and ix.index_type == 'BTREE'
+                and tuple(c.split('(')[0] for c in ix.columns[:len(fk_columns)]) == fk_columns
+                for ix in trial.values()
+            )
+            if not supported:
+                blocked[key] = f"FK {constraint}"
+                break
+        else:
+            remaining = trial
+            drops.append(key)
+
+    return drops, blocked
+
+
+def build_drop_script(drops: list, reasons: dict) -> str:
+    """Render proposed drops as one ALTER TABLE per table."""
+    lines = [
+        "-- ============================================================================",
+        "-- Proposed index drops (explain.py --advise-indexes)",
+        f"-- Generated: {datetime.now().isoformat(timespec='seconds')}",
+        "-- Review before running: usage counters reset when the server restarts",
+        "-- ============================================================================",
+        "",
+        f"USE {DB_CONFIG['database']};",
+        "",
+    ]
+    by_table = {}
+    for table, name in drops:
+        by_table.setdefault(table, []).append(name)
+
+    for table, names in by_table.items():
+        for name in names:
+            lines.append(f"-- {name}: {reasons[(table, name)]}")
+        clauses = ',\n    '.join(f"DROP INDEX {name}" for name in names)
+        lines.append(f"ALTER TABLE {table}\n    {clauses};")
+        lines.append("")
+    return '\n'.join(lines)
+
+
+def advise_indexes(drop_script: Path = None) -> None:
+    """
+    Report left-prefix-redundant and unused indexes with the write cost they
+    add, and emit a DROP script. Run a representative workload first (e.g.
+    benchmark.py run) so performance_schema has recorded index reads.
+    """
+    print_header("Index Advisor: Redundant and Unused Indexes")
+
+    indexes = fetch_indexes()
+    if not indexes:
+        print_error("No index information available.")
+        return
+
+    usage = fetch_index_usage()
+    sizes = fetch_index_sizes()
+    foreign_keys = fetch_foreign_keys()
+
+    total_reads = sum(u.reads for u in usage.values())
+    if not usage:
+        print_info("performance_schema index usage is unavailable; "
+                   "reporting redundant indexes only.")
+    elif total_reads == 0:
+        print_info("No index reads recorded yet; run a workload (benchmark.py run) "
+                   "before trusting the unused-index report.")
+
+    redundant = find_redundant_indexes(indexes)
+    unused = find_unused_indexes(indexes, usage) if total_reads else []
+
+    reasons = {}
+    for key, covering in redundant.items():
+        reasons[key] = f"left prefix of {covering.name} ({', '.join(covering.columns)})"
+    for key in unused:
+        reasons[key] = (reasons[key] + "; " if key in reasons else "") + "no reads recorded"
+
+    candidates = sorted(reasons)
+    drops, blocked = plan_index_drops(candidates, indexes, foreign_keys, redundant)
+
+    # Secondary indexes each table maintains on every insert/delete
+    secondary = {}
+    for index in indexes.values():
+        if index.name != 'PRIMARY':
+            secondary[index.table] = secondary.get(index.table, 0) + 1
+
+    rows = []
+    for key in candidates:
+        index = indexes[key]
+        writes = usage[key].table_writes if key in usage else None
+        size = sizes.get(key)
+        status = f"keep ({blocked[key]})" if key in blocked else "DROP"
+        rows.append([
+            index.table, index.name, ', '.join(index.columns), reasons[key],
+            usage[key].reads if key in usage else '-',
+            writes if writes is not None else '-',
+            f"{size / 1024 / 1024:.1f}" if size is not None else '-',
+            status,
+        ])
+
+    if not rows:
+        print_success("No redundant or unused indexes found.")
+        return
+
+    print_subheader("Findings")
+    display_results(rows, ['Table', 'Index', 'Columns', 'Reason', 'Reads',
+                           'Table writes', 'Size MB', 'Proposal'])
+
+    print()
+    print_subheader("Write Amplification")
+    amplification = []
+    for table in sorted({table for table, _ in drops}):
+        dropped = sum(1 for t, _ in drops if t == table)
+        writes = next((u.table_writes for k, u in usage.items() if k[0] == table), 0)
+        # Each row write touches the clustered index plus every secondary index
+        amplification.append([
+            table, secondary[table], secondary[table] - dropped,
+            writes, writes * dropped,
+            f"{dropped / (secondary[table] + 1) * 100:.0f}%",
+        ])
+    display_results(amplification, ['Table', 'Secondary now', 'After drops', 'Row writes',
+                                    'Index writes saved', 'Write work saved'])
+
+    script = build_drop_script(drops, reasons)
+    print()
+    if drop_script:
+        drop_script.write_text(script + '\n', encoding='utf-8')
+        print_success(f"Proposed DROP script written to {drop_script} ({len(drops)} indexes)")
+    else:
+        print_subheader("Proposed DROP Script")
+        print(script)
+    print()
+
+
 # ---------------------------------------------------------------------------
 # Demonstrate impact of a composite index (drop / recreate)
 # ---------------------------------------------------------------------------
@@ -327,7 +602,8 @@ def demonstrate_index_impact() -> None:
     Demonstrate performance impact of composite index on Rentals:
       idx_rental_customer_date ON Rentals(CustomerID, RentalDate)
 
-    NOTE: In this schema, the index is required by a foreign key, so we do not
+    NOTE: In this schema, the index backs the customer reference check of the
+    partitioned Rentals table (trg_customer_references_delete), so we do not
     actually drop/recreate it. Instead, we show EXPLAIN and explain what would
     happen without the index.
     """
@@ -352,8 +628,8 @@ def demonstrate_index_impact() -> None:
 
     print()
     print_info("Index Impact Discussion:")
-    print("  - In our design, idx_rental_customer_date supports foreign key and history lookups,")
-    print("    so MySQL does not allow dropping it (it is tied to a constraint).")
+    print("  - In our design, idx_rental_customer_date supports the customer reference check")
+    print("    (Rentals is partitioned, so a trigger replaces the foreign key) and history lookups.")
     print("  - With this index present, EXPLAIN shows an index lookup on Rentals using")
     print("    idx_rental_customer_date (type=ref/range) instead of a full table scan.")
     print("  - Hypothetically, without this index MySQL would need to scan more rows or perform")
@@ -457,7 +733,26 @@ def print_summary() -> None:
 # Main
 # ---------------------------------------------------------------------------
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="EXPLAIN-based index analysis")
+    parser.add_argument(
+        '--advise-indexes', action='store_true',
+        help="Only run the index advisor (redundant/unused indexes, DROP script)"
+    )
+    parser.add_argument(
+        '--drop-script', type=Path, metavar='PATH',
+        help="Write the advisor's proposed DROP script to PATH instead of printing it"
+    )
+    return parser.parse_args()
+
+
 def main() -> None:
+    args = parse_args()
+
+    if args.advise_indexes:
+        advise_indexes(args.drop_script)
+        return
+
     print_header("Query Performance Analysis with EXPLAIN (Ski Resort Management System)")
 
     print()
@@ -469,10 +764,18 @@ def main() -> None:
     analyze_query_2()
     analyze_query_3()
     show_index_statistics()
+    advise_indexes(args.drop_script)
     demonstrate_index_impact()
     demonstrate_covering_index()
     print_summary()
 
+    print_subheader("Connection Statistics")
+    display_results(
+        [(kind, count, f"{total_ms:.1f}", f"{avg_ms:.2f}") for kind, count, total_ms, avg_ms
+         in DB.stats.rows()],
+        ['Kind', 'Count', 'Total ms', 'Avg ms']
+    )
+
     print()
     print_success("Analysis complete!")
     print()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+
+"""
+============================================================================
+Ski Resort Management System - Report Export (Python)
+COMP 345 Final Project
+Purpose: Stream a report query or view to CSV or NDJSON in constant memory
+
+Runs a numbered query from 07_queries.sql (Q1, Q2, ...) or a view/table by
+name on an unbuffered cursor. Rows are read from the server in batches of
+--batch-size as the file is written, so a multi-million row export holds
+one batch in Python memory instead of the whole result. Progress (rows and
+rows/sec) goes to stderr, which keeps stdout free for the data.
+
+A file export is written to <output>.part and renamed when complete, so a
+failed run never leaves a truncated file under the final name.
+
+Usage:
+    python3 scripts/export.py Q5 --output q5.csv
+    python3 scripts/export.py vw_customer_activity_masked --format ndjson --output activity.ndjson
+    python3 scripts/export.py --list
+============================================================================
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from mysql.connector import Error
+
+from benchmark import discover_workloads
+from db import Database
+
+
+# ANSI color codes
+class Colors:
+    RED = '\033[0;31m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    BLUE = '\033[0;34m'
+    NC = '\033[0m'
+
+
+# Configuration
+DB_CONFIG = {
+    'host': os.getenv('MYSQL_HOST', 'localhost'),
+    'port': int(os.getenv('MYSQL_PORT', '3306')),
+    'user': os.getenv('MYSQL_USER', 'root'),
+    'password': os.getenv('MYSQL_PASSWORD', ''),
+    'database': 'ski_resort'
+}
+
+SQL_DIR = Path(__file__).parent.parent / 'sql'
+
+# The server waits on the client while an unbuffered result is being
+# written out; allow a slow disk or pipe an hour before it gives up
+DB = Database(DB_CONFIG, 'ski_resort_export',
+              session_sql=["SET SESSION net_write_timeout = 3600"])
+
+FORMATS = ('csv', 'ndjson')
+
+_IDENTIFIER = re.compile(r"^\w+$")
+
+
+def print_header(message: str) -> None:
+    print(f"{Colors.BLUE}{'=' * 76}{Colors.NC}", file=sys.stderr)
+    print(f"{Colors.BLUE}{message}{Colors.NC}", file=sys.stderr)
+    print(f"{Colors.BLUE}{'=' * 76}{Colors.NC}", file=sys.stderr)
+
+
+def print_success(message: str) -> None:
+    print(f"{Colors.GREEN}✓ {message}{Colors.NC}", file=sys.stderr)
+
+
+def print_error(message: str) -> None:
+    print(f"{Colors.RED}✗ {message}{Colors.NC}", file=sys.stderr)
+
+
+def print_info(message: str) -> None:
+    print(f"{Colors.YELLOW}ℹ {message}{Colors.NC}", file=sys.stderr)
+
+
+# ---------------------------------------------------------------------------
+# Sources
+# ---------------------------------------------------------------------------
+
+def resolve_source(name: str, sql_dir: Path):
+    """
+    Return (title, sql) for a workload name (Q<n> or a view in 03_views.sql)
+    or any other table/view name, or None if name is neither.
+    """
+    for workload in discover_workloads(sql_dir):
+        if workload.name.lower() == name.lower():
+            return workload.title, workload.sql
+    if _IDENTIFIER.match(name) and not re.match(r"^Q\d+$", name, re.IGNORECASE):
+        return f"SELECT * FROM {name}", f"SELECT * FROM {name}"
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Writers
+# ---------------------------------------------------------------------------
+
+def json_value(value):
+    """JSON-safe value. Decimals become strings so amounts keep every digit."""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode('utf-8', errors='replace')
+    if isinstance(value, set):
+        return sorted(value)
+    return value
+
+
+class CsvWriter:
+    def __init__(self, stream, columns):
+        self._writer = csv.writer(stream, lineterminator='\n')
+        self._writer.writerow(columns)
+
+    def write_rows(self, rows):
+        self._writer.writerows(rows)
+
+
+class NdjsonWriter:
+    def __init__(self, stream, columns):
+        self._stream = stream
+        self._columns = columns
+
+    def write_rows(self, rows):
+        self._stream.write(''.join(
+            json.dumps({c: json_value(v) for c, v in zip(self._columns, row)},
+                       ensure_ascii=False) + '\n'
+            for row in rows
+        ))
+
+
+WRITERS = {'csv': CsvWriter, 'ndjson': NdjsonWriter}
+
+
+class Progress:
+    """Prints rows and rows/sec to stderr at most once per interval."""
+
+    def __init__(self, label, interval):
+        self.label = label
+        self.interval = interval
+        self.rows = 0
+        self.started = time.perf_counter()
+        self._last = self.started
+
+    def add(self, count):
+        self.rows += count
+        now = time.perf_counter()
+        if self.interval and now - self._last >= self.interval:
+            self._last = now
+            print_info(f"{self.label}: {self.rows:,} rows, {self.rate(now):,.0f} rows/s")
+
+    def rate(self, now=None):
+        elapsed = (now or time.perf_counter()) - self.started
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+def export_rows(sql: str, stream, fmt: str, batch_size: int, progress: Progress) -> int:
+    """
+    Stream the result of sql to stream in fmt, batch_size rows at a time.
+    Returns the number of rows written.
+    """
+    with DB.stream(sql) as cursor:
+        columns = [desc[0] for desc in cursor.description]
+        writer = WRITERS[fmt](stream, columns)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            writer.write_rows(rows)
+            stream.flush()
+            progress.add(len(rows))
+    return progress.rows
+
+
+def run_export(args) -> int:
+    source = resolve_source(args.source, args.sql_dir)
+    if source is None:
+        print_error(f"Unknown query or view: {args.source} (see --list)")
+        return 1
+    title, sql = source
+
+    fmt = args.format
+    if fmt is None:
+        fmt = 'ndjson' if args.output and args.output.suffix.lower() in ('.ndjson', '.jsonl') else 'csv'
+
+    print_header(f"Export {args.source}: {title}")
+    progress = Progress(args.source, args.progress_interval)
+
+    try:
+        if args.output is None or str(args.output) == '-':
+            export_rows(sql, sys.stdout, fmt, args.batch_size, progress)
+            destination = 'stdout'
+        else:
+            partial = args.output.with_name(args.output.name + '.part')
+            try:
+                with open(partial, 'w', encoding='utf-8', newline='') as f:
+                    export_rows(sql, f, fmt, args.batch_size, progress)
+                partial.replace(args.output)
+            except BaseException:
+                partial.unlink(missing_ok=True)
+                raise
+            destination = str(args.output)
+    except Error as e:
+        print_error(f"Export failed after {progress.rows:,} rows: {e}")
+        return 1
+
+    elapsed = time.perf_counter() - progress.started
+    print_success(f"{progress.rows:,} rows written to {destination} as {fmt} "
+                  f"in {elapsed:.1f}s ({progress.rate():,.0f} rows/s)")
+    return 0
+
+
+def list_sources(sql_dir: Path) -> int:
+    for workload in discover_workloads(sql_dir):
+        print(f"{workload.name:<32} {workload.title}")
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Stream a report query or view to a file")
+    parser.add_argument('source', nargs='?',
+                        help="Q<n> from 07_queries.sql, or a view or table name")
+    parser.add_argument('--list', action='store_true',
+                        help="List the numbered queries and views that can be exported")
+    parser.add_argument('--format', choices=FORMATS,
+                        help="Output format (default: from the --output suffix, else csv)")
+    parser.add_argument('--output', type=Path, metavar='PATH',
+                        help="Output file, or - for stdout (default: stdout)")
+    parser.add_argument('--batch-size', type=int, default=5000, metavar='N',
+                        help="Rows fetched and written per batch (default: 5000)")
+    parser.add_argument('--progress-interval', type=float, default=5.0, metavar='SECONDS',
+                        help="Seconds between progress lines, 0 for none (default: 5)")
+    parser.add_argument('--sql-dir', type=Path, default=SQL_DIR, help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+    if not args.list and not args.source:
+        parser.error("a query or view name is required (or --list)")
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    if args.list:
+        sys.exit(list_sources(args.sql_dir))
+    sys.exit(run_export(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,781 @@
+#!/usr/bin/env python3
+
+"""
+============================================================================
+Ski Resort Management System - Synthetic Data Generator (Python)
+COMP 345 Final Project
+Purpose: Scale the ski_resort schema to production-sized data volumes
+
+Emits referentially valid rows for the 17 data tables in 01_schema.sql
+(the summary tables are derived after the load) with explicit primary
+keys, so foreign keys hold regardless of load order. Every
+CHECK constraint in the schema is respected (chk_dob_range, chk_email_format,
+chk_valid_date, chk_enrollment_capacity, chk_lesson_times, chk_return_dates,
+the maintenance date checks, chk_snow_depth and the non-negative prices).
+
+Rows are produced in fixed-size batches and written as they are generated,
+so memory stays bounded no matter how large --scale is. Data is skewed the
+way a real season is: weekends and holidays are busier, day passes outsell
+multi-day passes, and a minority of customers account for most visits.
+
+Usage:
+    python3 scripts/generate.py --scale 10 --output /tmp/seed_x10.sql
+    python3 scripts/load.py --seed-file /tmp/seed_x10.sql
+
+    # One TSV per table for LOAD DATA LOCAL INFILE
+    python3 scripts/generate.py --scale 10 --format tsv --output /tmp/seed_x10
+    python3 scripts/load.py --bulk-dir /tmp/seed_x10
+============================================================================
+"""
+
+import argparse
+import random
+import sys
+from array import array
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+from pathlib import Path
+
+# ---------------------------------------------------------------------------
+# Volumes
+# ---------------------------------------------------------------------------
+
+# Rows generated per unit of --scale. Enrollments, Rental_Items and
+# Lift_Access are derived from their parent tables.
+ROWS_PER_SCALE = {
+    'Customers': 10000,
+    'Instructors': 40,
+    'Trails': 15,
+    'Lifts': 12,
+    'Equipment': 2000,
+    'Maintenance_Staff': 20,
+    'Lift_Tickets': 100000,
+    'Scheduled_Lessons': 1500,
+    'Rentals': 25000,
+    'Lift_Maintenance_Logs': 600,
+    'Equipment_Maintenance_Logs': 2000,
+    'Trail_Maintenance_Logs': 1500,
+}
+
+DEFAULT_BATCH_ROWS = 5000
+DEFAULT_SEASON_START = '2024-11-15'
+SEASON_DAYS = 150
+
+# Columns written for each table, in load order
+TABLE_COLUMNS = {
+    'Customers': ('CustomerID', 'FirstName', 'LastName', 'Email', 'Phone', 'DOB',
+                  'Address', 'City', 'StateProvince', 'PostalCode', 'Country'),
+    'Pass_Types': ('PassTypeID', 'PassName', 'PassDescription', 'CurrentPrice',
+                   'AgeGroup', 'DurationDays', 'IsSeasonPass'),
+    'Instructors': ('InstructorID', 'FirstName', 'LastName', 'Email', 'Phone',
+                    'Specialty', 'CertificationLevel', 'HireDate', 'IsActive'),
+    'Trails': ('TrailID', 'TrailName', 'Difficulty', 'LengthMeters',
+               'ElevationDropMeters', 'IsOpen', 'ConditionsNotes'),
+    'Lifts': ('LiftID', 'LiftName', 'LiftType', 'Capacity', 'IsOpen', 'OperatingHours'),
+    'Lift_Access': ('AccessID', 'LiftID', 'TrailID', 'AccessType'),
+    'Equipment': ('EquipmentID', 'EquipmentType', 'Brand', 'Model', 'Size', 'Status',
+                  'PurchaseDate', 'LastMaintenanceDate', 'NextMaintenanceDate',
+                  'ConditionNotes'),
+    'Rental_Rates': ('RateID', 'EquipmentType', 'Season', 'SeasonStart', 'SeasonEnd',
+                     'MinDays', 'DailyRate', 'DiscountPct'),
+    'Maintenance_Staff': ('StaffID', 'FirstName', 'LastName', 'Email', 'Phone',
+                          'Specialty', 'HireDate', 'IsActive'),
+    'Lift_Tickets': ('TicketID', 'CustomerID', 'PassTypeID', 'PurchaseDate', 'ValidDate',
+                     'ExpirationDate', 'SalePrice', 'TicketStatus'),
+    'Scheduled_Lessons': ('LessonID', 'InstructorID', 'LessonName', 'StartTime', 'EndTime',
+                          'MaxCapacity', 'CurrentEnrollment', 'LessonType',
+                          'LessonStatus', 'Price'),
+    'Enrollments': ('EnrollmentID', 'CustomerID', 'LessonID', 'EnrollmentDate',
+                    'PaymentStatus', 'PaymentAmount', 'Notes'),
+    'Rentals': ('RentalID', 'CustomerID', 'RentalDate', 'ExpectedReturnDate',
+                'ActualReturnDate', 'TotalPrice', 'RentalStatus'),
+    'Rental_Items': ('RentalItemID', 'RentalID', 'EquipmentID', 'Quantity', 'UnitPrice'),
+    'Lift_Maintenance_Logs': ('LogID', 'LiftID', 'StaffID', 'MaintenanceType',
+                              'Description', 'Priority', 'Status', 'ScheduledDate',
+                              'StartedDate', 'CompletedDate', 'EstimatedCost',
+                              'ActualCost', 'Notes'),
+    'Equipment_Maintenance_Logs': ('LogID', 'EquipmentID', 'StaffID', 'MaintenanceType',
+                                   'Description', 'Priority', 'Status', 'ScheduledDate',
+                                   'StartedDate', 'CompletedDate', 'Cost', 'PartsUsed',
+                                   'Notes'),
+    'Trail_Maintenance_Logs': ('LogID', 'TrailID', 'StaffID', 'MaintenanceType',
+                               'Description', 'Priority', 'Status', 'ScheduledDate',
+                               'StartedDate', 'CompletedDate', 'WeatherConditions',
+                               'SnowDepth', 'Cost', 'Notes'),
+}
+
+# ---------------------------------------------------------------------------
+# Reference data
+# ---------------------------------------------------------------------------
+
+FIRST_NAMES = [
+    'John', 'Sarah', 'Michael', 'Emily', 'David', 'Jessica', 'Christopher', 'Amanda',
+    'Matthew', 'Ashley', 'James', 'Lauren', 'Robert', 'Michelle', 'Daniel', 'Nicole',
+    'William', 'Stephanie', 'Joseph', 'Kimberly', 'Thomas', 'Rachel', 'Charles',
+    'Samantha', 'Andrew', 'Elizabeth', 'Joshua', 'Megan', 'Ryan', 'Brittany', 'Kevin',
+    'Brian', 'Melissa', 'Steven', 'Rebecca', 'Jason', 'Laura', 'Eric', 'Heather', 'Mark',
+]
+LAST_NAMES = [
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis',
+    'Rodriguez', 'Martinez', 'Hernandez', 'Lopez', 'Wilson', 'Anderson', 'Thomas',
+    'Taylor', 'Moore', 'Jackson', 'White', 'Harris', 'Martin', 'Thompson', 'Clark',
+    'Lewis', 'Lee', 'Walker', 'Hall', 'Allen', 'Young', 'King', 'Wright', 'Hill',
+]
+CITIES = [
+    ('Denver', 'CO', '802'), ('Aspen', 'CO', '816'), ('Vail', 'CO', '816'),
+    ('Boulder', 'CO', '803'), ('Breckenridge', 'CO', '804'), ('Telluride', 'CO', '814'),
+    ('Salt Lake City', 'UT', '841'), ('Park City', 'UT', '840'), ('Jackson', 'WY', '830'),
+    ('Bozeman', 'MT', '597'), ('Reno', 'NV', '895'), ('Phoenix', 'AZ', '850'),
+    ('Dallas', 'TX', '752'), ('Chicago', 'IL', '606'), ('New York', 'NY', '100'),
+]
+STREETS = ['Main St', 'Oak Ave', 'Pine Rd', 'Elm St', 'Maple Dr', 'Cedar Ln', 'Birch Way']
+
+# Mirrors the catalog in 02_seed.sql; weights are the share of tickets sold
+PASS_TYPES = [
+    # (name, description, price, age group, duration days, season pass, weight)
+    ('Adult Day Pass', 'Full-day lift access for adults', 89.00, 'Adult', 1, 0, 35),
+    ('Child Day Pass', 'Full-day lift access for children (ages 5-12)', 45.00, 'Child', 1, 0, 15),
+    ('Senior Day Pass', 'Full-day lift access for seniors (65+)', 65.00, 'Senior', 1, 0, 6),
+    ('Adult Multi-Day Pass', '3-day lift access for adults', 240.00, 'Adult', 3, 0, 12),
+    ('Child Multi-Day Pass', '3-day lift access for children', 120.00, 'Child', 3, 0, 5),
+    ('Senior Multi-Day Pass', '3-day lift access for seniors', 180.00, 'Senior', 3, 0, 2),
+    ('Adult Season Pass', 'Unlimited lift access for the entire season', 899.00, 'Adult', 180, 1, 12),
+    ('Child Season Pass', 'Unlimited lift access for children', 449.00, 'Child', 180, 1, 6),
+    ('Senior Season Pass', 'Unlimited lift access for seniors', 599.00, 'Senior', 180, 1, 3),
+    ('Family Season Pass', 'Unlimited lift access for entire family', 1999.00, 'Adult', 180, 1, 4),
+]
+
+# Standard daily rates, written to Rental_Rates
+EQUIPMENT_TYPES = {
+    # type: (daily rate, share of inventory, brands, sizes)
+    'Ski': (25.00, 25, ['Rossignol', 'Atomic', 'Salomon', 'K2', 'Volkl'],
+            ['150cm', '160cm', '170cm', '180cm']),
+    'Snowboard': (30.00, 12, ['Burton', 'Lib Tech', 'GNU', 'Jones'],
+                  ['145cm', '150cm', '155cm', '160cm']),
+    'Boots': (15.00, 30, ['Salomon', 'Atomic', 'Lange', 'Burton'],
+              ['24', '25', '26', '27', '28', '29']),
+    'Poles': (5.00, 12, ['Leki', 'Black Diamond', 'Scott'], ['110cm', '120cm', '130cm']),
+    'Helmet': (8.00, 15, ['Giro', 'Smith', 'POC'], ['S', 'M', 'L']),
+    'Goggles': (10.00, 6, ['Smith', 'Oakley', 'Anon'], ['One Size']),
+}
+# Rental_Rates rows beyond the per-type rates: any other type, and the
+# duration discount tier
+DEFAULT_DAILY_RATE = 20.00
+LONG_RENTAL_DAYS = 7
+LONG_RENTAL_DISCOUNT = 0.10
+
+RENTAL_PACKAGES = [
+    (('Ski', 'Boots', 'Poles', 'Helmet'), 30),
+    (('Ski', 'Boots', 'Poles'), 25),
+    (('Snowboard', 'Boots', 'Helmet'), 15),
+    (('Snowboard', 'Boots'), 10),
+    (('Ski',), 8),
+    (('Boots',), 5),
+    (('Helmet', 'Goggles'), 7),
+]
+
+LESSON_TYPES = {
+    # type: (capacity range, price, names, weight)
+    'Group': ((6, 10), 75.00, ['Beginner Ski Group Lesson', 'Snowboard Basics',
+                               'Kids Ski Lesson', 'Intermediate Ski Lesson'], 70),
+    'Semi-Private': ((2, 4), 120.00, ['Advanced Ski Technique', 'Snowboard Tricks'], 20),
+    'Private': ((1, 1), 150.00, ['Private Ski Lesson', 'Private Snowboard Lesson'], 10),
+}
+
+TRAIL_DIFFICULTIES = [('Beginner', 25), ('Intermediate', 35), ('Advanced', 25), ('Expert', 15)]
+LIFT_TYPES = [('Chairlift', 60), ('Gondola', 15), ('Magic Carpet', 15), ('T-Bar', 10)]
+
+# Status mix for maintenance logs whose ScheduledDate is in the past
+MAINTENANCE_STATUS = [('Completed', 80), ('In Progress', 10), ('Cancelled', 10)]
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def weighted(pairs):
+    """Split [(value, weight), ...] into (values, cumulative weights)."""
+    values = [value for value, _ in pairs]
+    return values, list(accumulate(weight for _, weight in pairs))
+
+
+def third_monday(year, month):
+    """Date of the third Monday of a month (MLK Day, Presidents' Day)."""
+    first = date(year, month, 1)
+    offset = (7 - first.weekday()) % 7
+    return first + timedelta(days=offset + 14)
+
+
+class SeasonCalendar:
+    """Season days with visit weights (weekends and holidays are busier)."""
+
+    def __init__(self, season_start, days=SEASON_DAYS):
+        self.start = season_start
+        self.days = [season_start + timedelta(days=d) for d in range(days)]
+        self.end = self.days[-1]
+        # Reports look at the season "as of" mid-March, so both past and
+        # upcoming activity exist
+        self.as_of = season_start + timedelta(days=int(days * 0.75))
+
+        holidays = set()
+        for year in {d.year for d in self.days}:
+            holidays.update(date(year, 12, 24) + timedelta(days=i) for i in range(9))
+            for monday in (third_monday(year, 1), third_monday(year, 2)):
+                holidays.update(monday - timedelta(days=i) for i in range(3))
+
+        weights = []
+        for d in self.days:
+            weight = 1.0
+            if d.weekday() >= 5:
+                weight = 2.5
+            if d in holidays:
+                weight = 3.5
+            weights.append(weight)
+        self.cum_weights = list(accumulate(weights))
+        self.indexes = list(range(days))
+
+    def sample(self, rng, k):
+        """Draw k season-day indexes with weekend/holiday skew."""
+        return rng.choices(self.indexes, cum_weights=self.cum_weights, k=k)
+
+
+def fmt_dt(day, hour, minute=0):
+    """Format a DATETIME literal."""
+    return f"{day.isoformat()} {hour:02d}:{minute:02d}:00"
+
+
+# ---------------------------------------------------------------------------
+# Generator
+# ---------------------------------------------------------------------------
+
+class DataGenerator:
+    """
+    Produce (table, rows) batches for the whole schema.
+
+    Only small per-parent facts needed by child tables are retained
+    (equipment ids by type, lesson capacity/price/start), so memory is
+    proportional to the number of lessons and equipment items rather than
+    to the number of tickets or rentals.
+    """
+
+    def __init__(self, scale=1.0, seed=345, season_start=DEFAULT_SEASON_START,
+                 batch_rows=DEFAULT_BATCH_ROWS):
+        self.rng = random.Random(seed)
+        self.batch_rows = batch_rows
+        self.calendar = SeasonCalendar(date.fromisoformat(season_start))
+        self.counts = {table: max(1, int(rows * scale))
+                       for table, rows in ROWS_PER_SCALE.items()}
+        self.equipment_by_type = {}
+
+    # -- helpers ----------------------------------------------------------
+
+    def _batches(self, total):
+        """Yield (first_id, size) ranges covering 1..total."""
+        first = 1
+        while first <= total:
+            size = min(self.batch_rows, total - first + 1)
+            yield first, size
+            first += size
+
+    def _customer_ids(self, k):
+        """Draw k customer ids; a small share of customers does most visits."""
+        n = self.counts['Customers']
+        rnd = self.rng.random
+        return [int(n * rnd() ** 2.5) + 1 for _ in range(k)]
+
+    def _person(self, i, domain):
+        rng = self.rng
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        email = f"{first.lower()}.{last.lower()}.{i}@{domain}"
+        phone = f"555-{rng.randrange(10000):04d}"
+        return first, last, email, phone
+
+    # -- tables -----------------------------------------------------------
+
+    def customers(self):
+        rng = self.rng
+        dob_low = date(1940, 1, 1).toordinal()
+        dob_high = date(2021, 12, 31).toordinal()  # chk_dob_range: DOB < 2022-01-01
+        for first_id, size in self._batches(self.counts['Customers']):
+            rows = []
+            for i in range(first_id, first_id + size):
+                first, last, email, phone = self._person(i, 'example.com')
+                city, state, zip3 = rng.choice(CITIES)
+                rows.append((
+                    i, first, last, email, phone,
+                    date.fromordinal(rng.randint(dob_low, dob_high)).isoformat(),
+                    f"{rng.randint(1, 9999)} {rng.choice(STREETS)}",
+                    city, state, f"{zip3}{rng.randrange(100):02d}", 'USA',
+                ))
+            yield 'Customers', rows
+
+    def pass_types(self):
+        yield 'Pass_Types', [
+            (i, name, desc, price, age, days, season)
+            for i, (name, desc, price, age, days, season, _) in enumerate(PASS_TYPES, 1)
+        ]
+
+    def instructors(self):
+        rng = self.rng
+        rows = []
+        for i in range(1, self.counts['Instructors'] + 1):
+            first, last, email, phone = self._person(i, 'skiresort.com')
+            rows.append((
+                i, first, last, f"instr.{email}", phone,
+                rng.choice(['Skiing', 'Skiing', 'Snowboarding', 'Both']),
+                rng.choice(['Level 1', 'Level 2', 'Level 3', 'Certified']),
+                date(rng.randint(2010, 2024), rng.randint(1, 12), rng.randint(1, 28)).isoformat(),
+                1 if rng.random() < 0.9 else 0,
+            ))
+        yield 'Instructors', rows
+
+    def trails(self):
+        rng = self.rng
+        values, cum = weighted(TRAIL_DIFFICULTIES)
+        rows = []
+        for i in range(1, self.counts['Trails'] + 1):
+            difficulty = rng.choices(values, cum_weights=cum)[0]
+            length = round(rng.uniform(200, 4000), 2)
+            rows.append((
+                i, f"Trail {i}", difficulty, length,
+                round(length * rng.uniform(0.1, 0.3), 2),
+                1 if rng.random() < 0.9 else 0,
+                f"{difficulty} run, groomed nightly",
+            ))
+        yield 'Trails', rows
+
+    def lifts(self):
+        rng = self.rng
+        values, cum = weighted(LIFT_TYPES)
+        rows = []
+        for i in range(1, self.counts['Lifts'] + 1):
+            rows.append((
+                i, f"Lift {i}", rng.choices(values, cum_weights=cum)[0],
+                rng.choice([2, 4, 6, 8]) * 300,
+                1 if rng.random() < 0.9 else 0,
+                '8:30 AM - 4:00 PM',
+            ))
+        yield 'Lifts', rows
+
+    def lift_access(self):
+        rng = self.rng
+        n_trails = self.counts['Trails']
+        rows = []
+        access_id = 1
+        for lift_id in range(1, self.counts['Lifts'] + 1):
+            # uk_lift_trail: distinct trails per lift
+            for trail_id in rng.sample(range(1, n_trails + 1), min(n_trails, rng.randint(1, 5))):
+                rows.append((access_id, lift_id, trail_id,
+                             'Direct' if rng.random() < 0.75 else 'Indirect'))
+                access_id += 1
+        yield 'Lift_Access', rows
+
+    def equipment(self):
+        rng = self.rng
+        types = list(EQUIPMENT_TYPES)
+        cum = list(accumulate(EQUIPMENT_TYPES[t][1] for t in types))
+        statuses, status_cum = weighted([('Available', 70), ('Rented', 22),
+                                         ('Maintenance', 6), ('Retired', 2)])
+        self.equipment_by_type = {t: array('i') for t in types}
+        for first_id, size in self._batches(self.counts['Equipment']):
+            drawn = rng.choices(types, cum_weights=cum, k=size)
+            drawn_status = rng.choices(statuses, cum_weights=status_cum, k=size)
+            rows = []
+            for offset, (etype, status) in enumerate(zip(drawn, drawn_status)):
+                equipment_id = first_id + offset
+                _, _, brands, sizes = EQUIPMENT_TYPES[etype]
+                purchased = date(rng.randint(2019, 2024), rng.randint(1, 12), rng.randint(1, 28))
+                last_maint = purchased + timedelta(days=rng.randint(30, 300))
+                rows.append((
+                    equipment_id, etype, rng.choice(brands), f"Model {rng.randint(1, 20)}",
+                    rng.choice(sizes), status, purchased.isoformat(),
+                    last_maint.isoformat(), (last_maint + timedelta(days=90)).isoformat(),
+                    'Good condition',
+                ))
+                if status not in ('Maintenance', 'Retired'):
+                    self.equipment_by_type[etype].append(equipment_id)
+            yield 'Equipment', rows
+
+    def rental_rates(self):
+        rates = [(t, EQUIPMENT_TYPES[t][0]) for t in EQUIPMENT_TYPES]
+        rates.append((None, DEFAULT_DAILY_RATE))
+        rows = []
+        for etype, daily_rate in rates:
+            rows.append((etype, 'Standard', None, None, 0, daily_rate, 0.0))
+            rows.append((etype, 'Standard', None, None, LONG_RENTAL_DAYS, daily_rate,
+                         LONG_RENTAL_DISCOUNT))
+        yield 'Rental_Rates', [(i, *row) for i, row in enumerate(rows, 1)]
+
+    def maintenance_staff(self):
+        rng = self.rng
+        rows = []
+        for i in range(1, self.counts['Maintenance_Staff'] + 1):
+            first, last, email, phone = self._person(i, 'skiresort.com')
+            rows.append((
+                i, first, last, f"staff.{email}", phone,
+                rng.choice(['Lifts', 'Equipment', 'Trails', 'Facilities', 'General']),
+                date(rng.randint(2010, 2024), rng.randint(1, 12), rng.randint(1, 28)).isoformat(),
+                1 if rng.random() < 0.9 else 0,
+            ))
+        yield 'Maintenance_Staff', rows
+
+    def lift_tickets(self):
+        rng = self.rng
+        cal = self.calendar
+        pass_ids = list(range(1, len(PASS_TYPES) + 1))
+        pass_cum = list(accumulate(p[6] for p in PASS_TYPES))
+        leads, lead_cum = weighted([(0, 50), (1, 15), (3, 12), (7, 10), (14, 8), (30, 5)])
+        for first_id, size in self._batches(self.counts['Lift_Tickets']):
+            pass_draw = rng.choices(pass_ids, cum_weights=pass_cum, k=size)
+            day_draw = cal.sample(rng, size)
+            lead_draw = rng.choices(leads, cum_weights=lead_cum, k=size)
+            customers = self._customer_ids(size)
+            rows = []
+            for offset in range(size):
+                _, _, price, _, duration, season, _ = PASS_TYPES[pass_draw[offset] - 1]
+                if season:
+                    valid = cal.start
+                    expires = cal.start + timedelta(days=duration - 1)
+                    purchased = valid - timedelta(days=rng.randint(0, 90))
+                else:
+                    valid = cal.days[day_draw[offset]]
+                    expires = valid + timedelta(days=duration - 1)
+                    purchased = valid - timedelta(days=lead_draw[offset])
+                # chk_valid_date: ValidDate >= DATE(PurchaseDate)
+                sale_price = round(price * 0.85, 2) if rng.random() < 0.1 else price
+
+                roll = rng.random()
+                if roll < 0.02:
+                    status = 'Cancelled'
+                elif expires < cal.as_of:
+                    status = 'Used' if roll < 0.85 else 'Expired'
+                elif valid <= cal.as_of:
+                    status = 'Used' if roll < 0.5 else 'Active'
+                else:
+                    status = 'Active'
+
+                rows.append((
+                    first_id + offset, customers[offset], pass_draw[offset],
+                    fmt_dt(purchased, rng.randint(7, 20), rng.randrange(60)),
+                    valid.isoformat(), expires.isoformat(), sale_price, status,
+                ))
+            yield 'Lift_Tickets', rows
+
+    def lessons_and_enrollments(self):
+        """Lessons and their enrollments; CurrentEnrollment matches the rows."""
+        rng = self.rng
+        cal = self.calendar
+        n_customers = self.counts['Customers']
+        n_instructors = self.counts['Instructors']
+        types = list(LESSON_TYPES)
+        type_cum = list(accumulate(LESSON_TYPES[t][3] for t in types))
+        payments, payment_cum = weighted([('Paid', 85), ('Pending', 8),
+                                          ('Refunded', 4), ('Cancelled', 3)])
+        enrollment_id = 1
+
+        for first_id, size in self._batches(self.counts['Scheduled_Lessons']):
+            type_draw = rng.choices(types, cum_weights=type_cum, k=size)
+            day_draw = cal.sample(rng, size)
+            lessons, enrollments = [], []
+            for offset in range(size):
+                lesson_id = first_id + offset
+                ltype = type_draw[offset]
+                (low, high), price, names, _ = LESSON_TYPES[ltype]
+                day = cal.days[day_draw[offset]]
+                hour = rng.choice([9, 10, 13, 14])
+                capacity = rng.randint(low, high)
+                # chk_enrollment_capacity: CurrentEnrollment <= MaxCapacity
+                enrolled = min(capacity, int(capacity * rng.uniform(0.3, 1.15)))
+                if day < cal.as_of:
+                    status = 'Completed' if rng.random() < 0.95 else 'Cancelled'
+                else:
+                    status = 'Scheduled'
+
+                lessons.append((
+                    lesson_id, rng.randint(1, n_instructors), rng.choice(names),
+                    fmt_dt(day, hour), fmt_dt(day, hour + 2),  # chk_lesson_times
+                    capacity, enrolled, ltype, status, price,
+                ))
+
+                # uk_customer_lesson: distinct customers per lesson
+                students = rng.sample(range(1, n_customers + 1), min(enrolled, n_customers))
+                drawn = rng.choices(payments, cum_weights=payment_cum, k=len(students))
+                for customer_id, payment in zip(students, drawn):
+                    booked = day - timedelta(days=rng.randint(1, 14))
+                    amount = price if payment in ('Paid', 'Refunded') else 0.00
+                    enrollments.append((
+                        enrollment_id, customer_id, lesson_id,
+                        fmt_dt(booked, rng.randint(8, 20)), payment, amount, None,
+                    ))
+                    enrollment_id += 1
+
+            yield 'Scheduled_Lessons', lessons
+            if enrollments:
+                yield 'Enrollments', enrollments
+
+    def rentals_and_items(self):
+        """Rentals and their items; TotalPrice is the sum of the items."""
+        rng = self.rng
+        cal = self.calendar
+        packages, package_cum = weighted(RENTAL_PACKAGES)
+        durations, duration_cum = weighted([(1, 40), (2, 20), (3, 20), (5, 10), (7, 10)])
+        item_id = 1
+
+        for first_id, size in self._batches(self.counts['Rentals']):
+            package_draw = rng.choices(packages, cum_weights=package_cum, k=size)
+            day_draw = cal.sample(rng, size)
+            duration_draw = rng.choices(durations, cum_weights=duration_cum, k=size)
+            customers = self._customer_ids(size)
+            rentals, items = [], []
+            for offset in range(size):
+                rental_id = first_id + offset
+                days = duration_draw[offset]
+                day = cal.days[day_draw[offset]]
+                hour = rng.randint(8, 11)
+                rented = datetime(day.year, day.month, day.day, hour, rng.randrange(60))
+                expected = rented + timedelta(days=days)  # chk_return_dates
+
+                total = 0.0
+                for etype in package_draw[offset]:
+                    pool = self.equipment_by_type.get(etype)
+                    if not pool:
+                        continue
+                    daily_rate = EQUIPMENT_TYPES[etype][0]
+                    # Same arithmetic as fn_calculate_rental_price
+                    unit_price = daily_rate * days
+                    if days >= LONG_RENTAL_DAYS:
+                        unit_price *= 1 - LONG_RENTAL_DISCOUNT
+                    unit_price = round(unit_price, 2)
+                    items.append((item_id, rental_id, rng.choice(pool), 1, unit_price))
+                    item_id += 1
+                    total += unit_price
+
+                if expected < datetime.combine(cal.as_of, datetime.min.time()):
+                    roll = rng.random()
+                    if roll < 0.95:
+                        status = 'Returned'
+                        returned = expected - timedelta(hours=rng.randint(0, 8))
+                        actual = max(returned, rented).strftime('%Y-%m-%d %H:%M:%S')
+                    else:
+                        status = 'Overdue' if roll < 0.99 else 'Lost'
+                        actual = None
+                else:
+                    status, actual = 'Active', None
+
+                rentals.append((
+                    rental_id, customers[offset],
+                    rented.strftime('%Y-%m-%d %H:%M:%S'),
+                    expected.strftime('%Y-%m-%d %H:%M:%S'),
+                    actual, round(total, 2), status,
+                ))
+            yield 'Rentals', rentals
+            yield 'Rental_Items', items
+
+    def _maintenance_dates(self):
+        """(status, scheduled, started, completed) honoring the date CHECKs."""
+        rng = self.rng
+        cal = self.calendar
+        day = cal.days[cal.sample(rng, 1)[0]]
+        scheduled = datetime(day.year, day.month, day.day, rng.randint(4, 16))
+        if day >= cal.as_of:
+            return 'Scheduled', scheduled, None, None
+        statuses, cum = weighted(MAINTENANCE_STATUS)
+        status = rng.choices(statuses, cum_weights=cum)[0]
+        if status == 'Cancelled':
+            return status, scheduled, None, None
+        started = scheduled + timedelta(minutes=rng.randint(0, 120))
+        if status == 'In Progress':
+            return status, scheduled, started, None
+        return status, scheduled, started, started + timedelta(hours=rng.randint(1, 8))
+
+    @staticmethod
+    def _fmt_opt(value):
+        return value.strftime('%Y-%m-%d %H:%M:%S') if value else None
+
+    def maintenance_logs(self):
+        rng = self.rng
+        n_staff = self.counts['Maintenance_Staff']
+        fmt = self._fmt_opt
+
+        for first_id, size in self._batches(self.counts['Lift_Maintenance_Logs']):
+            rows = []
+            for log_id in range(first_id, first_id + size):
+                status, scheduled, started, completed = self._maintenance_dates()
+                estimate = round(rng.uniform(100, 5000), 2)
+                rows.append((
+                    log_id, rng.randint(1, self.counts['Lifts']), rng.randint(1, n_staff),
+                    rng.choice(['Routine', 'Routine', 'Inspection', 'Repair', 'Emergency']),
+                    'Lift maintenance task',
+                    rng.choice(['Low', 'Medium', 'High', 'Critical']), status,
+                    fmt(scheduled), fmt(started), fmt(completed), estimate,
+                    round(estimate * rng.uniform(0.8, 1.3), 2) if completed else None, None,
+                ))
+            yield 'Lift_Maintenance_Logs', rows
+
+        n_equipment = self.counts['Equipment']
+        for first_id, size in self._batches(self.counts['Equipment_Maintenance_Logs']):
+            rows = []
+            for log_id in range(first_id, first_id + size):
+                status, scheduled, started, completed = self._maintenance_dates()
+                rows.append((
+                    log_id, rng.randint(1, n_equipment), rng.randint(1, n_staff),
+                    rng.choice(['Routine', 'Routine', 'Inspection', 'Repair', 'Replacement']),
+                    'Equipment tune-up', rng.choice(['Low', 'Medium', 'High']), status,
+                    fmt(scheduled), fmt(started), fmt(completed),
+                    round(rng.uniform(5, 150), 2), rng.choice([None, 'Wax', 'Edge file']), None,
+                ))
+            yield 'Equipment_Maintenance_Logs', rows
+
+        for first_id, size in self._batches(self.counts['Trail_Maintenance_Logs']):
+            rows = []
+            for log_id in range(first_id, first_id + size):
+                status, scheduled, started, completed = self._maintenance_dates()
+                rows.append((
+                    log_id, rng.randint(1, self.counts['Trails']), rng.randint(1, n_staff),
+                    rng.choice(['Grooming', 'Grooming', 'Snow Making', 'Repair',
+                                'Safety Inspection', 'Signage']),
+                    'Trail maintenance task', rng.choice(['Low', 'Medium', 'High']), status,
+                    fmt(scheduled), fmt(started), fmt(completed),
+                    rng.choice(['Clear', 'Snowing', 'Overcast', 'Windy']),
+                    rng.randint(0, 250),  # chk_snow_depth
+                    round(rng.uniform(50, 2000), 2), None,
+                ))
+            yield 'Trail_Maintenance_Logs', rows
+
+    def generate(self):
+        """Yield (table, rows) batches for every table, parents first."""
+        yield from self.customers()
+        yield from self.pass_types()
+        yield from self.instructors()
+        yield from self.trails()
+        yield from self.lifts()
+        yield from self.lift_access()
+        yield from self.equipment()
+        yield from self.rental_rates()
+        yield from self.maintenance_staff()
+        yield from self.lift_tickets()
+        yield from self.lessons_and_enrollments()
+        yield from self.rentals_and_items()
+        yield from self.maintenance_logs()
+
+
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+
+def sql_literal(value):
+    """Render a Python value as a MySQL literal."""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    if isinstance(value, int):
+        return str(value)
+    return "'" + value.replace('\\', '\\\\').replace("'", "''") + "'"
+
+
+def write_sql(batches, out):
+    """Write batches as multi-row INSERT statements. Returns rows per table."""
+    counts = {}
+    out.write("-- Generated by scripts/generate.py\n")
+    out.write("USE ski_resort;\n\n")
+    out.write("SET FOREIGN_KEY_CHECKS = 0;\n\n")
+
+    for table, rows in batches:
+        if not rows:
+            continue
+        columns = ', '.join(TABLE_COLUMNS[table])
+        values = ',\n'.join(
+            '(' + ', '.join(sql_literal(v) for v in row) + ')' for row in rows
+        )
+        out.write(f"INSERT INTO {table} ({columns}) VALUES\n{values};\n\n")
+        counts[table] = counts.get(table, 0) + len(rows)
+
+    out.write("SET FOREIGN_KEY_CHECKS = 1;\n")
+    return counts
+
+
+_TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def tsv_field(value):
+    """Render a Python value for LOAD DATA (default escapes, \\N for NULL)."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    if isinstance(value, int):
+        return str(value)
+    return value.translate(_TSV_ESCAPES)
+
+
+def write_tsv(batches, out_dir):
+    """
+    Write one <Table>.tsv per table into out_dir. The first line of each file
+    holds the column names. Returns rows per table.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    files = {}
+    counts = {}
+    try:
+        for table, rows in batches:
+            if not rows:
+                continue
+            out = files.get(table)
+            if out is None:
+                out = open(out_dir / f"{table}.tsv", 'w', encoding='utf-8',
+                           newline='\n', buffering=1024 * 1024)
+                out.write('\t'.join(TABLE_COLUMNS[table]) + '\n')
+                files[table] = out
+            out.writelines(
+                '\t'.join(tsv_field(v) for v in row) + '\n' for row in rows
+            )
+            counts[table] = counts.get(table, 0) + len(rows)
+    finally:
+        for out in files.values():
+            out.close()
+    return counts
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate synthetic ski_resort data")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="Volume multiplier (1 = ~100k tickets, 25k rentals)")
+    parser.add_argument('--seed', type=int, default=345, help="Random seed")
+    parser.add_argument('--season-start', default=DEFAULT_SEASON_START,
+                        help="First day of the generated season (YYYY-MM-DD)")
+    parser.add_argument('--batch-rows', type=int, default=DEFAULT_BATCH_ROWS,
+                        help="Rows per INSERT statement")
+    parser.add_argument('--format', choices=['sql', 'tsv'], default='sql',
+                        help="sql: INSERT statements; tsv: one file per table")
+    parser.add_argument('--output', type=Path,
+                        help="Output .sql file (default: stdout) or, for tsv, directory")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    generator = DataGenerator(args.scale, args.seed, args.season_start, args.batch_rows)
+    started = datetime.now()
+
+    if args.format == 'tsv':
+        if not args.output:
+            print("--format tsv requires --output DIR", file=sys.stderr)
+            sys.exit(2)
+        counts = write_tsv(generator.generate(), args.output)
+    elif args.output:
+        with open(args.output, 'w', encoding='utf-8', buffering=1024 * 1024) as out:
+            counts = write_sql(generator.generate(), out)
+    else:
+        counts = write_sql(generator.generate(), sys.stdout)
+
+    elapsed = (datetime.now() - started).total_seconds()
+    total = sum(counts.values())
+    print(f"Generated {total:,} rows in {elapsed:.1f}s", file=sys.stderr)
+    for table, count in counts.items():
+        print(f"  {table:<30} {count:>12,}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -11,12 +11,22 @@ IMPORTANT: This script is IDEMPOTENT - it drops and recreates the database
 ============================================================================
 """
 
+import argparse
 import os
+import re
 import sys
-import mysql.connector
+import time
 from mysql.connector import Error
+from mysql.connector.pooling import CNX_POOL_MAXSIZE
 from pathlib import Path
 
+from db import Database
+from load_graph import LoadGraph, run_statements, run_task_graph, summarize_phases
+from migrate import (CHECKSUM_TABLE, MigrationError, apply_change, change_statements,
+                     plan_migration, record_baseline)
+from sql_lexer import iter_sql_statements
+from sql_objects import build_alter_statements, parse_index_definitions
+
 # ANSI color codes
 class Colors:
     RED = '\033[0;31m'
@@ -39,6 +49,15 @@ SCRIPT_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPT_DIR.parent
 SQL_DIR = PROJECT_ROOT / 'sql'
 
+# Every connection comes from one pool opened without a default database
+# (the schema file creates it); steps that need it ask for it on checkout
+SERVER_CONFIG = {key: value for key, value in DB_CONFIG.items() if key != 'database'}
+SERVER = Database(SERVER_CONFIG, 'ski_resort_load', allow_local_infile=True)
+
+# Batch mode: upper bound for one multi-statement packet (well below the
+# server's default max_allowed_packet of 64MB)
+MAX_PACKET_BYTES = 4 * 1024 * 1024
+
 def print_header(message):
     """Print a formatted header"""
     print(f"{Colors.BLUE}{'=' * 76}{Colors.NC}")
@@ -62,16 +81,11 @@ def check_mysql_connection():
     print_info("Checking MySQL connection...")
 
     try:
-        # Try to connect without database first
-        config = DB_CONFIG.copy()
-        config.pop('database', None)
-
-        connection = mysql.connector.connect(**config)
-
-        if connection.is_connected():
-            print_success("MySQL connection successful")
-            connection.close()
-            return True
+        # Connect without database first
+        with SERVER.connection() as connection:
+            if connection.is_connected():
+                print_success("MySQL connection successful")
+                return True
     except Error as e:
         print_error(f"Cannot connect to MySQL: {e}")
         print_info("Please check your MySQL credentials and ensure MySQL is running")
@@ -83,19 +97,14 @@ def drop_database():
     print_info("Ensuring clean slate by dropping existing database...")
 
     try:
-        # Connect without specifying database
-        config = DB_CONFIG.copy()
-        config.pop('database', None)
+        with SERVER.connection() as connection:
+            cursor = connection.cursor()
 
-        connection = mysql.connector.connect(**config)
-        cursor = connection.cursor()
-
-        # Drop database if exists
-        cursor.execute(f"DROP DATABASE IF EXISTS {DB_CONFIG['database']}")
+            # Drop database if exists
+            cursor.execute(f"DROP DATABASE IF EXISTS {DB_CONFIG['database']}")
 
-        connection.commit()
-        cursor.close()
-        connection.close()
+            connection.commit()
+            cursor.close()
 
         print_success("Database dropped (if it existed) - starting fresh")
         return True
@@ -104,6 +113,14 @@ def drop_database():
         print_error(f"Failed to drop database: {e}")
         return False
 
+def is_ignorable_error(error):
+    """Return True for errors that are expected on re-runs (DROP IF EXISTS, etc.)"""
+    error_msg = str(error).lower()
+    return not ('already exists' not in error_msg and
+                'unknown database' not in error_msg and
+                'duplicate entry' not in error_msg and
+                'table' not in error_msg or 'doesn\'t exist' not in error_msg)
+
 def execute_sql_file(filepath, description):
     """Execute a SQL file"""
     print_info(f"Executing: {description}")
@@ -113,82 +130,23 @@ def execute_sql_file(filepath, description):
         return False
     
     try:
-        # Read SQL file
-        with open(filepath, 'r', encoding='utf-8') as f:
-            sql_content = f.read()
-        
-        # Connect to MySQL
-        config = DB_CONFIG.copy()
-        # Don't specify database for schema creation
-        if 'schema' in filepath.name:
-            config.pop('database', None)
-        
-        connection = mysql.connector.connect(**config, allow_local_infile=True)
+        # Don't select the database for schema creation
+        database = None if 'schema' in filepath.name else DB_CONFIG['database']
+
+        connection = SERVER.checkout(database)
         cursor = connection.cursor()
         
         # Consume any unread results
         if connection.unread_result:
             cursor.fetchall()
         
-        # Split SQL content into individual statements with proper DELIMITER handling
-        statements = []
-        current_statement = ''
-        delimiter = ';'
-        
-        lines = sql_content.split('\n')
-        i = 0
-        
-        while i < len(lines):
-            line = lines[i].strip()
-            
-            # Skip empty lines and comments
-            if not line or line.startswith('--'):
-                i += 1
-                continue
-            
-            # Handle DELIMITER changes
-            if line.upper().startswith('DELIMITER'):
-                # Save any current statement before changing delimiter
-                if current_statement.strip():
-                    statements.append(current_statement.strip())
-                    current_statement = ''
-                
-                # Change delimiter
-                if len(line.split()) > 1:
-                    delimiter = line.split()[1]
-                i += 1
-                continue
-            
-            # Add line to current statement
-            current_statement += line + '\n'
-            
-            # Check if statement ends with current delimiter
-            if line.endswith(delimiter):
-                # Remove the delimiter from the statement
-                stmt = current_statement.rstrip()
-                if stmt.endswith(delimiter):
-                    stmt = stmt[:-len(delimiter)].strip()
-                
-                if stmt:
-                    statements.append(stmt)
-                current_statement = ''
-            
-            i += 1
-        
-        # Add any remaining statement
-        if current_statement.strip():
-            final_stmt = current_statement.strip()
-            if final_stmt.endswith(delimiter):
-                final_stmt = final_stmt[:-len(delimiter)].strip()
-            if final_stmt:
-                statements.append(final_stmt)
-        
-        # Execute each statement
-        for statement in statements:
+        # Stream statements from the file (DELIMITER, quote and comment aware)
+        for statement in iter_sql_statements(filepath):
+            statement = statement.text
             if statement.strip():
                 try:
                     # Execute and commit immediately for each statement
-                    cursor.execute(statement)
+                    SERVER.timed_execute(cursor, statement)
                     
                     # Consume any unread results
                     while cursor.nextset():
@@ -198,11 +156,7 @@ def execute_sql_file(filepath, description):
                     connection.commit()
                 except Error as e:
                     # Some statements might fail silently (like DROP IF EXISTS)
-                    error_msg = str(e).lower()
-                    if ('already exists' not in error_msg and 
-                        'unknown database' not in error_msg and 
-                        'duplicate entry' not in error_msg and
-                        'table' not in error_msg or 'doesn\'t exist' not in error_msg):
+                    if not is_ignorable_error(e):
                         print_error(f"Error executing statement: {e}")
                         print_error(f"Statement: {statement[:100]}...")
                         cursor.close()
@@ -219,19 +173,425 @@ def execute_sql_file(filepath, description):
         print_error(f"{description} failed: {e}")
         return False
 
+def get_batch_connection():
+    """
+    Get the pooled connection shared by every file in batch mode.
+
+    It is checked out without a default database because the schema file
+    creates it; later files select it with USE.
+    """
+    connection = SERVER.checkout()
+    connection.autocommit = False
+    return connection
+
+def build_statement_packets(statements, max_packet_bytes=MAX_PACKET_BYTES):
+    """
+    Group lexer Statements into multi-statement packets.
+
+    Consecutive ';' statements are joined into one packet of at most
+    max_packet_bytes. Routine and trigger bodies (declared under a custom
+    DELIMITER) and CALLs, which may return several result sets, are always
+    sent on their own. Yields (sql, statements).
+    """
+    packet = []
+    packet_bytes = 0
+
+    for statement, delimiter, _ in statements:
+        size = len(statement.encode('utf-8')) + 2
+
+        if delimiter != ';' or re.match(r"CALL\b", statement.lstrip(), re.IGNORECASE):
+            if packet:
+                yield ';\n'.join(packet), packet
+                packet, packet_bytes = [], 0
+            yield statement, [statement]
+            continue
+
+        if packet and packet_bytes + size > max_packet_bytes:
+            yield ';\n'.join(packet), packet
+            packet, packet_bytes = [], 0
+
+        packet.append(statement)
+        packet_bytes += size
+
+    if packet:
+        yield ';\n'.join(packet), packet
+
+def execute_sql_file_batch(connection, filepath, description, chunk_size=0):
+    """
+    Execute a SQL file over a shared connection using multi-statement packets.
+
+    Commits once per file, or once every chunk_size statements when
+    chunk_size > 0, instead of once per statement.
+    """
+    print_info(f"Executing (batch): {description}")
+
+    if not filepath.exists():
+        print_error(f"File not found: {filepath}")
+        return False
+
+    try:
+        cursor = connection.cursor()
+
+        # Files after the schema rely on the database it creates
+        if 'schema' not in filepath.name:
+            cursor.execute(f"USE {DB_CONFIG['database']}")
+
+        statements = iter_sql_statements(filepath)
+        executed = 0
+        uncommitted = 0
+        packets = 0
+
+        for packet, packet_statements in build_statement_packets(statements):
+            # The server stops a packet at its first failing statement, so
+            # count results to know where; each statement returns one
+            count = 0
+            try:
+                SERVER.timed_execute(cursor, packet)
+                count = 1
+
+                # Drain every result set in the packet
+                while cursor.nextset():
+                    count += 1
+                count = len(packet_statements)
+            except Error as e:
+                if not is_ignorable_error(e):
+                    connection.rollback()
+                    print_error(f"Error executing statement: {e}")
+                    print_error(f"Statement: {packet_statements[count][:100]}...")
+                    cursor.close()
+                    return False
+
+                # Skip only the failing statement, as per-statement mode
+                # does, and run the rest of the packet one at a time
+                for statement in packet_statements[count + 1:]:
+                    try:
+                        SERVER.timed_execute(cursor, statement)
+                        while cursor.nextset():
+                            pass
+                        count += 1
+                    except Error as e:
+                        if not is_ignorable_error(e):
+                            connection.rollback()
+                            print_error(f"Error executing statement: {e}")
+                            print_error(f"Statement: {statement[:100]}...")
+                            cursor.close()
+                            return False
+
+            executed += count
+            uncommitted += count
+            packets += 1
+
+            if chunk_size and uncommitted >= chunk_size:
+                connection.commit()
+                uncommitted = 0
+
+        connection.commit()
+        cursor.close()
+
+        print_success(f"{description} completed ({executed} statements in {packets} packets)")
+        return True
+
+    except Error as e:
+        connection.rollback()
+        print_error(f"{description} failed: {e}")
+        return False
+
+def read_tsv_columns(path):
+    """Return the column names from the header line of a generated TSV file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.readline().rstrip('\n').split('\t')
+
+def load_tsv_file(connection, path):
+    """
+    LOAD DATA one generated <Table>.tsv into its table and commit.
+
+    unique_checks and foreign_key_checks are relaxed for the session (the
+    generator emits referentially valid data with explicit keys). Returns
+    the number of rows loaded.
+    """
+    columns = ', '.join(read_tsv_columns(path))
+    infile = path.resolve().as_posix().replace("'", "\\'")
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SET SESSION unique_checks = 0")
+        cursor.execute("SET SESSION foreign_key_checks = 0")
+        cursor.execute(f"""
+            LOAD DATA LOCAL INFILE '{infile}'
+            INTO TABLE {path.stem}
+            CHARACTER SET utf8mb4
+            FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+            LINES TERMINATED BY '\\n'
+            IGNORE 1 LINES
+            ({columns})
+        """)
+        connection.commit()
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+def bulk_load_tables(data_dir):
+    """
+    Load every <Table>.tsv in data_dir with LOAD DATA LOCAL INFILE and
+    report rows/sec per table. Checks are restored afterwards.
+    """
+    print_info(f"Bulk loading TSV files from: {data_dir}")
+
+    files = sorted(data_dir.glob('*.tsv'))
+    if not files:
+        print_error(f"No .tsv files found in {data_dir}")
+        return False
+
+    try:
+        connection = SERVER.checkout(DB_CONFIG['database'])
+    except Error as e:
+        print_error(f"Bulk load failed: {e}")
+        return False
+
+    print(f"\n{'Table':<30} {'Rows':>12} {'Seconds':>9} {'Rows/sec':>12}")
+    print("-" * 66)
+
+    total_rows = 0
+    started = time.perf_counter()
+    ok = True
+
+    try:
+        for path in files:
+            table_started = time.perf_counter()
+            rows = load_tsv_file(connection, path)
+            elapsed = time.perf_counter() - table_started
+
+            total_rows += rows
+            rate = rows / elapsed if elapsed > 0 else 0
+            print(f"{path.stem:<30} {rows:>12,} {elapsed:>9.2f} {rate:>12,.0f}")
+
+    except Error as e:
+        connection.rollback()
+        print_error(f"Bulk load of {path.name} failed: {e}")
+        if 'local' in str(e).lower():
+            print_info("LOAD DATA LOCAL must be enabled on the server: SET GLOBAL local_infile = 1")
+        ok = False
+
+    finally:
+        cursor = connection.cursor()
+        cursor.execute("SET SESSION unique_checks = 1")
+        cursor.execute("SET SESSION foreign_key_checks = 1")
+        cursor.close()
+        connection.close()
+
+    if ok:
+        elapsed = time.perf_counter() - started
+        rate = total_rows / elapsed if elapsed > 0 else 0
+        print("-" * 66)
+        print(f"{'Total':<30} {total_rows:>12,} {elapsed:>9.2f} {rate:>12,.0f}")
+        print()
+        print_success("Bulk data load completed")
+    return ok
+
+def build_indexes(filepath):
+    """
+    Build the indexes declared in 06_indexes.sql with one ALTER TABLE per
+    table, so each table is scanned once instead of once per index.
+    """
+    print_info(f"Building indexes from: {filepath.name}")
+
+    if not filepath.exists():
+        print_error(f"File not found: {filepath}")
+        return False
+
+    try:
+        connection = SERVER.checkout(DB_CONFIG['database'])
+        cursor = connection.cursor()
+    except Error as e:
+        print_error(f"Index build failed: {e}")
+        return False
+
+    print(f"\n{'Table':<30} {'Indexes':>8} {'Seconds':>9}")
+    print("-" * 49)
+
+    built = 0
+    try:
+        for table, indexes, statement in build_alter_statements(parse_index_definitions(filepath)):
+            started = time.perf_counter()
+            SERVER.timed_execute(cursor, statement)
+            elapsed = time.perf_counter() - started
+            built += len(indexes)
+            print(f"{table:<30} {len(indexes):>8} {elapsed:>9.2f}")
+    except Error as e:
+        print_error(f"Index build failed on {table}: {e}")
+        cursor.close()
+        connection.close()
+        return False
+
+    cursor.close()
+    connection.close()
+
+    print()
+    print_success(f"Index creation completed ({built} indexes)")
+    return True
+
+def parallel_setup(args):
+    """
+    Build the task graph for every setup file and run it on args.workers
+    connections: tables, then per-table loads, views and routines, then
+    per-table index builds, then triggers. Prints a line per finished task
+    and a timing breakdown per phase.
+    """
+    print_info(f"Building task graph ({args.workers} workers)")
+
+    graph = LoadGraph()
+    try:
+        prelude = graph.add_schema(SQL_DIR / '01_schema.sql')
+        if args.bulk_dir:
+            graph.add_tsv_data(args.bulk_dir, load_tsv_file)
+        else:
+            graph.add_sql_data(args.seed_file)
+        for filename in ('03_views.sql', '04_functions.sql', '05_triggers.sql',
+                         '09_snapshots.sql'):
+            if (SQL_DIR / filename).exists():
+                graph.add_objects(SQL_DIR / filename)
+        if (SQL_DIR / '06_indexes.sql').exists():
+            graph.add_indexes(SQL_DIR / '06_indexes.sql')
+        graph.validate()
+    except (OSError, ValueError) as e:
+        print_error(f"Cannot build task graph: {e}")
+        return False
+
+    print_success(f"{len(graph.tasks)} tasks")
+
+    # DROP/CREATE DATABASE run first, before any worker selects the database
+    try:
+        with SERVER.connection() as connection:
+            run_statements(prelude)(connection)
+    except Error as e:
+        print_error(f"Database creation failed: {e}")
+        return False
+
+    def connect():
+        return SERVER.checkout(DB_CONFIG['database'])
+
+    def report(timing):
+        rows = f"{timing.rows:>12,}" if timing.rows else f"{'':>12}"
+        print(f"  {timing.key:<45} {rows} {timing.elapsed:>9.2f}s")
+
+    started = time.perf_counter()
+    timings, error = run_task_graph(graph, args.workers, connect, on_done=report)
+    elapsed = time.perf_counter() - started
+
+    if error is not None:
+        key, e = error
+        print_error(f"Task {key} failed: {e}")
+        if key.startswith('data:') and 'local' in str(e).lower():
+            print_info("LOAD DATA LOCAL must be enabled on the server: SET GLOBAL local_infile = 1")
+        return False
+
+    # Wall time is first start to last finish of the phase; busy time is
+    # the sum over tasks, so busy / wall is the parallelism achieved
+    print(f"\n{'Phase':<12} {'Tasks':>6} {'Rows':>12} {'Wall (s)':>9} {'Busy (s)':>9} {'Parallel':>9}")
+    print("-" * 62)
+    for phase, count, wall, busy, rows in summarize_phases(timings):
+        parallel = busy / wall if wall > 0 else 1.0
+        print(f"{phase:<12} {count:>6} {rows:>12,} {wall:>9.2f} {busy:>9.2f} {parallel:>8.1f}x")
+    print("-" * 62)
+    print(f"{'Total':<12} {len(timings):>6} {'':>12} {elapsed:>9.2f}")
+    print()
+    print_success("Parallel setup completed")
+    return True
+
+def record_checksums():
+    """Record object checksums after a full load so --migrate has a baseline"""
+    try:
+        connection = SERVER.checkout(DB_CONFIG['database'])
+        recorded = record_baseline(connection, SQL_DIR)
+        connection.close()
+        print_success(f"Recorded checksums for {recorded} objects")
+        return True
+    except Error as e:
+        print_error(f"Recording checksums failed: {e}")
+        return False
+
+def migrate_database(dry_run=False):
+    """
+    Re-apply only the views, routines, indexes and triggers whose definition
+    changed since the last load, without dropping the database.
+    """
+    try:
+        connection = SERVER.checkout(DB_CONFIG['database'])
+    except Error as e:
+        print_error(f"Migration failed: {e}")
+        return False
+
+    try:
+        changes, unchanged_files = plan_migration(connection, SQL_DIR)
+    except (Error, MigrationError) as e:
+        connection.close()
+        print_error(f"Migration failed: {e}")
+        return False
+
+    for filename in unchanged_files:
+        print_info(f"{filename}: unchanged")
+
+    objects = [c for c in changes if c.action != 'file']
+    if not objects:
+        print_success("Database is up to date")
+    else:
+        print(f"\n{'Action':<8} {'Object':<50} {'ms':>8}")
+        print("-" * 68)
+
+    started = time.perf_counter()
+    for change in changes:
+        label = change.key.split(':', 1)[1]
+        if dry_run:
+            if change.action != 'file':
+                print(f"{change.action:<8} {change.object_type.lower()} {label}")
+                for statement in change_statements(change):
+                    print(f"         {statement.splitlines()[0][:60]}")
+            continue
+        try:
+            elapsed = apply_change(connection, change)
+        except Error as e:
+            connection.rollback()
+            connection.close()
+            print_error(f"Applying {change.key} failed: {e}")
+            return False
+        if change.action != 'file':
+            print(f"{change.action:<8} {change.object_type.lower() + ' ' + label:<50} "
+                  f"{elapsed * 1000:>8.1f}")
+
+    connection.close()
+
+    if objects and not dry_run:
+        print("-" * 68)
+        print(f"{'Total':<59} {(time.perf_counter() - started) * 1000:>8.1f}")
+        print()
+        print_success(f"Migration applied ({len(objects)} objects)")
+    elif dry_run:
+        print()
+        print_info("Dry run: nothing applied")
+    return True
+
+def print_connection_stats():
+    """Print connect/checkout/query latency for the shared pool"""
+    print()
+    print(f"{'Connection':<12} {'Count':>8} {'Total ms':>10} {'Avg ms':>9}")
+    print("-" * 42)
+    for kind, count, total_ms, avg_ms in SERVER.stats.rows():
+        print(f"{kind:<12} {count:>8} {total_ms:>10.1f} {avg_ms:>9.2f}")
+
 def verify_database():
     """Verify database setup"""
     print_info("Verifying database setup...")
     
     try:
-        connection = mysql.connector.connect(**DB_CONFIG)
+        connection = SERVER.checkout(DB_CONFIG['database'])
         cursor = connection.cursor()
         
         # Get object counts
         cursor.execute(f"""
             SELECT 
                 (SELECT COUNT(*) FROM information_schema.tables 
-                 WHERE table_schema = '{DB_CONFIG['database']}') AS tables,
+                 WHERE table_schema = '{DB_CONFIG['database']}'
+                 AND table_name <> '{CHECKSUM_TABLE}') AS tables,
                 (SELECT COUNT(*) FROM information_schema.views 
                  WHERE table_schema = '{DB_CONFIG['database']}') AS views,
                 (SELECT COUNT(*) FROM information_schema.routines 
@@ -254,7 +614,10 @@ def verify_database():
         tables = ['Customers', 'Pass_Types', 'Instructors', 'Trails', 'Lifts',
                  'Lift_Access', 'Equipment', 'Lift_Tickets', 'Scheduled_Lessons',
                  'Rentals', 'Enrollments', 'Rental_Items', 'Maintenance_Staff',
-                 'Lift_Maintenance_Logs', 'Equipment_Maintenance_Logs', 'Trail_Maintenance_Logs']
+                 'Lift_Maintenance_Logs', 'Equipment_Maintenance_Logs', 'Trail_Maintenance_Logs',
+                 'Daily_Revenue', 'Equipment_Inventory', 'Rental_Rates',
+                 'Lift_Tickets_Archive', 'Rentals_Archive', 'Rental_Items_Archive',
+                 'Lift_Scans']
         
         print(f"\n{'Table':<30} {'Row Count':>10}")
         print("-" * 42)
@@ -277,8 +640,59 @@ def verify_database():
         print_error(f"Verification failed: {e}")
         return False
 
+def parse_args():
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description="Ski Resort database setup")
+    parser.add_argument(
+        '--batch', action='store_true',
+        help="Reuse one pooled connection and send multi-statement packets"
+    )
+    parser.add_argument(
+        '--chunk-size', type=int, default=0, metavar='N',
+        help="Batch mode: commit every N statements (default: once per file)"
+    )
+    parser.add_argument(
+        '--seed-file', type=Path, default=SQL_DIR / '02_seed.sql', metavar='PATH',
+        help="Data file to load instead of 02_seed.sql (e.g. from generate.py)"
+    )
+    parser.add_argument(
+        '--bulk-dir', type=Path, metavar='DIR',
+        help="Bulk mode: LOAD DATA every <Table>.tsv in DIR (generate.py --format tsv), "
+             "then build indexes per table and create triggers last"
+    )
+    parser.add_argument(
+        '--workers', type=int, default=1, metavar='N',
+        help="Run independent tables, loads, views, routines and index builds "
+             "concurrently on N connections (default: 1, serial)"
+    )
+    parser.add_argument(
+        '--migrate', action='store_true',
+        help="Keep the database and re-apply only views, routines, indexes and "
+             "triggers whose checksum changed since the last load"
+    )
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help="With --migrate: print the changes without applying them"
+    )
+    args = parser.parse_args()
+    if args.migrate and (args.batch or args.bulk_dir or args.workers > 1):
+        parser.error("--migrate cannot be combined with --batch, --bulk-dir or --workers")
+    if args.dry_run and not args.migrate:
+        parser.error("--dry-run requires --migrate")
+    if not 1 <= args.workers <= CNX_POOL_MAXSIZE:
+        parser.error(f"--workers must be between 1 and {CNX_POOL_MAXSIZE}")
+    if args.workers > 1 and args.batch:
+        parser.error("--workers and --batch cannot be combined")
+    return args
+
 def main():
     """Main execution"""
+    args = parse_args()
+
+    # One connection per worker; batch mode holds one while steps such as
+    # verification check out another
+    SERVER.pool_size = max(args.workers, 2)
+
     print_header("Ski Resort Management System - Database Setup")
     
     print()
@@ -287,12 +701,30 @@ def main():
     print(f"  Host: {DB_CONFIG['host']}:{DB_CONFIG['port']}")
     print(f"  User: {DB_CONFIG['user']}")
     print(f"  SQL Directory: {SQL_DIR}")
+    if args.bulk_dir:
+        print(f"  Bulk Data Directory: {args.bulk_dir}")
+    else:
+        print(f"  Seed File: {args.seed_file}")
+    if args.batch:
+        commit_policy = (f"every {args.chunk_size} statements" if args.chunk_size
+                         else "once per file")
+        print(f"  Mode: batch (commit {commit_policy})")
+    if args.workers > 1:
+        print(f"  Mode: parallel ({args.workers} workers)")
     print()
     
     # Check MySQL connection
     if not check_mysql_connection():
         sys.exit(1)
 
+    if args.migrate:
+        print()
+        print_header("Migration: applying changed objects")
+        if not migrate_database(args.dry_run):
+            sys.exit(1)
+        print()
+        return
+
     # Drop existing database for idempotent behavior
     print()
     print_header("Step 0: Dropping Existing Database (if exists)")
@@ -301,32 +733,85 @@ def main():
         print_error("Setup failed!")
         sys.exit(1)
 
-    # Execute SQL files in order
-    sql_files = [
-        (SQL_DIR / '01_schema.sql', 'Schema creation (tables, constraints)'),
-        (SQL_DIR / '02_seed.sql', 'Sample data insertion'),
-    ]
-    
-    # Add optional files if they exist
-    optional_files = [
-        (SQL_DIR / '03_views.sql', 'View creation'),
-        (SQL_DIR / '04_functions.sql', 'Functions and stored procedures'),
-        (SQL_DIR / '05_triggers.sql', 'Trigger creation'),
-        (SQL_DIR / '06_indexes.sql', 'Index creation'),
-    ]
-    
-    # Add optional files if they exist
-    for filepath, description in optional_files:
-        if filepath.exists():
-            sql_files.append((filepath, description))
+    # Steps in order: (path, description, kind)
+    if args.workers > 1:
+        steps = [(None, 'Parallel setup (task graph)', 'parallel')]
+    elif args.bulk_dir:
+        # Data first, then views/routines, then every index in one pass per
+        # table, and triggers last so they never fire during the load
+        steps = [
+            (SQL_DIR / '01_schema.sql', 'Schema creation (tables, constraints)', 'sql'),
+            (args.bulk_dir, 'Bulk data load (LOAD DATA LOCAL INFILE)', 'bulk'),
+            (SQL_DIR / '03_views.sql', 'View creation', 'sql'),
+            (SQL_DIR / '04_functions.sql', 'Functions and stored procedures', 'sql'),
+            (SQL_DIR / '06_indexes.sql', 'Index creation (one ALTER TABLE per table)', 'indexes'),
+            (SQL_DIR / '05_triggers.sql', 'Trigger creation', 'sql'),
+            (SQL_DIR / '09_snapshots.sql', 'Reporting snapshots and refresh event', 'sql'),
+        ]
+    else:
+        steps = [
+            (SQL_DIR / '01_schema.sql', 'Schema creation (tables, constraints)', 'sql'),
+            (args.seed_file, 'Sample data insertion', 'sql'),
+        ]
+        
+        # Add optional files if they exist
+        optional_files = [
+            (SQL_DIR / '03_views.sql', 'View creation'),
+            (SQL_DIR / '04_functions.sql', 'Functions and stored procedures'),
+            (SQL_DIR / '05_triggers.sql', 'Trigger creation'),
+            (SQL_DIR / '06_indexes.sql', 'Index creation'),
+            (SQL_DIR / '09_snapshots.sql', 'Reporting snapshots and refresh event'),
+        ]
+        
+        for filepath, description in optional_files:
+            if filepath.exists():
+                steps.append((filepath, description, 'sql'))
     
-    for i, (filepath, description) in enumerate(sql_files, 1):
+    connection = None
+    if args.batch:
+        try:
+            connection = get_batch_connection()
+        except Error as e:
+            print_error(f"Cannot open batch connection: {e}")
+            sys.exit(1)
+
+    step_timings = []
+    for i, (filepath, description, kind) in enumerate(steps, 1):
         print()
         print_header(f"Step {i}: {description.split('(')[0].strip()}")
         
-        if not execute_sql_file(filepath, description):
+        step_started = time.perf_counter()
+        if kind == 'parallel':
+            ok = parallel_setup(args)
+        elif kind == 'bulk':
+            ok = bulk_load_tables(filepath)
+        elif kind == 'indexes':
+            ok = build_indexes(filepath)
+        elif connection is not None:
+            ok = execute_sql_file_batch(connection, filepath, description, args.chunk_size)
+        else:
+            ok = execute_sql_file(filepath, description)
+
+        if not ok:
             print_error("Setup failed!")
             sys.exit(1)
+
+        step_timings.append((description.split('(')[0].strip(), time.perf_counter() - step_started))
+
+    if connection is not None:
+        connection.close()
+
+    print()
+    print(f"{'Step':<40} {'Seconds':>9}")
+    print("-" * 50)
+    for description, elapsed in step_timings:
+        print(f"{description:<40} {elapsed:>9.2f}")
+    print("-" * 50)
+    print(f"{'Total':<40} {sum(e for _, e in step_timings):>9.2f}")
+
+    print()
+    if not record_checksums():
+        sys.exit(1)
     
     # Verify setup
     print()
@@ -336,6 +821,8 @@ def main():
         print_error("Verification failed!")
         sys.exit(1)
     
+    print_connection_stats()
+
     print()
     print_header("Setup Complete!")
     print_success(f"Database '{DB_CONFIG['database']}' is ready to use")
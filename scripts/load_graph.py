@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+
+"""
+============================================================================
+Ski Resort Management System - Parallel Load Graph (Python)
+COMP 345 Final Project
+Purpose: Build a dependency graph of the setup work and run it concurrently
+
+Every object defined in the sql/ scripts becomes a task:
+
+    table:<T>     CREATE TABLE (after the tables it references)
+    data:<T>      rows for T (INSERTs or a TSV file), after table:<T>
+    view:<V>      after the tables/views it reads
+    routine:<R>   after the tables and routines it references
+    index:<T>     every index on T in one ALTER TABLE, after data:<T>
+    trigger:<G>   after all data, so triggers never fire during the load
+    event:<E>     after all data and the routines it calls
+    call:<P>:<n>  CALL on line n of an object file (e.g. a summary backfill),
+                  after all data and the routines/views it references
+
+Independent tasks run on a thread pool with one connection per worker.
+Foreign key checks are off during the data phase (as in 02_seed.sql), so
+table loads do not wait on each other.
+============================================================================
+"""
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from sql_lexer import iter_sql_statements
+from sql_objects import (build_alter_statements, classify_statement,
+                         parse_index_definitions, referenced_names)
+
+# key: unique task id; phase: report grouping; deps: keys that must finish
+# first; action: callable(connection) -> rows affected (or None)
+Task = namedtuple('Task', ['key', 'phase', 'deps', 'action'])
+
+# Result of one finished task
+TaskTiming = namedtuple('TaskTiming', ['key', 'phase', 'started', 'elapsed', 'rows'])
+
+PHASES = ['schema', 'data', 'views', 'routines', 'indexes', 'triggers']
+
+_ROUTINE_TYPES = {'FUNCTION', 'PROCEDURE'}
+
+
+# ---------------------------------------------------------------------------
+# Task actions
+# ---------------------------------------------------------------------------
+
+def run_statements(statements, setup=(), teardown=()):
+    """
+    Action that runs setup + statements on one connection, then commits.
+    teardown runs last, also after a failure, to undo session settings
+    made by setup on a pooled connection.
+    """
+    def action(connection):
+        cursor = connection.cursor()
+        rows = 0
+        try:
+            for statement in list(setup) + list(statements):
+                cursor.execute(statement)
+                if cursor.rowcount and cursor.rowcount > 0:
+                    rows += cursor.rowcount
+                while cursor.nextset():
+                    pass
+            connection.commit()
+            for statement in teardown:
+                cursor.execute(statement)
+        except Exception:
+            # Best effort: the original error is the one to report
+            for statement in teardown:
+                try:
+                    cursor.execute(statement)
+                except Exception:
+                    pass
+            raise
+        finally:
+            cursor.close()
+        return rows
+    return action
+
+
+# ---------------------------------------------------------------------------
+# Graph construction
+# ---------------------------------------------------------------------------
+
+def _name_map(names):
+    return {name.lower(): name for name in names}
+
+
+class LoadGraph:
+    """Collects tasks from the SQL files and validates their dependencies."""
+
+    def __init__(self):
+        self.tasks = OrderedDict()
+        self.tables = []
+
+    def add(self, key, phase, deps, action):
+        self.tasks[key] = Task(key, phase, set(deps), action)
+
+    def add_schema(self, filepath):
+        """
+        Add CREATE TABLE tasks. Returns the statements that must run first on
+        a connection without a default database (DROP/CREATE DATABASE).
+        """
+        prelude = []
+        for statement in iter_sql_statements(filepath):
+            info = classify_statement(statement.text)
+            if info.action == 'CREATE' and info.object_type == 'TABLE':
+                self.tables.append(info.name)
+                self.add(f"table:{info.name}", 'schema', (), run_statements([statement.text]))
+            elif info.action == 'USE':
+                continue
+            elif not self.tables:
+                prelude.append(statement.text)
+            else:
+                raise ValueError(f"Unsupported statement in schema file: {statement.text[:60]}")
+
+        # A table waits for the tables its FOREIGN KEYs reference
+        known = _name_map(self.tables)
+        for statement in iter_sql_statements(filepath):
+            info = classify_statement(statement.text)
+            if info.action == 'CREATE' and info.object_type == 'TABLE':
+                refs = referenced_names(statement.text, known) - {info.name}
+                self.tasks[f"table:{info.name}"].deps.update(f"table:{t}" for t in refs)
+        return prelude
+
+    def add_sql_data(self, filepath):
+        """One data task per table from an INSERT script (e.g. 02_seed.sql)."""
+        setup = []
+        teardown = []
+        per_table = OrderedDict()
+        for statement in iter_sql_statements(filepath):
+            info = classify_statement(statement.text)
+            if info.action == 'INSERT':
+                per_table.setdefault(info.table, []).append(statement.text)
+            elif info.action == 'SET':
+                # Session settings (FOREIGN_KEY_CHECKS = 0) apply to every worker
+                if 'FOREIGN_KEY_CHECKS = 1' not in ' '.join(statement.text.upper().split()):
+                    setup.append(statement.text)
+            elif info.action != 'USE':
+                raise ValueError(f"Unsupported statement in {filepath.name}: "
+                                 f"{statement.text[:60]}")
+
+        # Workers are pooled without a session reset, so each data task
+        # re-enables the checks itself rather than leaving them off for
+        # whoever checks the connection out next
+        if any('FOREIGN_KEY_CHECKS' in s.upper() for s in setup):
+            teardown.append("SET FOREIGN_KEY_CHECKS = 1")
+
+        for table, statements in per_table.items():
+            self.add(f"data:{table}", 'data', [f"table:{table}"],
+                     run_statements(statements, setup, teardown))
+
+    def add_tsv_data(self, data_dir, load_tsv):
+        """One data task per <Table>.tsv, loaded by load_tsv(connection, path)."""
+        for path in sorted(data_dir.glob('*.tsv')):
+            table = path.stem
+            self.add(f"data:{table}", 'data', [f"table:{table}"],
+                     lambda connection, path=path: load_tsv(connection, path))
+
+    def add_objects(self, filepath):
+        """Add view, routine, event, trigger and CALL tasks from a SQL file."""
+        tables = _name_map(self.tables)
+        pending_drops = {}
+
+        for statement in iter_sql_statements(filepath):
+            info = classify_statement(statement.text)
+
+            if info.action == 'USE':
+                continue
+            if info.action == 'DROP':
+                pending_drops.setdefault((info.object_type, info.name.lower()), []).append(
+                    statement.text)
+                continue
+            if info.action not in ('CREATE', 'CALL') or info.object_type not in (
+                    {'VIEW', 'TRIGGER', 'EVENT'} | _ROUTINE_TYPES):
+                raise ValueError(f"Unsupported statement in {filepath.name}: "
+                                 f"{statement.text[:60]}")
+
+            views = _name_map(k.split(':', 1)[1] for k in self.tasks if k.startswith('view:'))
+            routines = _name_map(k.split(':', 1)[1] for k in self.tasks
+                                 if k.startswith('routine:'))
+            deps = {f"table:{t}" for t in referenced_names(statement.text, tables)}
+            deps |= {f"view:{v}" for v in referenced_names(statement.text, views)
+                     if v != info.name}
+            deps |= {f"routine:{r}" for r in referenced_names(statement.text, routines)
+                     if r != info.name or info.action == 'CALL'}
+
+            if info.action == 'CALL':
+                # e.g. a summary backfill: runs once all data is loaded
+                deps |= {k for k in self.tasks if k.startswith('data:')}
+                self.add(f"call:{info.name}:{statement.line}", 'triggers', deps,
+                         run_statements([statement.text]))
+                continue
+
+            statements = pending_drops.pop((info.object_type, info.name.lower()), [])
+            statements.append(statement.text)
+
+            if info.object_type == 'VIEW':
+                key, phase = f"view:{info.name}", 'views'
+            elif info.object_type == 'TRIGGER':
+                key, phase = f"trigger:{info.name}", 'triggers'
+                deps |= {k for k in self.tasks if k.startswith('data:')}
+            elif info.object_type == 'EVENT':
+                # Scheduled after the data so it never runs during the load
+                key, phase = f"event:{info.name}", 'triggers'
+                deps |= {k for k in self.tasks if k.startswith('data:')}
+            else:
+                key, phase = f"routine:{info.name}", 'routines'
+
+            self.add(key, phase, deps, run_statements(statements))
+
+        # DROP ... IF EXISTS without a matching CREATE
+        for (object_type, name), statements in pending_drops.items():
+            self.add(f"drop:{object_type.lower()}:{name}", 'schema', (),
+                     run_statements(statements))
+
+    def add_indexes(self, filepath):
+        """One task per table with all of its indexes, after its data."""
+        per_table = OrderedDict()
+        for table, _, statement in build_alter_statements(parse_index_definitions(filepath)):
+            per_table.setdefault(table, []).append(statement)
+        for table, statements in per_table.items():
+            deps = [f"table:{table}"]
+            if f"data:{table}" in self.tasks:
+                deps.append(f"data:{table}")
+            self.add(f"index:{table}", 'indexes', deps, run_statements(statements))
+
+    def validate(self):
+        """Drop dependencies on tasks that do not exist and reject cycles."""
+        for task in self.tasks.values():
+            task.deps.intersection_update(self.tasks)
+
+        visiting, done = set(), set()
+
+        def visit(key):
+            if key in done:
+                return
+            if key in visiting:
+                raise ValueError(f"Dependency cycle at {key}")
+            visiting.add(key)
+            for dep in self.tasks[key].deps:
+                visit(dep)
+            visiting.discard(key)
+            done.add(key)
+
+        for key in self.tasks:
+            visit(key)
+
+
+# ---------------------------------------------------------------------------
+# Execution
+# ---------------------------------------------------------------------------
+
+def run_task_graph(graph, workers, connect, on_done=None):
+    """
+    Run graph tasks on a pool of `workers` threads, each with its own
+    connection from connect(). Calls on_done(TaskTiming) as tasks finish.
+
+    Returns (timings, error) where error is (key, exception) or None.
+    """
+    tasks = graph.tasks
+    remaining = {key: set(task.deps) for key, task in tasks.items()}
+    dependents = {key: [] for key in tasks}
+    for key, task in tasks.items():
+        for dep in task.deps:
+            dependents[dep].append(key)
+
+    local = threading.local()
+    connections = []
+    connections_lock = threading.Lock()
+
+    def worker_connection():
+        connection = getattr(local, 'connection', None)
+        if connection is None:
+            connection = connect()
+            local.connection = connection
+            with connections_lock:
+                connections.append(connection)
+        return connection
+
+    def execute(task):
+        started = time.perf_counter()
+        rows = task.action(worker_connection())
+        return TaskTiming(task.key, task.phase, started, time.perf_counter() - started, rows)
+
+    timings = []
+    error = None
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        def submit_ready():
+            for key in [k for k, deps in remaining.items() if not deps]:
+                del remaining[key]
+                running[pool.submit(execute, tasks[key])] = key
+
+        submit_ready()
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                key = running.pop(future)
+                try:
+                    timing = future.result()
+                except Exception as e:  # surface the first failure, let others drain
+                    if error is None:
+                        error = (key, e)
+                    continue
+                timings.append(timing)
+                if on_done:
+                    on_done(timing)
+                for dependent in dependents[key]:
+                    if dependent in remaining:
+                        remaining[dependent].discard(key)
+            if error is None:
+                submit_ready()
+
+    for connection in connections:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    return timings, error
+
+
+def summarize_phases(timings):
+    """Return [(phase, tasks, wall seconds, busy seconds, rows)] in PHASES order."""
+    summary = []
+    for phase in PHASES:
+        phase_timings = [t for t in timings if t.phase == phase]
+        if not phase_timings:
+            continue
+        start = min(t.started for t in phase_timings)
+        end = max(t.started + t.elapsed for t in phase_timings)
+        summary.append((
+            phase,
+            len(phase_timings),
+            end - start,
+            sum(t.elapsed for t in phase_timings),
+            sum(t.rows or 0 for t in phase_timings),
+        ))
+    return summary
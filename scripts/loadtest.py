@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+
+"""
+============================================================================
+Ski Resort Management System - Concurrent Load Test (Python)
+COMP 345 Final Project
+Purpose: Measure throughput and contention of the transactional procedures
+
+Runs N client sessions, one thread and one pooled connection each, for a
+fixed duration. Every client repeatedly picks an operation from a weighted
+mix:
+
+    purchase    CALL sp_process_ticket_purchase (1..--max-tickets tickets)
+    rental      CALL sp_process_equipment_rental (one random item)
+    return      UPDATE Rentals ... 'Returned' (trg_return_equipment fires)
+    enrollment  CALL sp_enroll_customer (the lesson may be full)
+
+Each attempt is counted as ok, rejected (a business rule said no: item
+already rented, lesson full, duplicate enrollment), deadlock, lock wait
+timeout or error. The report shows TPS and latency percentiles per
+operation, plus the server's row lock wait counters.
+
+The test writes to ski_resort; run scripts/load.py afterwards to restore
+the sample data.
+
+Usage:
+    python3 scripts/loadtest.py --clients 16 --duration 60
+    python3 scripts/loadtest.py --mix purchase=60,rental=20,return=10,enrollment=10
+    python3 scripts/loadtest.py --isolation SERIALIZABLE --output serializable.json
+============================================================================
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from mysql.connector import Error
+from tabulate import tabulate
+
+from benchmark import percentile
+from db import Database
+
+
+# ANSI color codes
+class Colors:
+    RED = '\033[0;31m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    BLUE = '\033[0;34m'
+    NC = '\033[0m'
+
+
+# Configuration
+DB_CONFIG = {
+    'host': os.getenv('MYSQL_HOST', 'localhost'),
+    'port': int(os.getenv('MYSQL_PORT', '3306')),
+    'user': os.getenv('MYSQL_USER', 'root'),
+    'password': os.getenv('MYSQL_PASSWORD', ''),
+    'database': 'ski_resort'
+}
+
+# One pooled connection per client; pool_size is set from --clients
+DB = Database(DB_CONFIG, 'ski_resort_loadtest')
+
+DEFAULT_MIX = 'purchase=40,rental=25,return=15,enrollment=20'
+
+ISOLATION_LEVELS = ['READ UNCOMMITTED', 'READ COMMITTED', 'REPEATABLE READ', 'SERIALIZABLE']
+
+OUTCOMES = ['ok', 'rejected', 'deadlock', 'lock_wait', 'error']
+
+# MySQL error numbers
+ER_DUP_ENTRY = 1062
+ER_LOCK_WAIT_TIMEOUT = 1205
+ER_LOCK_DEADLOCK = 1213
+ER_SIGNAL_EXCEPTION = 1644          # SIGNAL SQLSTATE '45000' from a trigger
+ER_CHECK_CONSTRAINT_VIOLATED = 3819
+
+REJECTED_ERRORS = {ER_DUP_ENTRY, ER_SIGNAL_EXCEPTION, ER_CHECK_CONSTRAINT_VIOLATED}
+
+# p_status values the procedures return when a business rule says no; any
+# other 'error: ...' is an SQL error caught by an EXIT handler
+REJECTED_STATUSES = {
+    # sp_process_ticket_purchase
+    'error: quantity must be between 1 and 1000',
+    'error: customer not found',
+    'error: invalid pass type',
+    # sp_process_equipment_rental
+    'error: invalid rental duration',
+    'error: invalid or duplicate equipment id',
+    'error: equipment not available',
+    # sp_enroll_customer
+    'error: lesson not found',
+    'error: lesson is not open for enrollment',
+    'error: lesson is full',
+    'error: already enrolled',
+}
+
+# IDs the operations pick from, read once before the clients start
+Catalog = namedtuple('Catalog', ['customers', 'pass_types', 'equipment', 'lessons'])
+
+# One attempt by one client
+Sample = namedtuple('Sample', ['operation', 'outcome', 'elapsed_ms'])
+
+
+def print_header(message: str) -> None:
+    print(f"{Colors.BLUE}{'=' * 76}{Colors.NC}")
+    print(f"{Colors.BLUE}{message}{Colors.NC}")
+    print(f"{Colors.BLUE}{'=' * 76}{Colors.NC}")
+
+
+def print_success(message: str) -> None:
+    print(f"{Colors.GREEN}✓ {message}{Colors.NC}")
+
+
+def print_error(message: str) -> None:
+    print(f"{Colors.RED}✗ {message}{Colors.NC}")
+
+
+def print_info(message: str) -> None:
+    print(f"{Colors.YELLOW}ℹ {message}{Colors.NC}")
+
+
+# ---------------------------------------------------------------------------
+# Outcomes
+# ---------------------------------------------------------------------------
+
+def classify_error(error: Error) -> str:
+    if error.errno == ER_LOCK_DEADLOCK:
+        return 'deadlock'
+    if error.errno == ER_LOCK_WAIT_TIMEOUT:
+        return 'lock_wait'
+    if error.errno in REJECTED_ERRORS:
+        return 'rejected'
+    return 'error'
+
+
+def classify_status(status) -> str:
+    """
+    Outcome of a procedure's p_status. The procedures catch SQL errors in
+    their EXIT handlers, so deadlocks arrive as 'error: Deadlock found ...'.
+    """
+    if status == 'success':
+        return 'ok'
+    text = (status or '').lower()
+    if 'deadlock' in text:
+        return 'deadlock'
+    if 'lock wait timeout' in text:
+        return 'lock_wait'
+    if status in REJECTED_STATUSES:
+        return 'rejected'
+    return 'error'
+
+
+# ---------------------------------------------------------------------------
+# Operations: each runs one transaction and returns its outcome
+# ---------------------------------------------------------------------------
+
+def op_purchase(connection, rng, catalog, args) -> str:
+    cursor = connection.cursor()
+    try:
+        result = cursor.callproc('sp_process_ticket_purchase', (
+            rng.choice(catalog.customers),
+            rng.choice(catalog.pass_types),
+            date.today() + timedelta(days=rng.randint(0, 30)),
+            rng.randint(1, args.max_tickets),
+            None, None, None,
+        ))
+        connection.commit()
+        return classify_status(result[-1])
+    finally:
+        cursor.close()
+
+
+def op_rental(connection, rng, catalog, args) -> str:
+    cursor = connection.cursor()
+    try:
+        result = cursor.callproc('sp_process_equipment_rental', (
+            rng.choice(catalog.customers),
+            rng.choice(catalog.equipment),
+            rng.randint(1, 7),
+            None, None, None,
+        ))
+        connection.commit()
+        return classify_status(result[-1])
+    finally:
+        cursor.close()
+
+
+def op_return(connection, rng, catalog, args) -> str:
+    cursor = connection.cursor()
+    try:
+        # Oldest rentals come back first; picking among several spreads the
+        # clients over different rows
+        cursor.execute("""
+            SELECT RentalID FROM Rentals
+            WHERE RentalStatus = 'Active'
+            ORDER BY RentalID
+            LIMIT 20
+        """)
+        active = [row[0] for row in cursor.fetchall()]
+        if not active:
+            connection.commit()
+            return 'rejected'
+
+        cursor.execute("""
+            UPDATE Rentals
+            SET ActualReturnDate = NOW(), RentalStatus = 'Returned'
+            WHERE RentalID = %s AND RentalStatus = 'Active'
+        """, (rng.choice(active),))
+        returned = cursor.rowcount
+        connection.commit()
+        return 'ok' if returned else 'rejected'
+    finally:
+        cursor.close()
+
+
+def op_enrollment(connection, rng, catalog, args) -> str:
+    cursor = connection.cursor()
+    try:
+        result = cursor.callproc('sp_enroll_customer', (
+            rng.choice(catalog.customers),
+            rng.choice(catalog.lessons),
+            None,
+            None, None,
+        ))
+        connection.commit()
+        return classify_status(result[-1])
+    finally:
+        cursor.close()
+
+
+OPERATIONS = {
+    'purchase': op_purchase,
+    'rental': op_rental,
+    'return': op_return,
+    'enrollment': op_enrollment,
+}
+
+
+# ---------------------------------------------------------------------------
+# Clients
+# ---------------------------------------------------------------------------
+
+def load_catalog() -> Catalog:
+    def ids(sql):
+        rows, _ = DB.query(sql)
+        return [row[0] for row in rows]
+
+    return Catalog(
+        customers=ids("SELECT CustomerID FROM Customers"),
+        pass_types=ids("SELECT PassTypeID FROM Pass_Types"),
+        equipment=ids("SELECT EquipmentID FROM Equipment WHERE Status <> 'Retired'"),
+        lessons=ids("SELECT LessonID FROM Scheduled_Lessons WHERE LessonStatus = 'Scheduled'"),
+    )
+
+
+def parse_mix(text: str) -> dict:
+    """'purchase=40,rental=25' -> {'purchase': 40.0, 'rental': 25.0}"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"unknown operation '{name}' "
+                             f"(choose from {', '.join(OPERATIONS)})")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise ValueError(f"weight for '{name}' is not a number: '{weight}'")
+        if mix[name] < 0:
+            raise ValueError(f"weight for '{name}' is negative")
+    if not any(mix.values()):
+        raise ValueError("at least one operation needs a positive weight")
+    return mix
+
+
+def run_client(client_id, args, catalog, mix, barrier, window) -> list:
+    """Run operations until the shared deadline. Returns a list of Samples."""
+    rng = random.Random(None if args.seed is None else args.seed + client_id)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples = []
+
+    try:
+        connection = DB.checkout()
+    except Error:
+        barrier.abort()
+        raise
+
+    try:
+        # Start every client at the same moment
+        barrier.wait()
+        deadline = window['start'] + args.duration
+
+        while time.perf_counter() < deadline:
+            operation = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                outcome = OPERATIONS[operation](connection, rng, catalog, args)
+            except Error as e:
+                try:
+                    connection.rollback()
+                except Error:
+                    pass
+                outcome = classify_error(e)
+            samples.append(Sample(operation, outcome, (time.perf_counter() - started) * 1000))
+    finally:
+        connection.close()
+    return samples
+
+
+def row_lock_status() -> dict:
+    """Server-wide InnoDB row lock wait counters."""
+    rows, _ = DB.query("SHOW GLOBAL STATUS LIKE 'Innodb_row_lock_%'")
+    return {name: float(value) for name, value in rows}
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+def summarize(samples: list, elapsed: float, operations) -> dict:
+    """Per-operation counts by outcome, committed TPS and latency percentiles."""
+    summary = {}
+    for operation in list(operations) + ['TOTAL']:
+        selected = [s for s in samples if operation in ('TOTAL', s.operation)]
+        latencies = sorted(s.elapsed_ms for s in selected)
+        counts = {outcome: 0 for outcome in OUTCOMES}
+        for sample in selected:
+            counts[sample.outcome] += 1
+        summary[operation] = dict(
+            attempts=len(selected),
+            tps=counts['ok'] / elapsed if elapsed else 0.0,
+            p50_ms=percentile(latencies, 50),
+            p95_ms=percentile(latencies, 95),
+            p99_ms=percentile(latencies, 99),
+            max_ms=latencies[-1] if latencies else 0.0,
+            **counts
+        )
+    return summary
+
+
+def print_summary(summary: dict) -> None:
+    rows = [
+        [operation, s['attempts'], s['ok'], s['rejected'], s['deadlock'], s['lock_wait'],
+         s['error'], f"{s['tps']:.1f}", f"{s['p50_ms']:.2f}", f"{s['p95_ms']:.2f}",
+         f"{s['p99_ms']:.2f}", f"{s['max_ms']:.2f}"]
+        for operation, s in summary.items()
+    ]
+    print(tabulate(rows, headers=['Operation', 'Attempts', 'OK', 'Rejected', 'Deadlocks',
+                                  'Lock waits', 'Errors', 'TPS', 'p50 ms', 'p95 ms',
+                                  'p99 ms', 'Max ms'],
+                   tablefmt='grid'))
+
+
+def run_load_test(args) -> int:
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        print_error(f"Invalid --mix: {e}")
+        return 1
+
+    DB.pool_size = args.clients
+    if args.isolation:
+        DB.session_sql.append(f"SET SESSION TRANSACTION ISOLATION LEVEL {args.isolation}")
+    if args.lock_wait_timeout:
+        DB.session_sql.append(f"SET SESSION innodb_lock_wait_timeout = {args.lock_wait_timeout}")
+
+    print_header("Concurrent Load Test (Ski Resort Management System)")
+    print_info(f"Database: {DB_CONFIG['database']} @ {DB_CONFIG['host']}:{DB_CONFIG['port']}")
+    print_info(f"{args.clients} clients for {args.duration}s, mix: "
+               + ', '.join(f"{name}={weight:g}" for name, weight in mix.items()))
+    if args.isolation:
+        print_info(f"Isolation level: {args.isolation}")
+    print_info("This writes to the database; rerun scripts/load.py to restore the sample data")
+    print()
+
+    try:
+        catalog = load_catalog()
+        locks_before = row_lock_status()
+    except Error as e:
+        print_error(f"Cannot connect: {e}")
+        return 1
+
+    if not catalog.customers or not catalog.pass_types:
+        print_error("No customers or pass types found; run scripts/load.py first")
+        return 1
+    if mix.get('rental') and not catalog.equipment:
+        print_error("No equipment to rent")
+        return 1
+    if mix.get('enrollment') and not catalog.lessons:
+        print_error("No scheduled lessons to enroll in")
+        return 1
+
+    window = {}
+    barrier = threading.Barrier(args.clients,
+                                action=lambda: window.setdefault('start', time.perf_counter()))
+
+    samples = []
+    with ThreadPoolExecutor(max_workers=args.clients) as pool:
+        futures = [pool.submit(run_client, i, args, catalog, mix, barrier, window)
+                   for i in range(args.clients)]
+        try:
+            for future in futures:
+                samples.extend(future.result())
+        except (Error, threading.BrokenBarrierError) as e:
+            print_error(f"Client failed to start: {e}")
+            return 1
+    elapsed = time.perf_counter() - window['start']
+
+    try:
+        locks_after = row_lock_status()
+    except Error:
+        locks_after = locks_before
+
+    summary = summarize(samples, elapsed, mix)
+    print_summary(summary)
+
+    lock_waits = locks_after.get('Innodb_row_lock_waits', 0) - locks_before.get(
+        'Innodb_row_lock_waits', 0)
+    lock_time = locks_after.get('Innodb_row_lock_time', 0) - locks_before.get(
+        'Innodb_row_lock_time', 0)
+    print()
+    print_info(f"Server row lock waits: {lock_waits:.0f} "
+               f"({lock_time:.0f} ms waited, {lock_time / lock_waits if lock_waits else 0:.1f} ms avg)")
+    print()
+    print(tabulate(
+        [(kind, count, f"{total_ms:.1f}", f"{avg_ms:.2f}") for kind, count, total_ms, avg_ms
+         in DB.stats.rows()],
+        headers=['Connection', 'Count', 'Total ms', 'Avg ms'], tablefmt='grid'
+    ))
+
+    if args.output:
+        document = {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'database': DB_CONFIG['database'],
+            'clients': args.clients,
+            'duration_s': elapsed,
+            'mix': mix,
+            'isolation': args.isolation,
+            'seed': args.seed,
+            'row_lock_waits': lock_waits,
+            'row_lock_time_ms': lock_time,
+            'results': summary,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2)
+        print()
+        print_success(f"Results written to {args.output}")
+
+    errors = summary['TOTAL']['error']
+    if errors:
+        print_error(f"{errors} attempts failed with unexpected errors")
+        return 1
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Replay concurrent ticket, rental and enrollment traffic")
+    parser.add_argument('--clients', type=int, default=8, metavar='N',
+                        help="Concurrent client sessions, 1-32 (default: 8)")
+    parser.add_argument('--duration', type=float, default=30, metavar='SECONDS',
+                        help="How long to run (default: 30)")
+    parser.add_argument('--mix', default=DEFAULT_MIX, metavar='OP=WEIGHT,...',
+                        help=f"Operation weights (default: {DEFAULT_MIX})")
+    parser.add_argument('--max-tickets', type=int, default=4, metavar='N',
+                        help="Largest ticket quantity per purchase (default: 4)")
+    parser.add_argument('--isolation', type=str.upper, choices=ISOLATION_LEVELS,
+                        help="Session isolation level (default: server setting)")
+    parser.add_argument('--lock-wait-timeout', type=int, metavar='SECONDS',
+                        help="Session innodb_lock_wait_timeout (default: server setting)")
+    parser.add_argument('--seed', type=int,
+                        help="Random seed for a repeatable operation sequence")
+    parser.add_argument('--output', type=Path, metavar='PATH',
+                        help="Also write the results as JSON")
+
+    args = parser.parse_args()
+    # mysql-connector caps a pool at 32 connections
+    if not 1 <= args.clients <= 32:
+        parser.error("--clients must be between 1 and 32")
+    if args.duration <= 0:
+        parser.error("--duration must be positive")
+    if args.max_tickets < 1:
+        parser.error("--max-tickets must be at least 1")
+    if args.lock_wait_timeout is not None and args.lock_wait_timeout < 1:
+        parser.error("--lock-wait-timeout must be at least 1")
+    return args
+
+
+def main() -> None:
+    sys.exit(run_load_test(parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+
+"""
+============================================================================
+Ski Resort Management System - Checksum-Based Migrations (Python)
+COMP 345 Final Project
+Purpose: Re-apply only the database objects whose definition changed
+
+A full load records a SHA-256 checksum for every SQL file and for every
+object it defines (table, view, function, procedure, trigger, index) in
+the schema_checksums table. A migration compares the files on disk with
+those checksums and re-applies just the objects that differ:
+
+    VIEW                  CREATE OR REPLACE VIEW
+    FUNCTION / PROCEDURE  DROP ... IF EXISTS + CREATE
+    TRIGGER / EVENT       DROP ... IF EXISTS + CREATE
+    INDEX                 DROP INDEX ... ON + CREATE INDEX
+    CALL                  run again when new or changed (e.g. a new
+                          sp_create_snapshot or a backfill sp_rebuild_*)
+
+Objects removed from a file are dropped. Table changes cannot be applied
+without losing data, so a changed 01_schema.sql still needs a full load.
+============================================================================
+"""
+
+import hashlib
+import re
+import time
+from collections import namedtuple
+
+from sql_lexer import iter_sql_statements
+from sql_objects import iter_object_definitions
+
+CHECKSUM_TABLE = 'schema_checksums'
+
+SCHEMA_FILE = '01_schema.sql'
+
+# Files whose objects can be re-applied in place, in apply order (indexes
+# before triggers, as in the bulk load)
+OBJECT_FILES = ['03_views.sql', '04_functions.sql', '06_indexes.sql', '05_triggers.sql',
+                '09_snapshots.sql']
+
+# action: 'create', 'replace', 'drop', 'call' or 'file';
+# key: schema_checksums.object_key
+Change = namedtuple('Change', ['action', 'key', 'file_name', 'object_type',
+                               'name', 'table', 'checksum', 'statements'])
+
+_CREATE_CHECKSUM_TABLE = f"""
+    CREATE TABLE IF NOT EXISTS {CHECKSUM_TABLE} (
+        object_key VARCHAR(200) PRIMARY KEY,
+        file_name VARCHAR(100) NOT NULL,
+        object_type VARCHAR(20) NOT NULL,
+        object_name VARCHAR(64) NOT NULL,
+        table_name VARCHAR(64),
+        checksum CHAR(64) NOT NULL,
+        applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            ON UPDATE CURRENT_TIMESTAMP
+    )
+"""
+
+
+class MigrationError(Exception):
+    """Raised when a change cannot be applied incrementally."""
+
+
+# ---------------------------------------------------------------------------
+# Checksums
+# ---------------------------------------------------------------------------
+
+def statement_checksum(statements):
+    """
+    SHA-256 of statement text as parsed by the lexer, so editing comments or
+    trailing whitespace does not count as a change.
+    """
+    digest = hashlib.sha256()
+    for statement in statements:
+        for line in statement.splitlines():
+            line = line.rstrip()
+            if line:
+                digest.update(line.encode('utf-8'))
+                digest.update(b'\n')
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def file_checksum(filepath):
+    """Checksum of every statement in a SQL file."""
+    return statement_checksum(s.text for s in iter_sql_statements(filepath))
+
+
+def object_key(obj):
+    """Unique key for an ObjectDef (index names are only unique per table)."""
+    if obj.object_type == 'INDEX':
+        return f"INDEX:{obj.table}.{obj.name}"
+    return f"{obj.object_type}:{obj.name}"
+
+
+def file_key(filename):
+    return f"FILE:{filename}"
+
+
+def iter_call_statements(filepath):
+    """
+    Yield (key, procedure, checksum, text) for each top-level CALL in a SQL
+    file. A CALL is keyed by its text, so an edited CALL is a new one.
+    """
+    seen = set()
+    for statement in iter_sql_statements(filepath):
+        match = re.match(r"CALL\s+`?(\w+)", statement.text.lstrip(), re.IGNORECASE)
+        if statement.delimiter != ';' or not match:
+            continue
+        checksum = statement_checksum([statement.text])
+        key = f"CALL:{match.group(1)}:{checksum[:16]}"
+        if key not in seen:
+            seen.add(key)
+            yield key, match.group(1), checksum, statement.text
+
+
+# ---------------------------------------------------------------------------
+# Bookkeeping table
+# ---------------------------------------------------------------------------
+
+def read_checksums(cursor):
+    """
+    Return {object_key: (file_name, object_type, object_name, table_name,
+    checksum)}, or None if no full load has recorded a baseline yet.
+    """
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.tables "
+        "WHERE table_schema = DATABASE() AND table_name = %s",
+        (CHECKSUM_TABLE,)
+    )
+    if cursor.fetchone()[0] == 0:
+        return None
+
+    cursor.execute(f"""
+        SELECT object_key, file_name, object_type, object_name, table_name, checksum
+        FROM {CHECKSUM_TABLE}
+    """)
+    return {row[0]: row[1:] for row in cursor.fetchall()}
+
+
+def _upsert(cursor, key, file_name, object_type, name, table, checksum):
+    cursor.execute(f"""
+        INSERT INTO {CHECKSUM_TABLE}
+            (object_key, file_name, object_type, object_name, table_name, checksum)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            file_name = VALUES(file_name),
+            object_type = VALUES(object_type),
+            object_name = VALUES(object_name),
+            table_name = VALUES(table_name),
+            checksum = VALUES(checksum)
+    """, (key, file_name, object_type, name, table, checksum))
+
+
+def record_baseline(connection, sql_dir):
+    """
+    Record checksums for the schema file and every object file after a full
+    load. Returns the number of objects recorded.
+    """
+    cursor = connection.cursor()
+    cursor.execute(_CREATE_CHECKSUM_TABLE)
+    cursor.execute(f"DELETE FROM {CHECKSUM_TABLE}")
+
+    recorded = 0
+    for filename in [SCHEMA_FILE] + OBJECT_FILES:
+        filepath = sql_dir / filename
+        if not filepath.exists():
+            continue
+        for obj in iter_object_definitions(filepath):
+            _upsert(cursor, object_key(obj), filename, obj.object_type, obj.name,
+                    obj.table, statement_checksum(obj.statements))
+            recorded += 1
+        for key, procedure, checksum, _ in iter_call_statements(filepath):
+            _upsert(cursor, key, filename, 'CALL', procedure, None, checksum)
+        _upsert(cursor, file_key(filename), filename, 'FILE', filename, None,
+                file_checksum(filepath))
+
+    connection.commit()
+    cursor.close()
+    return recorded
+
+
+# ---------------------------------------------------------------------------
+# Planning and applying
+# ---------------------------------------------------------------------------
+
+def plan_migration(connection, sql_dir):
+    """
+    Compare the SQL files with the recorded checksums.
+
+    Returns (changes, unchanged_files). Raises MigrationError if there is no
+    baseline or a table definition changed.
+    """
+    cursor = connection.cursor()
+    recorded = read_checksums(cursor)
+    cursor.close()
+
+    if not recorded:
+        raise MigrationError(
+            f"No {CHECKSUM_TABLE} baseline found; run a full load first")
+
+    schema_path = sql_dir / SCHEMA_FILE
+    schema_entry = recorded.get(file_key(SCHEMA_FILE))
+    if schema_entry is None or schema_entry[4] != file_checksum(schema_path):
+        changed = [
+            obj.name for obj in iter_object_definitions(schema_path)
+            if recorded.get(object_key(obj), (None,) * 5)[4]
+            != statement_checksum(obj.statements)
+        ]
+        detail = f" (tables: {', '.join(changed)})" if changed else ""
+        raise MigrationError(
+            f"{SCHEMA_FILE} changed{detail}; table changes need a full load")
+
+    changes = []
+    unchanged_files = []
+
+    for filename in OBJECT_FILES:
+        filepath = sql_dir / filename
+        if not filepath.exists():
+            continue
+
+        entry = recorded.get(file_key(filename))
+        current = file_checksum(filepath)
+        if entry is not None and entry[4] == current:
+            unchanged_files.append(filename)
+            continue
+
+        seen = set()
+        for obj in iter_object_definitions(filepath):
+            key = object_key(obj)
+            seen.add(key)
+            checksum = statement_checksum(obj.statements)
+            previous = recorded.get(key)
+            if previous is not None and previous[4] == checksum:
+                continue
+            changes.append(Change(
+                'create' if previous is None else 'replace', key, filename,
+                obj.object_type, obj.name, obj.table, checksum, obj.statements
+            ))
+
+        # CALLs run after the file's objects, and only when new or edited
+        for key, procedure, checksum, text in iter_call_statements(filepath):
+            seen.add(key)
+            if key not in recorded:
+                changes.append(Change('call', key, filename, 'CALL', procedure,
+                                      None, checksum, [text]))
+
+        for key, (file_name, object_type, name, table, _) in recorded.items():
+            if file_name == filename and object_type != 'FILE' and key not in seen:
+                changes.append(Change('drop', key, filename, object_type, name,
+                                      table, None, []))
+
+        # Record the file checksum once its objects are applied
+        changes.append(Change('file', file_key(filename), filename, 'FILE',
+                              filename, None, current, []))
+
+    # Drop removed objects before creating anything that might reuse a name;
+    # run CALLs once every object they may use is in place, and record file
+    # checksums last so a failed CALL is retried by the next migration
+    changes.sort(key=lambda c: {'drop': 0, 'call': 2, 'file': 3}.get(c.action, 1))
+    return changes, unchanged_files
+
+
+def _drop_statement(change):
+    if change.object_type == 'INDEX':
+        return f"DROP INDEX {change.name} ON {change.table}"
+    return f"DROP {change.object_type} IF EXISTS {change.name}"
+
+
+def change_statements(change):
+    """The SQL that applies one Change."""
+    if change.action == 'drop':
+        # A removed CALL only loses its checksum row
+        return [] if change.object_type == 'CALL' else [_drop_statement(change)]
+    if change.action in ('file', 'call'):
+        return list(change.statements)
+
+    statements = list(change.statements)
+    creates_in_place = (change.object_type == 'VIEW'
+                        or len(statements) > 1)  # already has DROP ... IF EXISTS
+    if change.action == 'replace' and not creates_in_place:
+        statements.insert(0, _drop_statement(change))
+    return statements
+
+
+def apply_change(connection, change):
+    """Apply one Change and update its checksum. Returns elapsed seconds."""
+    started = time.perf_counter()
+    cursor = connection.cursor()
+    try:
+        for statement in change_statements(change):
+            cursor.execute(statement)
+            while cursor.nextset():
+                pass
+
+        if change.action == 'drop':
+            cursor.execute(f"DELETE FROM {CHECKSUM_TABLE} WHERE object_key = %s",
+                           (change.key,))
+        else:
+            _upsert(cursor, change.key, change.file_name, change.object_type,
+                    change.name, change.table, change.checksum)
+        connection.commit()
+    finally:
+        cursor.close()
+    return time.perf_counter() - started
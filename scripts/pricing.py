@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+
+"""
+============================================================================
+Ski Resort Management System - Pricing & Refund Engine (Python)
+COMP 345 Final Project
+Purpose: Quote rentals and refunds in-process, digit for digit like SQL
+
+Mirrors fn_calculate_rental_price and fn_calculate_ticket_refund so quote
+previews and refund batch jobs need no database round trip per item:
+
+    rental   daily rate x days x quantity, less the duration discount of
+             the Rental_Rates tier (10% off 7+ days in the standard rates)
+    refund   100% if more than 7 days before ValidDate, 50% if more than 3,
+             25% if more than 0, otherwise nothing
+
+Amounts are Decimals rounded half away from zero to 2 places, as MySQL
+does when it stores into DECIMAL(10,2). The Rental_Rates catalog is read
+in one query and cached per process for RATES_TTL_SECONDS, so a rate
+change is picked up without a restart. `verify` compares the engine
+against the stored functions on a grid of inputs and every ticket, and
+exits non-zero on any mismatch.
+
+Usage:
+    python3 scripts/pricing.py quote Ski:5 Snowboard:7:2 Helmet:3
+    python3 scripts/pricing.py refund --valid-from 2025-01-01 --refund-date 2024-12-28
+    python3 scripts/pricing.py verify
+============================================================================
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+from datetime import date, datetime
+from decimal import ROUND_HALF_UP, Decimal
+
+from mysql.connector import Error
+from tabulate import tabulate
+
+from db import Database
+
+
+# ANSI color codes
+class Colors:
+    RED = '\033[0;31m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    BLUE = '\033[0;34m'
+    NC = '\033[0m'
+
+
+# Configuration
+DB_CONFIG = {
+    'host': os.getenv('MYSQL_HOST', 'localhost'),
+    'port': int(os.getenv('MYSQL_PORT', '3306')),
+    'user': os.getenv('MYSQL_USER', 'root'),
+    'password': os.getenv('MYSQL_PASSWORD', ''),
+    'database': 'ski_resort'
+}
+
+DB = Database(DB_CONFIG, 'ski_resort_pricing')
+
+# Equipment.EquipmentType
+EQUIPMENT_TYPES = ('Ski', 'Snowboard', 'Boots', 'Poles', 'Helmet', 'Goggles')
+
+# How long a process keeps the Rental_Rates catalog before reading it again
+RATES_TTL_SECONDS = 300
+
+# Refund policy, as written in fn_calculate_ticket_refund:
+# (days before ValidDate must be greater than, share refunded)
+REFUND_TIERS = (
+    (7, Decimal('1.00')),
+    (3, Decimal('0.50')),
+    (0, Decimal('0.25')),
+)
+
+CENT = Decimal('0.01')
+ZERO = Decimal('0.00')
+MAX_AMOUNT = Decimal('99999999.99')   # DECIMAL(10,2)
+
+# One Rental_Rates row
+Rate = namedtuple('Rate', ['equipment_type', 'season', 'season_start', 'season_end',
+                           'min_days', 'daily_rate', 'discount_pct'])
+
+# One priced basket: a price per line (None where SQL returns NULL) and the sum
+Quote = namedtuple('Quote', ['lines', 'total'])
+
+# Lift_Tickets columns the refund policy needs
+Ticket = namedtuple('Ticket', ['ticket_id', 'sale_price', 'valid_date'])
+
+
+def print_header(message: str) -> None:
+    print(f"{Colors.BLUE}{'=' * 76}{Colors.NC}")
+    print(f"{Colors.BLUE}{message}{Colors.NC}")
+    print(f"{Colors.BLUE}{'=' * 76}{Colors.NC}")
+
+
+def print_success(message: str) -> None:
+    print(f"{Colors.GREEN}✓ {message}{Colors.NC}")
+
+
+def print_error(message: str) -> None:
+    print(f"{Colors.RED}✗ {message}{Colors.NC}")
+
+
+def print_info(message: str) -> None:
+    print(f"{Colors.YELLOW}ℹ {message}{Colors.NC}")
+
+
+# ---------------------------------------------------------------------------
+# Rates
+# ---------------------------------------------------------------------------
+
+class RateTable:
+    """
+    The Rental_Rates catalog as loaded at loaded_at (time.monotonic()).
+
+    rate_for() picks a tier the way fn_calculate_rental_price does: the
+    rows for the type, else the any-other-type rows; among those a season
+    covering the day before the undated rates, then the highest MinDays
+    not above the duration. Type lookups ignore case, like the comparison
+    under the default utf8mb4_0900_ai_ci collation.
+    """
+
+    def __init__(self, rows, loaded_at=None):
+        self.rows = [Rate(*row) for row in rows]
+        self.loaded_at = time.monotonic() if loaded_at is None else loaded_at
+        self._by_key = {}   # lower-cased type (None: any other type) -> tiers, best first
+        for rate in sorted(self.rows, key=lambda r: (r.season_start is None, -r.min_days)):
+            key = rate.equipment_type.lower() if rate.equipment_type else None
+            self._by_key.setdefault(key, []).append(rate)
+
+    def rate_for(self, equipment_type, duration_days, on=None):
+        """The Rate applying to a rental starting on `on` (default today), or None."""
+        on = on or date.today()
+        days = max(duration_days, 0)
+        keys = [equipment_type.lower(), None] if equipment_type else [None]
+        for key in keys:
+            for rate in self._by_key.get(key, ()):
+                if (rate.min_days <= days
+                        and (rate.season_start or on) <= on <= (rate.season_end or on)):
+                    return rate
+        return None
+
+
+_rates_lock = threading.Lock()
+_rates_cache = {}   # pool name -> RateTable
+
+
+def load_rates(db) -> RateTable:
+    """Read the whole Rental_Rates catalog in one query."""
+    rows, _ = db.query(
+        "SELECT EquipmentType, Season, SeasonStart, SeasonEnd, MinDays, DailyRate, DiscountPct "
+        "FROM Rental_Rates ORDER BY RateID"
+    )
+    return RateTable(rows)
+
+
+def get_rates(db=DB, ttl=RATES_TTL_SECONDS) -> RateTable:
+    """
+    The cached RateTable for db: loaded on first use, then reused until it
+    is ttl seconds old, so a rate change reaches every process within ttl.
+    """
+    with _rates_lock:
+        rates = _rates_cache.get(db.pool_name)
+        if rates is None or time.monotonic() - rates.loaded_at >= ttl:
+            rates = load_rates(db)
+            _rates_cache[db.pool_name] = rates
+        return rates
+
+
+def invalidate_rates(db=DB) -> None:
+    """Forget the cached rates; the next get_rates() reloads them."""
+    with _rates_lock:
+        _rates_cache.pop(db.pool_name, None)
+
+
+# ---------------------------------------------------------------------------
+# Pricing
+# ---------------------------------------------------------------------------
+
+def _to_decimal_10_2(amount: Decimal) -> Decimal:
+    """Store into DECIMAL(10,2): round half away from zero, error on overflow."""
+    rounded = amount.quantize(CENT, rounding=ROUND_HALF_UP)
+    if abs(rounded) > MAX_AMOUNT:
+        raise ValueError(f"{amount} is out of range for DECIMAL(10,2)")
+    return rounded
+
+
+def rental_price(rates: RateTable, equipment_type, duration_days, quantity, on=None):
+    """fn_calculate_rental_price(equipment_type, duration_days, quantity) on day `on`."""
+    if duration_days is None or quantity is None:
+        return None
+    rate = rates.rate_for(equipment_type, duration_days, on)
+    if rate is None:
+        return None
+    total = _to_decimal_10_2(rate.daily_rate * duration_days * quantity)
+    if rate.discount_pct > 0:
+        total = _to_decimal_10_2(total * (1 - rate.discount_pct))
+    return total
+
+
+def quote_basket(rates: RateTable, items, on=None) -> Quote:
+    """
+    Price every (equipment_type, duration_days, quantity) item of a basket.
+    The total skips lines that price to None.
+    """
+    lines = [rental_price(rates, *item, on=on) for item in items]
+    return Quote(lines, sum((line for line in lines if line is not None), ZERO))
+
+
+def refund_share(valid_date, refund_date) -> Decimal:
+    """Share of the sale price refunded on refund_date (0.00 when none)."""
+    if valid_date is None or refund_date is None:
+        return ZERO
+    if isinstance(valid_date, datetime):
+        valid_date = valid_date.date()
+    if isinstance(refund_date, datetime):
+        refund_date = refund_date.date()
+
+    days_until_valid = (valid_date - refund_date).days
+    for more_than_days, share in REFUND_TIERS:
+        if days_until_valid > more_than_days:
+            return share
+    return ZERO
+
+
+def ticket_refund(sale_price, valid_date, refund_date) -> Decimal:
+    """
+    fn_calculate_ticket_refund for a ticket already in hand. A missing
+    ticket (sale_price and valid_date None) refunds 0.00, as in SQL.
+    """
+    share = refund_share(valid_date, refund_date)
+    if sale_price is None or share == ZERO:
+        return ZERO
+    return _to_decimal_10_2(Decimal(sale_price) * share)
+
+
+def ticket_refunds(tickets, refund_date) -> dict:
+    """{ticket_id: refund} for an iterable of Ticket rows."""
+    return {
+        ticket.ticket_id: ticket_refund(ticket.sale_price, ticket.valid_date, refund_date)
+        for ticket in tickets
+    }
+
+
+def fetch_tickets(db=DB, ticket_ids=None, valid_from=None, valid_to=None) -> list:
+    """
+    Read the tickets to refund in one query: the given TicketIDs (sent as
+    one JSON array) and/or a ValidDate range.
+    """
+    sql = "SELECT t.TicketID, t.SalePrice, t.ValidDate FROM Lift_Tickets t"
+    conditions, params = [], []
+    if ticket_ids is not None:
+        sql += (" JOIN JSON_TABLE(%s, '$[*]' COLUMNS (TicketID INT PATH '$')) AS ids"
+                " ON ids.TicketID = t.TicketID")
+        params.append(json.dumps([int(ticket_id) for ticket_id in ticket_ids]))
+    if valid_from is not None:
+        conditions.append("t.ValidDate >= %s")
+        params.append(valid_from)
+    if valid_to is not None:
+        conditions.append("t.ValidDate <= %s")
+        params.append(valid_to)
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY t.TicketID"
+
+    rows, _ = db.query(sql, tuple(params))
+    return [Ticket(*row) for row in rows]
+
+
+# ---------------------------------------------------------------------------
+# Verification against the stored functions
+# ---------------------------------------------------------------------------
+
+def rental_cases(max_days: int, max_quantity: int) -> list:
+    """Every type (plus an unknown one, odd casing and NULL) x days x quantity."""
+    types = list(EQUIPMENT_TYPES) + ['Sled', 'ski', None]
+    return [(equipment_type, days, quantity)
+            for equipment_type in types
+            for days in range(0, max_days + 1)
+            for quantity in range(1, max_quantity + 1)]
+
+
+def verify_rental_prices(cursor, rates: RateTable, cases: list) -> list:
+    cursor.execute(
+        "SELECT jt.EquipmentType, jt.Days, jt.Quantity, "
+        "       fn_calculate_rental_price(jt.EquipmentType, jt.Days, jt.Quantity) "
+        "FROM JSON_TABLE(%s, '$[*]' COLUMNS ("
+        "    Position FOR ORDINALITY,"
+        "    EquipmentType VARCHAR(50) PATH '$[0]',"
+        "    Days INT PATH '$[1]',"
+        "    Quantity INT PATH '$[2]'"
+        ")) AS jt ORDER BY jt.Position",
+        (json.dumps(cases),)
+    )
+    mismatches = []
+    for equipment_type, days, quantity, expected in cursor.fetchall():
+        actual = rental_price(rates, equipment_type, days, quantity)
+        if str(actual) != str(expected):
+            mismatches.append((f"rental {equipment_type} x{quantity} {days}d", expected, actual))
+    return mismatches
+
+
+def verify_ticket_refunds(cursor, max_days_before: int, limit) -> tuple:
+    """Every ticket refunded from max_days_before days ahead to a day late."""
+    offsets = list(range(-1, max_days_before + 1))
+    cursor.execute(
+        "SELECT t.TicketID, t.SalePrice, t.ValidDate, "
+        "       DATE_SUB(t.ValidDate, INTERVAL o.Days DAY) AS RefundDate, "
+        "       fn_calculate_ticket_refund(t.TicketID, DATE_SUB(t.ValidDate, INTERVAL o.Days DAY)) "
+        "FROM (SELECT TicketID, SalePrice, ValidDate FROM Lift_Tickets "
+        "      ORDER BY TicketID" + (" LIMIT %s" if limit else "") + ") AS t "
+        "CROSS JOIN JSON_TABLE(%s, '$[*]' COLUMNS (Days INT PATH '$')) AS o "
+        "UNION ALL "
+        "SELECT NULL, NULL, NULL, CURDATE(), fn_calculate_ticket_refund(-1, CURDATE())",
+        ((limit,) if limit else ()) + (json.dumps(offsets),)
+    )
+    rows = cursor.fetchall()
+    mismatches = []
+    for ticket_id, sale_price, valid_date, refund_date, expected in rows:
+        actual = ticket_refund(sale_price, valid_date, refund_date)
+        if str(actual) != str(expected):
+            mismatches.append((f"refund ticket {ticket_id} on {refund_date}", expected, actual))
+    return len(rows), mismatches
+
+
+def run_verify(args) -> int:
+    print_header("Pricing Engine Verification")
+    print_info(f"Database: {DB_CONFIG['database']} @ {DB_CONFIG['host']}:{DB_CONFIG['port']}")
+    print()
+
+    try:
+        rates = load_rates(DB)
+        cases = rental_cases(args.max_days, args.max_quantity)
+        with DB.connection() as connection:
+            cursor = connection.cursor()
+            rental_mismatches = verify_rental_prices(cursor, rates, cases)
+            refund_count, refund_mismatches = verify_ticket_refunds(
+                cursor, args.max_days, args.tickets)
+            cursor.close()
+    except Error as e:
+        print_error(f"Verification failed: {e}")
+        return 1
+
+    print(tabulate(
+        [(rate.equipment_type or '(other)', rate.season, rate.season_start or '-',
+          rate.season_end or '-', rate.min_days, f"{rate.daily_rate:.2f}",
+          f"{rate.discount_pct * 100:.1f}%") for rate in rates.rows],
+        headers=['Equipment Type', 'Season', 'From', 'To', 'Min Days', 'Daily Rate', 'Discount'],
+        tablefmt='grid'
+    ))
+    print()
+    print(tabulate([
+        ('fn_calculate_rental_price', len(cases), len(rental_mismatches)),
+        ('fn_calculate_ticket_refund', refund_count, len(refund_mismatches)),
+    ], headers=['Function', 'Cases', 'Mismatches'], tablefmt='grid'))
+    print()
+
+    mismatches = rental_mismatches + refund_mismatches
+    if mismatches:
+        print(tabulate(mismatches[:20], headers=['Case', 'SQL', 'Python'], tablefmt='grid'))
+        print()
+        print_error(f"{len(mismatches)} mismatch(es)")
+        return 1
+    print_success("Python pricing matches the stored functions exactly")
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Quotes and refunds
+# ---------------------------------------------------------------------------
+
+def parse_item(text: str) -> tuple:
+    """'Ski:5' or 'Snowboard:7:2' -> (type, days, quantity)."""
+    parts = text.split(':')
+    if len(parts) not in (2, 3):
+        raise argparse.ArgumentTypeError(f"expected TYPE:DAYS[:QUANTITY], got '{text}'")
+    try:
+        days = int(parts[1])
+        quantity = int(parts[2]) if len(parts) == 3 else 1
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"days and quantity must be integers in '{text}'")
+    return parts[0], days, quantity
+
+
+def run_quote(args) -> int:
+    try:
+        rates = get_rates(DB)
+    except Error as e:
+        print_error(f"Cannot load rates: {e}")
+        return 1
+
+    quote = quote_basket(rates, args.items)
+    rows = []
+    for (equipment_type, days, quantity), line in zip(args.items, quote.lines):
+        rate = rates.rate_for(equipment_type, days)
+        rows.append((
+            equipment_type, days, quantity,
+            f"{rate.daily_rate:.2f}" if rate else '-',
+            f"{rate.discount_pct * 100:.1f}%" if rate else '-',
+            f"{line:.2f}" if line is not None else 'no rate',
+        ))
+    print(tabulate(rows, headers=['Equipment', 'Days', 'Qty', 'Daily Rate', 'Discount', 'Price'],
+                   tablefmt='grid'))
+    print_success(f"Total: {quote.total:.2f}")
+    return 0
+
+
+def run_refund(args) -> int:
+    try:
+        tickets = fetch_tickets(DB, args.tickets, args.valid_from, args.valid_to)
+    except Error as e:
+        print_error(f"Cannot read tickets: {e}")
+        return 1
+    if not tickets:
+        print_error("No tickets selected")
+        return 1
+
+    refunds = ticket_refunds(tickets, args.refund_date)
+    by_share = {}
+    for ticket in tickets:
+        share = refund_share(ticket.valid_date, args.refund_date)
+        count, amount = by_share.get(share, (0, ZERO))
+        by_share[share] = (count + 1, amount + refunds[ticket.ticket_id])
+
+    print_info(f"Refund date: {args.refund_date}")
+    print(tabulate(
+        [(f"{share * 100:.0f}%", count, f"{amount:.2f}")
+         for share, (count, amount) in sorted(by_share.items(), reverse=True)],
+        headers=['Refund', 'Tickets', 'Amount'], tablefmt='grid'
+    ))
+    print_success(f"{len(tickets)} tickets, total refund {sum(refunds.values(), ZERO):.2f}")
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Quote rentals and refunds without the database")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    quote = subparsers.add_parser('quote', help="Price a rental basket")
+    quote.add_argument('items', nargs='+', type=parse_item, metavar='TYPE:DAYS[:QTY]')
+
+    refund = subparsers.add_parser('refund', help="Price refunds for many tickets")
+    refund.add_argument('--tickets', type=lambda s: [int(x) for x in s.split(',')],
+                        metavar='IDS', help="Comma-separated TicketIDs")
+    refund.add_argument('--valid-from', type=date.fromisoformat, metavar='DATE')
+    refund.add_argument('--valid-to', type=date.fromisoformat, metavar='DATE')
+    refund.add_argument('--refund-date', type=date.fromisoformat, default=date.today(),
+                        metavar='DATE', help="Day of the refund (default: today)")
+
+    verify = subparsers.add_parser('verify', help="Compare against the stored functions")
+    verify.add_argument('--max-days', type=int, default=30, metavar='N',
+                        help="Rental durations and refund lead times 0..N (default: 30)")
+    verify.add_argument('--max-quantity', type=int, default=5, metavar='N',
+                        help="Quantities 1..N (default: 5)")
+    verify.add_argument('--tickets', type=int, default=None, metavar='N',
+                        help="Only the first N tickets (default: all)")
+
+    args = parser.parse_args()
+    if args.command == 'refund' and not (args.tickets or args.valid_from or args.valid_to):
+        parser.error("refund needs --tickets and/or --valid-from/--valid-to")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    if args.command == 'quote':
+        sys.exit(run_quote(args))
+    if args.command == 'refund':
+        sys.exit(run_refund(args))
+    sys.exit(run_verify(args))
+
+
+if __name__ == '__main__':
+    main()
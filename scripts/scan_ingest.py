@@ -0,0 +1,627 @@
+#!/usr/bin/env python3
+
+"""
+============================================================================
+Ski Resort Management System - Lift Gate Scan Ingestion (Python)
+COMP 345 Final Project
+Purpose: Validate gate scans in memory and write them to Lift_Scans in batches
+
+Gates send one JSON line per scan:
+
+    {"ticket_id": 1042, "lift_id": 5, "scanned_at": "2025-01-15T09:01:02.250"}
+
+(scanned_at defaults to the time the line is read). Lines arrive on a Unix
+socket (--socket) and/or by following a file (--tail) and go through one
+bounded queue to a single ingest thread:
+
+    readers --> queue (--queue-size) --> validate --> batch --> flush
+
+Validation uses the in-memory ticket index (scripts/ticket_index.py),
+kept current in the background, so a scan costs no database round trip.
+A batch is flushed when it reaches --batch-size scans or is
+--flush-interval seconds old: one multi-row INSERT into Lift_Scans plus one
+UPDATE marking first-scanned Active tickets 'Used', in one transaction.
+
+When the database falls behind, the queue fills and readers block on it,
+which in turn blocks the gates' socket writes; nothing is dropped. Every
+--report-interval seconds the service prints throughput, queue depth,
+flush latency and lag (time from reading a scan to committing it).
+
+Usage:
+    python3 scripts/scan_ingest.py serve --socket /tmp/ski_resort_gates.sock
+    python3 scripts/scan_ingest.py serve --tail /var/log/gates/scans.ndjson
+    python3 scripts/scan_ingest.py simulate --socket /tmp/ski_resort_gates.sock --rate 5000
+============================================================================
+"""
+
+import argparse
+import json
+import os
+import queue
+import random
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import namedtuple
+from datetime import date, datetime
+from pathlib import Path
+
+from mysql.connector import Error
+from tabulate import tabulate
+
+from benchmark import percentile
+from db import Database
+from ticket_index import TicketIndex
+
+
+# ANSI color codes
+class Colors:
+    RED = '\033[0;31m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    BLUE = '\033[0;34m'
+    NC = '\033[0m'
+
+
+# Configuration
+DB_CONFIG = {
+    'host': os.getenv('MYSQL_HOST', 'localhost'),
+    'port': int(os.getenv('MYSQL_PORT', '3306')),
+    'user': os.getenv('MYSQL_USER', 'root'),
+    'password': os.getenv('MYSQL_PASSWORD', ''),
+    'database': 'ski_resort'
+}
+
+# One connection for the ingest thread, one for the index refresher
+DB = Database(DB_CONFIG, 'ski_resort_scans', pool_size=2)
+
+DEFAULT_SOCKET = '/tmp/ski_resort_gates.sock'
+
+# Lift_Scans.ScanResult
+SCAN_RESULTS = ('Accepted', 'Unknown Ticket', 'Not Active', 'Not Valid Today')
+
+# Latency samples kept per reservoir; enough for a stable p99 on any run
+SAMPLE_SIZE = 10000
+
+# One validated scan waiting to be flushed
+Scan = namedtuple('Scan', ['ticket_id', 'lift_id', 'scanned_at', 'result', 'received'])
+
+INSERT_SCANS = """
+    INSERT INTO Lift_Scans (TicketID, LiftID, ScannedAt, ScanResult)
+    VALUES (%s, %s, %s, %s)
+"""
+
+
+def print_header(message: str) -> None:
+    print(f"{Colors.BLUE}{'=' * 76}{Colors.NC}")
+    print(f"{Colors.BLUE}{message}{Colors.NC}")
+    print(f"{Colors.BLUE}{'=' * 76}{Colors.NC}")
+
+
+def print_success(message: str) -> None:
+    print(f"{Colors.GREEN}✓ {message}{Colors.NC}")
+
+
+def print_error(message: str) -> None:
+    print(f"{Colors.RED}✗ {message}{Colors.NC}")
+
+
+def print_info(message: str) -> None:
+    print(f"{Colors.YELLOW}ℹ {message}{Colors.NC}")
+
+
+# ---------------------------------------------------------------------------
+# Ticket index
+# ---------------------------------------------------------------------------
+
+def run_index_refresher(index, stop, poll_seconds, reload_seconds):
+    """Background thread: change-marker poll every poll_seconds, full reload every reload_seconds."""
+    while not stop.wait(poll_seconds):
+        try:
+            if time.monotonic() - index.loaded_at >= reload_seconds:
+                index.load()
+            else:
+                index.poll()
+        except Error as e:
+            print_error(f"Ticket index refresh failed: {e}")
+
+
+# ---------------------------------------------------------------------------
+# Scan sources
+# ---------------------------------------------------------------------------
+
+class GateHandler(socketserver.StreamRequestHandler):
+    """One gate connection: every line goes on the queue (blocking when full)."""
+
+    def handle(self):
+        scans = self.server.scans
+        for line in self.rfile:
+            scans.put((line, time.perf_counter()))
+
+
+class GateServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, scans):
+        if os.path.exists(path):
+            os.unlink(path)
+        super().__init__(path, GateHandler)
+        self.scans = scans
+
+
+def tail_file(path, scans, stop, from_start=False, poll_seconds=0.2):
+    """
+    Follow path like `tail -F`: queue every complete line appended to it and
+    reopen it when it is rotated or truncated. Unless from_start is set,
+    lines already in the file when it is first opened are skipped.
+    """
+    f, inode, partial = None, None, b''
+    while not stop.is_set():
+        if f is None:
+            try:
+                f = open(path, 'rb')
+            except FileNotFoundError:
+                stop.wait(poll_seconds)
+                continue
+            inode = os.fstat(f.fileno()).st_ino
+            if not from_start:
+                f.seek(0, os.SEEK_END)
+            from_start = True  # a rotated-in file is read from its start
+
+        line = f.readline()
+        if line.endswith(b'\n'):
+            scans.put((partial + line, time.perf_counter()))
+            partial = b''
+            continue
+        partial += line
+
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            st = None
+        if st is None or st.st_ino != inode or st.st_size < f.tell():
+            f.close()
+            f, partial = None, b''
+        else:
+            stop.wait(poll_seconds)
+
+    if f is not None:
+        f.close()
+
+
+# ---------------------------------------------------------------------------
+# Ingest
+# ---------------------------------------------------------------------------
+
+def parse_scan(line):
+    """(ticket_id, lift_id, scanned_at) from one JSON line; raises ValueError."""
+    try:
+        event = json.loads(line)
+        scanned_at = event.get('scanned_at')
+        return (int(event['ticket_id']), int(event['lift_id']),
+                datetime.fromisoformat(scanned_at) if scanned_at else datetime.now())
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(str(e)) from e
+
+
+class Reservoir:
+    """
+    A uniform sample of at most size values (Algorithm R) with the exact
+    count and maximum, so a service running for weeks holds bounded memory.
+    """
+
+    def __init__(self, size=SAMPLE_SIZE):
+        self.size = size
+        self.samples = []
+        self.count = 0
+        self.max = 0.0
+        self._rng = random.Random()
+
+    def add(self, value):
+        self.count += 1
+        self.max = max(self.max, value)
+        if len(self.samples) < self.size:
+            self.samples.append(value)
+        else:
+            slot = self._rng.randrange(self.count)
+            if slot < self.size:
+                self.samples[slot] = value
+
+    def sorted(self):
+        return sorted(self.samples)
+
+
+class IngestStats:
+    """Counters for the whole run plus samples for the current report interval."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.received = 0
+        self.results = {result: 0 for result in SCAN_RESULTS}
+        self.malformed = 0
+        self.unknown_lift = 0
+        self.tickets_used = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.dropped = 0
+        self.flush_ms = Reservoir()     # per flush, whole run
+        self.lag_ms = Reservoir()       # per flush: oldest scan, read to commit
+        self._interval_flush_ms = Reservoir()
+        self._interval_lag_ms = Reservoir()
+        self._interval_start = self.started
+        self._interval_received = 0
+
+    def add_flush(self, flush_ms, lag_ms):
+        self.flushes += 1
+        for reservoir, value in ((self.flush_ms, flush_ms), (self.lag_ms, lag_ms),
+                                 (self._interval_flush_ms, flush_ms),
+                                 (self._interval_lag_ms, lag_ms)):
+            reservoir.add(value)
+
+    def report(self, depth):
+        """One progress line for the interval since the last report."""
+        now = time.perf_counter()
+        elapsed = now - self._interval_start
+        flush_ms = self._interval_flush_ms.sorted()
+        lag_ms = self._interval_lag_ms.sorted()
+        rate = (self.received - self._interval_received) / elapsed if elapsed else 0.0
+        print_info(
+            f"{rate:,.0f} scans/s, queue {depth:,}, "
+            f"flush p50 {percentile(flush_ms, 50):.1f} / p95 {percentile(flush_ms, 95):.1f} ms, "
+            f"lag p95 {percentile(lag_ms, 95):.0f} / max {self._interval_lag_ms.max:.0f} ms"
+        )
+        self._interval_start = now
+        self._interval_received = self.received
+        self._interval_flush_ms = Reservoir()
+        self._interval_lag_ms = Reservoir()
+
+
+def flush_batch(connection, batch, used):
+    """Insert the batch and mark newly scanned tickets 'Used' in one transaction."""
+    cursor = connection.cursor()
+    try:
+        cursor.executemany(INSERT_SCANS, [
+            (scan.ticket_id, scan.lift_id, scan.scanned_at, scan.result) for scan in batch
+        ])
+        if used:
+            ids = list(used)
+            placeholders = ', '.join(['%s'] * len(ids))
+            # The ValidDate bounds prune the UPDATE to the partitions involved
+            cursor.execute(
+                f"""UPDATE Lift_Tickets SET TicketStatus = 'Used'
+                    WHERE TicketID IN ({placeholders})
+                      AND TicketStatus = 'Active'
+                      AND ValidDate BETWEEN %s AND %s""",
+                ids + [date.fromordinal(min(used.values())),
+                       date.fromordinal(max(used.values()))]
+            )
+        connection.commit()
+    except Error:
+        try:
+            connection.rollback()
+        except Error:
+            pass
+        raise
+    finally:
+        cursor.close()
+
+
+def run_ingest(index, lifts, scans, stats, readers_done, args):
+    """
+    The ingest thread: validate, batch and flush until the readers are done
+    and the queue is drained. A failed flush is retried with the same batch
+    (the queue holds the readers back meanwhile) on a fresh connection; on
+    shutdown it is dropped.
+    """
+    connection = None   # checked out on first use and after a failed flush
+    batch, used = [], {}
+    batch_started = None
+    next_report = time.perf_counter() + args.report_interval
+
+    def flush():
+        nonlocal connection, batch, used, batch_started
+        backoff = 0.5
+        while True:
+            started = time.perf_counter()
+            try:
+                if connection is None:
+                    connection = DB.checkout()
+                flush_batch(connection, batch, used)
+                break
+            except Error as e:
+                stats.flush_errors += 1
+                print_error(f"Flush of {len(batch)} scans failed: {e}")
+                if readers_done.is_set():
+                    stats.dropped += len(batch)
+                    batch, used, batch_started = [], {}, None
+                    return
+                if connection is not None:
+                    connection.close()
+                    connection = None
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 10.0)
+        committed = time.perf_counter()
+        stats.tickets_used += len(used)
+        stats.add_flush((committed - started) * 1000,
+                        (committed - min(scan.received for scan in batch)) * 1000)
+        batch, used, batch_started = [], {}, None
+
+    try:
+        while not (readers_done.is_set() and scans.empty()):
+            timeout = args.flush_interval
+            if batch_started is not None:
+                timeout = max(0.0, batch_started + args.flush_interval - time.perf_counter())
+            try:
+                line, received = scans.get(timeout=timeout)
+            except queue.Empty:
+                line = None
+
+            if line is not None:
+                stats.received += 1
+                try:
+                    ticket_id, lift_id, scanned_at = parse_scan(line)
+                except ValueError:
+                    stats.malformed += 1
+                    continue
+                if lift_id not in lifts:
+                    stats.unknown_lift += 1
+                    continue
+
+                result = index.check(ticket_id, scanned_at.toordinal())
+                stats.results[result] += 1
+                if result == 'Accepted' and ticket_id not in used:
+                    first_day = index.mark_used(ticket_id)
+                    if first_day is not None:
+                        used[ticket_id] = first_day
+
+                batch.append(Scan(ticket_id, lift_id, scanned_at, result, received))
+                if batch_started is None:
+                    batch_started = time.perf_counter()
+
+            now = time.perf_counter()
+            if batch and (len(batch) >= args.batch_size
+                          or now - batch_started >= args.flush_interval):
+                flush()
+            if args.report_interval and now >= next_report:
+                stats.report(scans.qsize())
+                next_report = now + args.report_interval
+
+        if batch:
+            flush()
+    finally:
+        if connection is not None:
+            connection.close()
+
+
+def print_ingest_summary(stats):
+    elapsed = time.perf_counter() - stats.started
+    rows = [[result, count] for result, count in stats.results.items()]
+    rows += [['Malformed', stats.malformed], ['Unknown lift', stats.unknown_lift],
+             ['Dropped on shutdown', stats.dropped]]
+    print(tabulate(rows, headers=['Scans', 'Count'], tablefmt='grid'))
+    print()
+    latency = []
+    for label, reservoir in (('Flush latency ms', stats.flush_ms), ('Lag ms', stats.lag_ms)):
+        samples = reservoir.sorted()
+        latency.append([label, *(round(percentile(samples, pct), 1) for pct in (50, 95, 99)),
+                        round(reservoir.max, 1)])
+    print(tabulate(latency, headers=['', 'p50', 'p95', 'p99', 'Max'], tablefmt='grid'))
+    print()
+    print_info(f"{stats.received:,} scans in {elapsed:.1f}s ({stats.received / elapsed:,.0f}/s), "
+               f"{stats.flushes:,} flushes ({stats.flush_errors} failed), "
+               f"{stats.tickets_used:,} tickets marked Used")
+
+
+def run_serve(args) -> int:
+    if not args.socket and not args.tail:
+        args.socket = DEFAULT_SOCKET
+
+    print_header("Lift Gate Scan Ingestion (Ski Resort Management System)")
+    print_info(f"Database: {DB_CONFIG['database']} @ {DB_CONFIG['host']}:{DB_CONFIG['port']}")
+
+    index = TicketIndex(DB)
+    try:
+        loaded = index.load()
+        rows, _ = DB.query("SELECT LiftID FROM Lifts")
+    except Error as e:
+        print_error(f"Cannot load tickets: {e}")
+        return 1
+    lifts = frozenset(lift_id for (lift_id,) in rows)
+    print_success(f"Ticket index loaded: {loaded:,} tickets "
+                  f"({index.nbytes() / 1024 / 1024:,.1f} MB), {len(lifts)} lifts")
+
+    scans = queue.Queue(maxsize=args.queue_size)
+    stats = IngestStats()
+    stop = threading.Event()
+    readers_done = threading.Event()
+
+    ingest = threading.Thread(target=run_ingest, name='ingest',
+                              args=(index, lifts, scans, stats, readers_done, args))
+    refresher = threading.Thread(target=run_index_refresher, name='index', daemon=True,
+                                 args=(index, stop, args.poll_interval, args.reload_interval))
+    readers = []
+    server = None
+
+    if args.socket:
+        server = GateServer(args.socket, scans)
+        readers.append(threading.Thread(target=server.serve_forever, name='socket'))
+        print_info(f"Listening on {args.socket}")
+    if args.tail:
+        readers.append(threading.Thread(target=tail_file, name='tail',
+                                        args=(args.tail, scans, stop, args.from_start)))
+        print_info(f"Following {args.tail}")
+    print_info(f"Batches of {args.batch_size} or every {args.flush_interval}s, "
+               f"queue limit {args.queue_size:,}; Ctrl+C to stop")
+    print()
+
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    ingest.start()
+    refresher.start()
+    for reader in readers:
+        reader.start()
+
+    try:
+        deadline = time.monotonic() + args.duration if args.duration else None
+        while not stop.wait(0.5):
+            if deadline and time.monotonic() >= deadline:
+                break
+            if not ingest.is_alive():
+                break
+    except KeyboardInterrupt:
+        pass
+    stop.set()
+
+    if server:
+        server.shutdown()
+        server.server_close()
+        os.unlink(args.socket)
+    for reader in readers:
+        reader.join()
+    readers_done.set()
+    ingest.join()
+
+    print()
+    print_ingest_summary(stats)
+    return 1 if stats.dropped else 0
+
+
+# ---------------------------------------------------------------------------
+# Simulator
+# ---------------------------------------------------------------------------
+
+def run_simulate(args) -> int:
+    """Send scans of recent tickets at a fixed rate, as a stand-in for the gates."""
+    try:
+        tickets, _ = DB.query(
+            "SELECT TicketID FROM Lift_Tickets ORDER BY TicketID DESC LIMIT %s",
+            (args.tickets,))
+        lifts, _ = DB.query("SELECT LiftID FROM Lifts")
+    except Error as e:
+        print_error(f"Cannot connect: {e}")
+        return 1
+    ticket_ids = [ticket_id for (ticket_id,) in tickets]
+    lift_ids = [lift_id for (lift_id,) in lifts]
+    if not ticket_ids or not lift_ids:
+        print_error("No tickets or lifts found; run scripts/load.py first")
+        return 1
+
+    if args.output:
+        out = open(args.output, 'ab', buffering=0)
+        target = str(args.output)
+    else:
+        out = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        out.connect(args.socket)
+        target = args.socket
+
+    print_info(f"Sending {args.rate:,} scans/s for {args.duration}s to {target} "
+               f"({len(ticket_ids):,} tickets, {args.invalid_pct}% unknown)")
+
+    rng = random.Random(args.seed)
+    unknown_id = max(ticket_ids) + 1_000_000
+    started = time.perf_counter()
+    sent = 0
+    try:
+        while True:
+            elapsed = time.perf_counter() - started
+            if elapsed >= args.duration:
+                break
+            due = int(args.rate * elapsed) - sent
+            if due <= 0:
+                time.sleep(0.005)
+                continue
+            scanned_at = datetime.now().isoformat(timespec='milliseconds')
+            lines = []
+            for _ in range(due):
+                ticket_id = (unknown_id + rng.randrange(1000)
+                             if rng.random() * 100 < args.invalid_pct
+                             else rng.choice(ticket_ids))
+                lines.append(json.dumps({'ticket_id': ticket_id,
+                                         'lift_id': rng.choice(lift_ids),
+                                         'scanned_at': scanned_at}))
+            payload = ('\n'.join(lines) + '\n').encode()
+            # A full socket buffer blocks here: that is the ingester's back-pressure
+            if args.output:
+                out.write(payload)
+            else:
+                out.sendall(payload)
+            sent += due
+    except (BrokenPipeError, ConnectionResetError) as e:
+        print_error(f"Connection lost: {e}")
+        return 1
+    finally:
+        out.close()
+
+    elapsed = time.perf_counter() - started
+    print_success(f"{sent:,} scans sent in {elapsed:.1f}s ({sent / elapsed:,.0f}/s)")
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Lift gate scan ingestion")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve = subparsers.add_parser('serve', help="Ingest scans from a socket and/or file")
+    serve.add_argument('--socket', metavar='PATH',
+                       help=f"Unix socket to listen on (default: {DEFAULT_SOCKET} "
+                            "unless --tail is given)")
+    serve.add_argument('--tail', type=Path, metavar='PATH',
+                       help="Follow this file for scan lines, like tail -F")
+    serve.add_argument('--from-start', action='store_true',
+                       help="With --tail, also ingest lines already in the file")
+    serve.add_argument('--batch-size', type=int, default=1000, metavar='N',
+                       help="Scans per INSERT (default: 1000)")
+    serve.add_argument('--flush-interval', type=float, default=0.5, metavar='SECONDS',
+                       help="Flush a partial batch after this long (default: 0.5)")
+    serve.add_argument('--queue-size', type=int, default=50000, metavar='N',
+                       help="Scans buffered before readers block (default: 50000)")
+    serve.add_argument('--poll-interval', type=float, default=1.0, metavar='SECONDS',
+                       help="How often ticket changes are polled (default: 1)")
+    serve.add_argument('--reload-interval', type=float, default=60.0, metavar='SECONDS',
+                       help="How often the whole ticket index is reloaded (default: 60)")
+    serve.add_argument('--report-interval', type=float, default=5.0, metavar='SECONDS',
+                       help="Seconds between progress lines, 0 for none (default: 5)")
+    serve.add_argument('--duration', type=float, default=0, metavar='SECONDS',
+                       help="Stop after this long (default: run until Ctrl+C)")
+
+    simulate = subparsers.add_parser('simulate', help="Send synthetic scans at a fixed rate")
+    simulate.add_argument('--socket', default=DEFAULT_SOCKET, metavar='PATH',
+                          help=f"Ingester socket (default: {DEFAULT_SOCKET})")
+    simulate.add_argument('--output', type=Path, metavar='PATH',
+                          help="Append scan lines to this file instead (for serve --tail)")
+    simulate.add_argument('--rate', type=int, default=5000, metavar='N',
+                          help="Scans per second (default: 5000)")
+    simulate.add_argument('--duration', type=float, default=30.0, metavar='SECONDS',
+                          help="How long to send (default: 30)")
+    simulate.add_argument('--tickets', type=int, default=100000, metavar='N',
+                          help="Scan the N most recent tickets (default: 100000)")
+    simulate.add_argument('--invalid-pct', type=float, default=2.0, metavar='PCT',
+                          help="Share of scans with unknown ticket ids (default: 2)")
+    simulate.add_argument('--seed', type=int, help="Random seed for a repeatable run")
+
+    args = parser.parse_args()
+    if args.command == 'serve':
+        if args.batch_size < 1 or args.queue_size < 1:
+            parser.error("--batch-size and --queue-size must be at least 1")
+        if args.flush_interval <= 0 or args.poll_interval <= 0:
+            parser.error("--flush-interval and --poll-interval must be positive")
+    elif args.rate < 1:
+        parser.error("--rate must be at least 1")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    if args.command == 'serve':
+        sys.exit(run_serve(args))
+    sys.exit(run_simulate(args))
+
+
+if __name__ == '__main__':
+    main()
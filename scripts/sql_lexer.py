@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+
+"""
+============================================================================
+Ski Resort Management System - Streaming SQL Statement Lexer (Python)
+COMP 345 Final Project
+Purpose: Split MySQL scripts into statements the way the mysql client does
+
+Handles DELIMITER changes, '...' / "..." string literals (backslash and
+doubled-quote escapes), `backtick` identifiers, -- and # line comments, and
+/* */ block comments. /*! */ executable comments and /*+ */ optimizer hints
+are kept as part of the statement.
+
+The input is consumed one buffered line at a time and statements are
+yielded as soon as their delimiter is seen, so memory use is bounded by the
+largest single statement and the running time is linear in the file size.
+============================================================================
+"""
+
+import re
+from collections import namedtuple
+from pathlib import Path
+
+# A parsed statement: SQL text without its delimiter, the delimiter that was
+# active when it was read, and the 1-based line number where it starts
+Statement = namedtuple('Statement', ['text', 'delimiter', 'line'])
+
+DEFAULT_DELIMITER = ';'
+READ_BUFFER_BYTES = 1024 * 1024
+
+_QUOTES = ("'", '"', '`')
+
+
+def _special_pattern(delimiter):
+    """Regex matching the next token that changes lexer state."""
+    return re.compile(
+        r"""['"`]|--(?=\s|$)|\#|/\*|""" + re.escape(delimiter)
+    )
+
+
+def _find_string_end(line, pos, quote):
+    """
+    Return the index just past the closing quote, or -1 if the literal
+    continues on the next line.
+    """
+    i = pos
+    while True:
+        end = line.find(quote, i)
+        escape = line.find('\\', i) if quote != '`' else -1
+
+        if escape != -1 and (end == -1 or escape < end):
+            i = escape + 2
+            continue
+        if end == -1:
+            return -1
+        if line.startswith(quote, end + 1):
+            # Doubled quote ('' or ``) is an escaped quote character
+            i = end + 2
+            continue
+        return end + 1
+
+
+def _parse_delimiter_command(line):
+    """Return the new delimiter if line is a DELIMITER command, else None."""
+    stripped = line.strip()
+    if stripped[:9].upper() != 'DELIMITER':
+        return None
+    if len(stripped) > 9 and not stripped[9].isspace():
+        return None
+    parts = stripped.split()
+    return parts[1] if len(parts) > 1 else None
+
+
+def iter_sql_lines(lines):
+    """
+    Yield Statement tuples from an iterable of lines (each ending in '\\n').
+    """
+    delimiter = DEFAULT_DELIMITER
+    special = _special_pattern(delimiter)
+
+    parts = []
+    has_content = False
+    start_line = 0
+    in_string = None          # active quote character
+    in_comment = False        # inside /* */
+    keep_comment = False      # /*! */ or /*+ */: part of the statement
+
+    def flush():
+        text = ''.join(parts).strip()
+        parts.clear()
+        return text
+
+    for lineno, line in enumerate(lines, 1):
+        if in_string is None and not in_comment:
+            new_delimiter = _parse_delimiter_command(line)
+            if new_delimiter is not None:
+                if has_content:
+                    text = flush()
+                    if text:
+                        yield Statement(text, delimiter, start_line)
+                parts.clear()
+                has_content = False
+                delimiter = new_delimiter
+                special = _special_pattern(delimiter)
+                continue
+
+        pos = 0
+        length = len(line)
+
+        while pos < length:
+            if in_comment:
+                end = line.find('*/', pos)
+                if end == -1:
+                    if keep_comment:
+                        parts.append(line[pos:])
+                    pos = length
+                    break
+                if keep_comment:
+                    parts.append(line[pos:end + 2])
+                else:
+                    parts.append(' ')
+                in_comment = False
+                pos = end + 2
+                continue
+
+            if in_string is not None:
+                end = _find_string_end(line, pos, in_string)
+                if end == -1:
+                    parts.append(line[pos:])
+                    pos = length
+                    break
+                parts.append(line[pos:end])
+                in_string = None
+                pos = end
+                continue
+
+            match = special.search(line, pos)
+            if match is None:
+                chunk = line[pos:]
+                if not has_content and chunk.strip():
+                    has_content, start_line = True, lineno
+                parts.append(chunk)
+                break
+
+            chunk = line[pos:match.start()]
+            if not has_content and chunk.strip():
+                has_content, start_line = True, lineno
+            parts.append(chunk)
+            token = match.group()
+            pos = match.end()
+
+            if token in _QUOTES:
+                if not has_content:
+                    has_content, start_line = True, lineno
+                parts.append(token)
+                in_string = token
+            elif token == '--' or token == '#':
+                # Rest of the line is a comment; keep the line break
+                parts.append('\n')
+                pos = length
+            elif token == '/*':
+                in_comment = True
+                keep_comment = line.startswith(('!', '+'), pos)
+                if keep_comment:
+                    if not has_content:
+                        has_content, start_line = True, lineno
+                    parts.append(token)
+            else:
+                text = flush()
+                if text:
+                    yield Statement(text, delimiter, start_line)
+                has_content = False
+
+    if has_content:
+        text = flush()
+        if text:
+            yield Statement(text, delimiter, start_line)
+
+
+def iter_sql_statements(filepath):
+    """Yield Statement tuples from a SQL file, streaming it line by line."""
+    with open(Path(filepath), 'r', encoding='utf-8',
+              buffering=READ_BUFFER_BYTES) as f:
+        yield from iter_sql_lines(f)
+
+
+def split_sql(sql_content):
+    """Split an in-memory SQL string into a list of Statement tuples."""
+    return list(iter_sql_lines(sql_content.splitlines(keepends=True)))
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+"""
+============================================================================
+Ski Resort Management System - SQL Object Catalog (Python)
+COMP 345 Final Project
+Purpose: Recognize the database objects defined in the sql/ scripts
+
+Builds on sql_lexer to turn statements into structured definitions (e.g.
+the indexes declared in 06_indexes.sql) so tooling can reorganize how they
+are applied without hand-maintaining a second copy of the DDL.
+============================================================================
+"""
+
+import re
+from collections import OrderedDict, namedtuple
+
+from sql_lexer import iter_sql_statements
+
+# One CREATE [UNIQUE|FULLTEXT|SPATIAL] INDEX statement
+IndexDef = namedtuple('IndexDef', ['name', 'table', 'kind', 'columns'])
+
+_CREATE_INDEX = re.compile(
+    r"""^CREATE\s+(?:(UNIQUE|FULLTEXT|SPATIAL)\s+)?INDEX\s+`?(\w+)`?
+        \s+ON\s+`?(\w+)`?\s*\((.*)\)\s*$""",
+    re.IGNORECASE | re.DOTALL | re.VERBOSE,
+)
+
+
+def parse_index_definitions(filepath):
+    """Return the IndexDef for every CREATE INDEX statement in a SQL file."""
+    indexes = []
+    for statement in iter_sql_statements(filepath):
+        match = _CREATE_INDEX.match(statement.text)
+        if not match:
+            continue
+        kind, name, table, columns = match.groups()
+        columns = tuple(' '.join(col.split()) for col in columns.split(','))
+        indexes.append(IndexDef(name, table, (kind or 'INDEX').upper(), columns))
+    return indexes
+
+
+def group_indexes_by_table(indexes):
+    """Group IndexDefs by table, preserving file order."""
+    grouped = OrderedDict()
+    for index in indexes:
+        grouped.setdefault(index.table, []).append(index)
+    return grouped
+
+
+def index_clause(index):
+    """Render an IndexDef as an ALTER TABLE ... ADD clause."""
+    prefix = '' if index.kind == 'INDEX' else f"{index.kind} "
+    return f"ADD {prefix}INDEX {index.name} ({', '.join(index.columns)})"
+
+
+def build_alter_statements(indexes):
+    """
+    Yield (table, [IndexDef], sql) with one ALTER TABLE per table.
+
+    InnoDB builds every secondary index named in a single ALTER TABLE in one
+    pass over the clustered index. FULLTEXT indexes get their own statement
+    because InnoDB can only add one FULLTEXT index at a time and mixing them
+    with B-tree adds forces a table copy.
+    """
+    for table, table_indexes in group_indexes_by_table(indexes).items():
+        btree = [ix for ix in table_indexes if ix.kind != 'FULLTEXT']
+        fulltext = [ix for ix in table_indexes if ix.kind == 'FULLTEXT']
+
+        if btree:
+            clauses = ',\n    '.join(index_clause(ix) for ix in btree)
+            yield table, btree, f"ALTER TABLE {table}\n    {clauses}"
+        for ix in fulltext:
+            yield table, [ix], f"ALTER TABLE {table} {index_clause(ix)}"
+
+
+# ---------------------------------------------------------------------------
+# Statement classification
+# ---------------------------------------------------------------------------
+
+# What a statement does: action (CREATE, DROP, INSERT, ALTER, CALL, SET, USE
+# or OTHER), the object type it acts on, the object name, and the table it
+# belongs to (indexes, triggers, inserts)
+StatementInfo = namedtuple('StatementInfo', ['action', 'object_type', 'name', 'table'])
+
+_IDENT = r"`?(\w+)`?"
+_DEFINER = r"(?:DEFINER\s*=\s*\S+\s+)?"
+
+_CLASSIFIERS = [
+    (re.compile(r"^CREATE\s+(?:TEMPORARY\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?" + _IDENT,
+                re.IGNORECASE),
+     lambda m: StatementInfo('CREATE', 'TABLE', m.group(1), m.group(1))),
+    (re.compile(r"^CREATE\s+(?:OR\s+REPLACE\s+)?(?:ALGORITHM\s*=\s*\w+\s+)?" + _DEFINER +
+                r"(?:SQL\s+SECURITY\s+\w+\s+)?VIEW\s+" + _IDENT, re.IGNORECASE),
+     lambda m: StatementInfo('CREATE', 'VIEW', m.group(1), None)),
+    (re.compile(r"^CREATE\s+" + _DEFINER + r"TRIGGER\s+(?:IF\s+NOT\s+EXISTS\s+)?" + _IDENT +
+                r"\s+(?:BEFORE|AFTER)\s+\w+\s+ON\s+" + _IDENT, re.IGNORECASE),
+     lambda m: StatementInfo('CREATE', 'TRIGGER', m.group(1), m.group(2))),
+    (re.compile(r"^CREATE\s+" + _DEFINER + r"(FUNCTION|PROCEDURE|EVENT)\s+"
+                r"(?:IF\s+NOT\s+EXISTS\s+)?" + _IDENT, re.IGNORECASE),
+     lambda m: StatementInfo('CREATE', m.group(1).upper(), m.group(2), None)),
+    (re.compile(r"^CREATE\s+(?:UNIQUE\s+|FULLTEXT\s+|SPATIAL\s+)?INDEX\s+" + _IDENT +
+                r"\s+ON\s+" + _IDENT, re.IGNORECASE),
+     lambda m: StatementInfo('CREATE', 'INDEX', m.group(1), m.group(2))),
+    (re.compile(r"^CREATE\s+(?:DATABASE|SCHEMA)\s+(?:IF\s+NOT\s+EXISTS\s+)?" + _IDENT,
+                re.IGNORECASE),
+     lambda m: StatementInfo('CREATE', 'DATABASE', m.group(1), None)),
+    (re.compile(r"^DROP\s+(TABLE|VIEW|FUNCTION|PROCEDURE|TRIGGER|EVENT|DATABASE|SCHEMA)\s+"
+                r"(?:IF\s+EXISTS\s+)?" + _IDENT, re.IGNORECASE),
+     lambda m: StatementInfo('DROP', m.group(1).upper(), m.group(2), None)),
+    (re.compile(r"^DROP\s+INDEX\s+" + _IDENT + r"\s+ON\s+" + _IDENT, re.IGNORECASE),
+     lambda m: StatementInfo('DROP', 'INDEX', m.group(1), m.group(2))),
+    (re.compile(r"^(?:INSERT|REPLACE)\s+(?:IGNORE\s+)?(?:INTO\s+)?" + _IDENT, re.IGNORECASE),
+     lambda m: StatementInfo('INSERT', 'TABLE', m.group(1), m.group(1))),
+    (re.compile(r"^ALTER\s+TABLE\s+" + _IDENT, re.IGNORECASE),
+     lambda m: StatementInfo('ALTER', 'TABLE', m.group(1), m.group(1))),
+    (re.compile(r"^CALL\s+" + _IDENT, re.IGNORECASE),
+     lambda m: StatementInfo('CALL', 'PROCEDURE', m.group(1), None)),
+    (re.compile(r"^USE\s+" + _IDENT, re.IGNORECASE),
+     lambda m: StatementInfo('USE', 'DATABASE', m.group(1), None)),
+    (re.compile(r"^SET\s", re.IGNORECASE),
+     lambda m: StatementInfo('SET', None, None, None)),
+]
+
+_WORD = re.compile(r"\w+")
+
+
+def classify_statement(text):
+    """Return a StatementInfo describing what a SQL statement creates or changes."""
+    for pattern, build in _CLASSIFIERS:
+        match = pattern.match(text)
+        if match:
+            return build(match)
+    return StatementInfo('OTHER', None, None, None)
+
+
+def referenced_names(text, candidates):
+    """
+    Return the names from candidates (a {lowercase name: name} map) that
+    appear as identifiers in text.
+    """
+    found = set()
+    for word in _WORD.findall(text):
+        name = candidates.get(word.lower())
+        if name is not None:
+            found.add(name)
+    return found
+
+
+# ---------------------------------------------------------------------------
+# Object definitions
+# ---------------------------------------------------------------------------
+
+# One object created by a SQL file and the statements that (re)create it,
+# including any DROP ... IF EXISTS for the same object that precedes it
+ObjectDef = namedtuple('ObjectDef', ['object_type', 'name', 'table', 'statements'])
+
+_DEFINED_TYPES = {'TABLE', 'VIEW', 'FUNCTION', 'PROCEDURE', 'TRIGGER', 'EVENT', 'INDEX'}
+
+
+def iter_object_definitions(filepath):
+    """
+    Yield an ObjectDef for every object a SQL file creates, in file order.
+    Statements that do not define an object (USE, SET, INSERT, ...) are
+    skipped.
+    """
+    pending_drops = {}
+    for statement in iter_sql_statements(filepath):
+        info = classify_statement(statement.text)
+        if info.object_type not in _DEFINED_TYPES:
+            continue
+        key = (info.object_type, info.name.lower())
+        if info.action == 'DROP':
+            pending_drops.setdefault(key, []).append(statement.text)
+        elif info.action == 'CREATE':
+            statements = pending_drops.pop(key, []) + [statement.text]
+            yield ObjectDef(info.object_type, info.name, info.table, statements)
+
+
+# ---------------------------------------------------------------------------
+# Workload queries
+# ---------------------------------------------------------------------------
+
+# A numbered query from 07_queries.sql: "-- QUERY n: title" followed by SQL
+QueryDef = namedtuple('QueryDef', ['number', 'title', 'sql'])
+
+_QUERY_HEADER = re.compile(r"^--\s*QUERY\s+(\d+)\s*:\s*(.*?)\s*$", re.IGNORECASE)
+
+
+def parse_workload_queries(filepath):
+    """
+    Return a QueryDef for every statement preceded by a "-- QUERY n:" header,
+    in file order.
+    """
+    headers = []
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for lineno, line in enumerate(f, 1):
+            match = _QUERY_HEADER.match(line)
+            if match:
+                headers.append((lineno, int(match.group(1)), match.group(2)))
+
+    queries = []
+    for statement in iter_sql_statements(filepath):
+        # The nearest header above the statement, claimed by one statement only
+        while len(headers) > 1 and headers[1][0] < statement.line:
+            headers.pop(0)
+        if headers and headers[0][0] < statement.line:
+            _, number, title = headers.pop(0)
+            queries.append(QueryDef(number, title, statement.text))
+    return queries
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+
+"""
+============================================================================
+Ski Resort Management System - Ticket Validity Index (Python)
+COMP 345 Final Project
+Purpose: Answer "is this ticket valid today" at a gate without a round trip
+
+Every ticket valid within the last --window-days is held in three arrays
+indexed by TicketID - base (TicketIDs are AUTO_INCREMENT, so they are
+dense):
+
+    first    first valid day, as a date ordinal          array('i')
+    last     last valid day, as a date ordinal           array('i')
+    status   TicketStatus code, 0 = no such ticket       array('b')
+
+That is 9 bytes per ticket, against a few hundred for a dict of tuples.
+The last day is ExpirationDate or else ValidDate + DurationDays - 1 from
+Pass_Types, which is how season passes (IsSeasonPass, 180 days) get their
+range.
+
+The index is filled by one streamed query. After that, poll() reads a
+change marker: MAX(TicketID) and MAX(UpdatedAt) of Lift_Tickets, plus
+MAX(UpdatedAt) of Pass_Types. Only when the marker moves does it read the
+rows updated since the last marker (new tickets included, as UpdatedAt is
+set on insert). A Pass_Types change triggers a full reload. Deleted
+tickets stay until the next full reload.
+
+Run directly, this is a benchmark of index memory and lookup latency, on
+the database's tickets or on a synthetic set.
+
+Usage:
+    python3 scripts/ticket_index.py
+    python3 scripts/ticket_index.py --synthetic 1000000 --baseline
+============================================================================
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from array import array
+from datetime import date, timedelta
+
+from mysql.connector import Error
+from tabulate import tabulate
+
+from benchmark import percentile
+from db import Database
+
+
+# ANSI color codes
+class Colors:
+    RED = '\033[0;31m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    BLUE = '\033[0;34m'
+    NC = '\033[0m'
+
+
+# Configuration
+DB_CONFIG = {
+    'host': os.getenv('MYSQL_HOST', 'localhost'),
+    'port': int(os.getenv('MYSQL_PORT', '3306')),
+    'user': os.getenv('MYSQL_USER', 'root'),
+    'password': os.getenv('MYSQL_PASSWORD', ''),
+    'database': 'ski_resort'
+}
+
+DB = Database(DB_CONFIG, 'ski_resort_ticket_index')
+
+# Lift_Tickets.TicketStatus by code; code 0 marks an empty slot
+STATUSES = (None, 'Active', 'Used', 'Expired', 'Cancelled')
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES) if status}
+ACTIVE = STATUS_CODES['Active']
+USED = STATUS_CODES['Used']   # codes up to USED may pass a gate
+
+# Rows fetched per round trip while loading
+FETCH_SIZE = 10000
+
+TICKETS_SQL = """
+    SELECT lt.TicketID, lt.ValidDate,
+           COALESCE(lt.ExpirationDate,
+                    DATE_ADD(lt.ValidDate, INTERVAL pt.DurationDays - 1 DAY),
+                    lt.ValidDate),
+           lt.TicketStatus
+    FROM Lift_Tickets lt
+    JOIN Pass_Types pt ON pt.PassTypeID = lt.PassTypeID
+    -- Prunes to the partitions of the seasons in the window
+    WHERE lt.ValidDate >= DATE_SUB(CURDATE(), INTERVAL %s DAY)
+"""
+
+MARKER_SQL = """
+    SELECT (SELECT MAX(TicketID) FROM Lift_Tickets),
+           (SELECT MAX(UpdatedAt) FROM Lift_Tickets),
+           (SELECT MAX(UpdatedAt) FROM Pass_Types)
+"""
+
+
+def print_header(message: str) -> None:
+    print(f"{Colors.BLUE}{'=' * 76}{Colors.NC}")
+    print(f"{Colors.BLUE}{message}{Colors.NC}")
+    print(f"{Colors.BLUE}{'=' * 76}{Colors.NC}")
+
+
+def print_success(message: str) -> None:
+    print(f"{Colors.GREEN}✓ {message}{Colors.NC}")
+
+
+def print_error(message: str) -> None:
+    print(f"{Colors.RED}✗ {message}{Colors.NC}")
+
+
+def print_info(message: str) -> None:
+    print(f"{Colors.YELLOW}ℹ {message}{Colors.NC}")
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+class _Slots:
+    """One generation of the index arrays; slot = TicketID - base."""
+
+    __slots__ = ('base', 'first', 'last', 'status')
+
+    def __init__(self, base, size=0):
+        self.base = base
+        self.first = array('i', bytes(4 * size))
+        self.last = array('i', bytes(4 * size))
+        self.status = array('b', bytes(size))
+
+    def put(self, ticket_id, first, last, status):
+        slot = ticket_id - self.base
+        if slot < 0:
+            # Only while building: load() sizes from MIN(TicketID), and poll()
+            # reloads rather than rebase a live _Slots
+            self.first[0:0] = array('i', bytes(4 * -slot))
+            self.last[0:0] = array('i', bytes(4 * -slot))
+            self.status[0:0] = array('b', bytes(-slot))
+            self.base, slot = ticket_id, 0
+        grow = slot + 1 - len(self.status)
+        if grow > 0:
+            # status grows last: readers bounds-check against it
+            self.first.frombytes(bytes(4 * grow))
+            self.last.frombytes(bytes(4 * grow))
+            self.status.frombytes(bytes(grow))
+        self.first[slot] = first
+        self.last[slot] = last
+        self.status[slot] = status
+
+    def nbytes(self):
+        return sum(sys.getsizeof(a) for a in (self.first, self.last, self.status))
+
+
+class TicketIndex:
+    """
+    TicketID -> validity range and status, see the module docstring.
+
+    One thread may load()/poll() while others check(): new slots are
+    written before they become visible, and a full load builds a new
+    _Slots and swaps it in with one assignment. mark_used() records a
+    first scan locally; the caller writes it to the database.
+    """
+
+    def __init__(self, db, window_days=365, lookback_seconds=5):
+        self.db = db
+        self.window_days = window_days
+        self.lookback = timedelta(seconds=lookback_seconds)
+        self._slots = _Slots(1)
+        self.count = 0
+        self.marker = None
+        self.loaded_at = None
+
+    def __len__(self):
+        return self.count
+
+    def _read_marker(self):
+        rows, _ = self.db.query(MARKER_SQL)
+        return rows[0]
+
+    def build(self, rows, min_id, max_id):
+        """Replace the index with rows of (TicketID, first ordinal, last ordinal, status code)."""
+        size = max_id - min_id + 1 if max_id is not None else 0
+        slots = _Slots(min_id or 1, size)
+        count = 0
+        for ticket_id, first, last, status in rows:
+            slots.put(ticket_id, first, last, status)
+            count += 1
+        self._slots = slots
+        self.count = count
+        self.loaded_at = time.monotonic()
+        return count
+
+    def _stream(self, sql, params):
+        with self.db.stream(sql, params) as cursor:
+            while True:
+                rows = cursor.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                for ticket_id, valid, last, status in rows:
+                    yield ticket_id, valid.toordinal(), last.toordinal(), STATUS_CODES[status]
+
+    def load(self):
+        """Bulk-load every ticket in the window; returns the ticket count."""
+        marker = self._read_marker()
+        bounds, _ = self.db.query(
+            "SELECT MIN(TicketID), MAX(TicketID) FROM Lift_Tickets "
+            "WHERE ValidDate >= DATE_SUB(CURDATE(), INTERVAL %s DAY)",
+            (self.window_days,))
+        count = self.build(self._stream(TICKETS_SQL, (self.window_days,)), *bounds[0])
+        self.marker = marker
+        return count
+
+    def poll(self):
+        """
+        Apply changes since the last marker; returns the rows read (0 when
+        the marker has not moved). Rows updated up to lookback_seconds
+        before the marker are read again, for transactions that committed
+        after it was taken. Before the first load() this is a load().
+        """
+        if self.marker is None:
+            return self.load()
+
+        marker = self._read_marker()
+        if marker == self.marker:
+            return 0
+        _, updated_at, pass_types_at = self.marker
+        if marker[2] != pass_types_at or updated_at is None:
+            return self.load()
+
+        slots = self._slots
+        changed = 0
+        for ticket_id, first, last, status in self._stream(
+                TICKETS_SQL + " AND lt.UpdatedAt >= %s",
+                (self.window_days, updated_at - self.lookback)):
+            if ticket_id < slots.base:
+                return self.load()
+            if not (0 <= ticket_id - slots.base < len(slots.status)
+                    and slots.status[ticket_id - slots.base]):
+                self.count += 1
+            slots.put(ticket_id, first, last, status)
+            changed += 1
+        self.marker = marker
+        return changed
+
+    def check(self, ticket_id, day):
+        """Lift_Scans.ScanResult for ticket_id scanned on day (a date ordinal)."""
+        slots = self._slots
+        slot = ticket_id - slots.base
+        if slot < 0 or slot >= len(slots.status):
+            return 'Unknown Ticket'
+        status = slots.status[slot]
+        if not status:
+            return 'Unknown Ticket'
+        if status > USED:
+            return 'Not Active'
+        if not slots.first[slot] <= day <= slots.last[slot]:
+            return 'Not Valid Today'
+        return 'Accepted'
+
+    def mark_used(self, ticket_id):
+        """Record a first scan; returns the ticket's first valid day if it was Active."""
+        slots = self._slots
+        slot = ticket_id - slots.base
+        if not 0 <= slot < len(slots.status) or slots.status[slot] != ACTIVE:
+            return None
+        slots.status[slot] = USED
+        return slots.first[slot]
+
+    def nbytes(self):
+        return self._slots.nbytes()
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def synthetic_rows(count, seed=None):
+    """count tickets from TicketID 1: mostly day tickets, some season passes."""
+    rng = random.Random(seed)
+    season_start = date(date.today().year, 1, 1).toordinal() - 60
+    codes = [ACTIVE] * 70 + [USED] * 25 + [STATUS_CODES['Expired']] * 3 + \
+            [STATUS_CODES['Cancelled']] * 2
+    for ticket_id in range(1, count + 1):
+        first = season_start + rng.randrange(150)
+        length = 180 if rng.random() < 0.05 else rng.choice((1, 1, 1, 2, 3))
+        yield ticket_id, first, first + length - 1, rng.choice(codes)
+
+
+def dict_check(tickets, ticket_id, day):
+    """The same check on a dict of (first, last, status) tuples, for comparison."""
+    entry = tickets.get(ticket_id)
+    if entry is None:
+        return 'Unknown Ticket'
+    first, last, status = entry
+    if status > USED:
+        return 'Not Active'
+    if not first <= day <= last:
+        return 'Not Valid Today'
+    return 'Accepted'
+
+
+def time_lookups(check, ids, days, batch=1000):
+    """Per-lookup nanoseconds for each batch of lookups, sorted."""
+    samples = []
+    for start in range(0, len(ids) - batch + 1, batch):
+        batch_ids = ids[start:start + batch]
+        batch_days = days[start:start + batch]
+        started = time.perf_counter_ns()
+        for ticket_id, day in zip(batch_ids, batch_days):
+            check(ticket_id, day)
+        samples.append((time.perf_counter_ns() - started) / batch)
+    return sorted(samples)
+
+
+def run_benchmark(args) -> int:
+    print_header("Ticket Validity Index Benchmark (Ski Resort Management System)")
+
+    index = TicketIndex(DB, window_days=args.window_days)
+    started = time.perf_counter()
+    try:
+        if args.synthetic:
+            index.build(synthetic_rows(args.synthetic, args.seed), 1, args.synthetic)
+            source = f"{args.synthetic:,} synthetic tickets"
+        else:
+            index.load()
+            source = f"Lift_Tickets, last {args.window_days} days"
+    except Error as e:
+        print_error(f"Cannot load tickets: {e}")
+        return 1
+    load_seconds = time.perf_counter() - started
+
+    if not len(index):
+        print_error("No tickets to index; run scripts/load.py or use --synthetic")
+        return 1
+    print_success(f"Indexed {len(index):,} tickets from {source} in {load_seconds:.2f}s")
+
+    # Lookups: known tickets on days around their ranges, plus 1% unknown ids
+    slots = index._slots
+    known = [slots.base + i for i, status in enumerate(slots.status) if status]
+    rng = random.Random(args.seed)
+    ids, days = [], []
+    for _ in range(args.lookups):
+        if rng.random() < 0.01:
+            ids.append(slots.base + len(slots.status) + rng.randrange(1000))
+            days.append(0)
+            continue
+        ticket_id = rng.choice(known)
+        slot = ticket_id - slots.base
+        ids.append(ticket_id)
+        days.append(slots.first[slot] + rng.randrange(-1, 3))
+
+    results = {}
+    for ticket_id, day in zip(ids, days):
+        result = index.check(ticket_id, day)
+        results[result] = results.get(result, 0) + 1
+
+    rows = []
+
+    def add_row(label, nbytes, samples):
+        rows.append([
+            label, f"{nbytes / 1024 / 1024:,.1f}",
+            f"{nbytes / len(index):,.1f}",
+            f"{nbytes / len(index) * 1_000_000 / 1024 / 1024:,.1f}",
+            f"{percentile(samples, 50):,.0f}", f"{percentile(samples, 99):,.0f}",
+            f"{1e9 / percentile(samples, 50):,.0f}" if samples else '-'
+        ])
+
+    add_row('Array index', index.nbytes(), time_lookups(index.check, ids, days))
+
+    if args.baseline:
+        tracemalloc.start()
+        tickets = {
+            slots.base + i: (slots.first[i], slots.last[i], status)
+            for i, status in enumerate(slots.status) if status
+        }
+        nbytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        add_row('dict of tuples', nbytes,
+                time_lookups(lambda t, d: dict_check(tickets, t, d), ids, days))
+        del tickets
+
+    print()
+    print(tabulate(rows, headers=['Structure', 'MB', 'Bytes/ticket', 'MB per 1M',
+                                  'p50 ns', 'p99 ns', 'Lookups/s'],
+                   tablefmt='grid'))
+    print()
+    print_info(f"{args.lookups:,} lookups: " +
+               ', '.join(f"{result} {count:,}" for result, count in sorted(results.items())))
+
+    if not args.synthetic:
+        try:
+            started = time.perf_counter()
+            changed = index.poll()
+            print_info(f"Change-marker poll: {changed:,} rows read in "
+                       f"{(time.perf_counter() - started) * 1000:.1f} ms")
+        except Error as e:
+            print_error(f"Poll failed: {e}")
+            return 1
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the in-memory ticket validity index")
+    parser.add_argument('--synthetic', type=int, metavar='N',
+                        help="Index N generated tickets instead of the database's")
+    parser.add_argument('--window-days', type=int, default=365, metavar='DAYS',
+                        help="Index tickets valid from this many days back (default: 365)")
+    parser.add_argument('--lookups', type=int, default=1_000_000, metavar='N',
+                        help="Timed lookups (default: 1000000)")
+    parser.add_argument('--baseline', action='store_true',
+                        help="Also measure a dict of tuples holding the same tickets")
+    parser.add_argument('--seed', type=int, help="Random seed for a repeatable run")
+
+    args = parser.parse_args()
+    if args.synthetic is not None and args.synthetic < 1:
+        parser.error("--synthetic must be at least 1")
+    if args.lookups < 1000:
+        parser.error("--lookups must be at least 1000")
+    return args
+
+
+def main() -> None:
+    sys.exit(run_benchmark(parse_args()))
+
+
+if __name__ == '__main__':
+    main()
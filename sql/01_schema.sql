@@ -47,9 +47,14 @@ CREATE TABLE Pass_Types (
 ) ENGINE = InnoDB;
 -- ----------------------------------------------------------------------------
 -- 3. Lift Tickets: Individual ticket purchases/transactions
+-- Partitioned by ValidDate, one partition per season (July 1 - June 30), so
+-- date-bounded reads prune to the current season. MySQL allows no foreign
+-- keys on partitioned tables: the CustomerID and PassTypeID references are
+-- enforced by the trg_*_references_* triggers (05_triggers.sql). Closed
+-- seasons move to Lift_Tickets_Archive (sp_roll_over_season).
 -- ----------------------------------------------------------------------------
 CREATE TABLE Lift_Tickets (
-    TicketID INT PRIMARY KEY AUTO_INCREMENT,
+    TicketID INT AUTO_INCREMENT,
     CustomerID INT NOT NULL,
     PassTypeID INT NOT NULL,
     PurchaseDate DATETIME DEFAULT CURRENT_TIMESTAMP,
@@ -58,11 +63,21 @@ CREATE TABLE Lift_Tickets (
     SalePrice DECIMAL(10, 2) NOT NULL,
     TicketStatus ENUM('Active', 'Used', 'Expired', 'Cancelled') DEFAULT 'Active',
     CreatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- Change marker for in-memory ticket indexes (scripts/ticket_index.py)
+    UpdatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    -- Every unique key of a partitioned table must include the partition column
+    PRIMARY KEY (TicketID, ValidDate),
     CONSTRAINT chk_ticket_price CHECK (SalePrice >= 0),
-    CONSTRAINT chk_valid_date CHECK (ValidDate >= DATE(PurchaseDate)),
-    FOREIGN KEY (CustomerID) REFERENCES Customers(CustomerID) ON DELETE RESTRICT ON UPDATE CASCADE,
-    FOREIGN KEY (PassTypeID) REFERENCES Pass_Types(PassTypeID) ON DELETE RESTRICT ON UPDATE CASCADE
-) ENGINE = InnoDB;
+    CONSTRAINT chk_valid_date CHECK (ValidDate >= DATE(PurchaseDate))
+) ENGINE = InnoDB
+PARTITION BY RANGE COLUMNS (ValidDate) (
+    PARTITION p_before_2023 VALUES LESS THAN ('2023-07-01'),
+    PARTITION p2023_24 VALUES LESS THAN ('2024-07-01'),
+    PARTITION p2024_25 VALUES LESS THAN ('2025-07-01'),
+    PARTITION p2025_26 VALUES LESS THAN ('2026-07-01'),
+    PARTITION p2026_27 VALUES LESS THAN ('2027-07-01'),
+    PARTITION p_future VALUES LESS THAN (MAXVALUE)
+);
 -- ----------------------------------------------------------------------------
 -- 4. Instructors: Ski and snowboard instructors
 -- ----------------------------------------------------------------------------
@@ -149,9 +164,12 @@ CREATE TABLE Equipment (
 ) ENGINE = InnoDB;
 -- ----------------------------------------------------------------------------
 -- 8. Rentals: Rental transactions linking customers to equipment
+-- Partitioned by RentalDate per season like Lift_Tickets; the CustomerID
+-- reference and the Rental_Items -> Rentals cascade are enforced by
+-- triggers. Closed seasons move to Rentals_Archive.
 -- ----------------------------------------------------------------------------
 CREATE TABLE Rentals (
-    RentalID INT PRIMARY KEY AUTO_INCREMENT,
+    RentalID INT AUTO_INCREMENT,
     CustomerID INT NOT NULL,
     RentalDate DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
     ExpectedReturnDate DATETIME,
@@ -160,12 +178,20 @@ CREATE TABLE Rentals (
     RentalStatus ENUM('Active', 'Returned', 'Overdue', 'Lost') DEFAULT 'Active',
     CreatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     UpdatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (RentalID, RentalDate),
     CONSTRAINT chk_return_dates CHECK (
         ExpectedReturnDate IS NULL
         OR ExpectedReturnDate >= RentalDate
-    ),
-    FOREIGN KEY (CustomerID) REFERENCES Customers(CustomerID) ON DELETE RESTRICT ON UPDATE CASCADE
-) ENGINE = InnoDB;
+    )
+) ENGINE = InnoDB
+PARTITION BY RANGE COLUMNS (RentalDate) (
+    PARTITION p_before_2023 VALUES LESS THAN ('2023-07-01'),
+    PARTITION p2023_24 VALUES LESS THAN ('2024-07-01'),
+    PARTITION p2024_25 VALUES LESS THAN ('2025-07-01'),
+    PARTITION p2025_26 VALUES LESS THAN ('2026-07-01'),
+    PARTITION p2026_27 VALUES LESS THAN ('2027-07-01'),
+    PARTITION p_future VALUES LESS THAN (MAXVALUE)
+);
 -- ----------------------------------------------------------------------------
 -- 9. Rental Items: Bridge table linking rentals to specific equipment items
 -- Many-to-Many: Rentals ↔ Equipment
@@ -178,7 +204,6 @@ CREATE TABLE Rental_Items (
     UnitPrice DECIMAL(10, 2) NOT NULL CHECK (UnitPrice >= 0),
     CreatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     CONSTRAINT uk_rental_equipment UNIQUE (RentalID, EquipmentID),
-    FOREIGN KEY (RentalID) REFERENCES Rentals(RentalID) ON DELETE CASCADE ON UPDATE CASCADE,
     FOREIGN KEY (EquipmentID) REFERENCES Equipment(EquipmentID) ON DELETE RESTRICT ON UPDATE CASCADE
 ) ENGINE = InnoDB;
 -- ----------------------------------------------------------------------------
@@ -350,4 +375,177 @@ CREATE TABLE Trail_Maintenance_Logs (
     FOREIGN KEY (TrailID) REFERENCES Trails(TrailID) ON DELETE CASCADE ON UPDATE CASCADE,
     FOREIGN KEY (StaffID) REFERENCES Maintenance_Staff(StaffID) ON DELETE
     SET NULL ON UPDATE CASCADE
-) ENGINE = InnoDB;
\ No newline at end of file
+) ENGINE = InnoDB;
+-- ============================================================================
+-- SUMMARY TABLES
+-- ============================================================================
+-- ----------------------------------------------------------------------------
+-- 17. Daily Revenue: Per-day, per-source revenue totals for the operations
+-- dashboard (Query 9) and revenue trends (Query 12)
+-- Kept current by the trg_daily_revenue_* triggers (05_triggers.sql);
+-- sp_rebuild_daily_revenue recomputes it from the source tables
+--   Active*: Active tickets, Active rentals, all enrollments
+--   Booked*: Active or Used tickets, Active or Returned rentals, all enrollments
+-- ----------------------------------------------------------------------------
+CREATE TABLE Daily_Revenue (
+    RevenueDate DATE NOT NULL,
+    RevenueSource ENUM('Tickets', 'Rentals', 'Lessons') NOT NULL,
+    ActiveCount INT NOT NULL DEFAULT 0,
+    ActiveRevenue DECIMAL(12, 2) NOT NULL DEFAULT 0.00,
+    BookedCount INT NOT NULL DEFAULT 0,
+    BookedRevenue DECIMAL(12, 2) NOT NULL DEFAULT 0.00,
+    UpdatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (RevenueDate, RevenueSource)
+) ENGINE = InnoDB;
+-- ----------------------------------------------------------------------------
+-- 18. Snapshot Metadata: One row per mv_* snapshot of a reporting view
+-- Written by sp_create_snapshot / sp_refresh_snapshot (04_functions.sql);
+-- vw_snapshot_status reports staleness
+-- ----------------------------------------------------------------------------
+CREATE TABLE Snapshot_Metadata (
+    SourceView VARCHAR(64) PRIMARY KEY,
+    SnapshotName VARCHAR(64) NOT NULL UNIQUE,
+    RefreshIntervalMinutes INT NOT NULL DEFAULT 15 CHECK (RefreshIntervalMinutes > 0),
+    LastRefreshStarted DATETIME(6),
+    LastRefreshCompleted DATETIME(6),
+    LastDurationMs DECIMAL(12, 3),
+    SnapshotRows INT,
+    RefreshCount INT NOT NULL DEFAULT 0,
+    LastError VARCHAR(255),
+    CreatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UpdatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE = InnoDB;
+-- ----------------------------------------------------------------------------
+-- 19. Equipment Inventory: Item count per (EquipmentType, Size, Status) for
+-- the rental counter's stock lookups and Query 11
+-- Kept current by the trg_equipment_inventory_* triggers (05_triggers.sql);
+-- sp_rebuild_equipment_inventory recomputes it from Equipment. A NULL
+-- Equipment.Size is counted under Size ''.
+-- ----------------------------------------------------------------------------
+CREATE TABLE Equipment_Inventory (
+    EquipmentType ENUM(
+        'Ski',
+        'Snowboard',
+        'Boots',
+        'Poles',
+        'Helmet',
+        'Goggles'
+    ) NOT NULL,
+    Size VARCHAR(20) NOT NULL DEFAULT '',
+    Status ENUM('Available', 'Rented', 'Maintenance', 'Retired') NOT NULL,
+    ItemCount INT NOT NULL DEFAULT 0,
+    UpdatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (EquipmentType, Size, Status)
+) ENGINE = InnoDB;
+-- ============================================================================
+-- PRICING TABLES
+-- ============================================================================
+-- ----------------------------------------------------------------------------
+-- 20. Rental Rates: Daily rental rate and duration discount per equipment type
+-- Read by fn_calculate_rental_price and sp_process_equipment_rental_batch
+-- (04_functions.sql) and cached by scripts/pricing.py. A rental uses the row
+-- for its type (EquipmentType NULL = any other type) with the highest
+-- MinDays not above its duration; a dated season covering today wins over
+-- the undated standard rates.
+-- ----------------------------------------------------------------------------
+CREATE TABLE Rental_Rates (
+    RateID INT PRIMARY KEY AUTO_INCREMENT,
+    EquipmentType ENUM(
+        'Ski',
+        'Snowboard',
+        'Boots',
+        'Poles',
+        'Helmet',
+        'Goggles'
+    ),
+    Season VARCHAR(30) NOT NULL DEFAULT 'Standard',
+    SeasonStart DATE,
+    SeasonEnd DATE,
+    MinDays INT NOT NULL DEFAULT 0 CHECK (MinDays >= 0),
+    DailyRate DECIMAL(10, 2) NOT NULL CHECK (DailyRate >= 0),
+    DiscountPct DECIMAL(5, 4) NOT NULL DEFAULT 0.0000 CHECK (
+        DiscountPct >= 0
+        AND DiscountPct < 1
+    ),
+    CreatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UpdatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    CONSTRAINT uk_rental_rate UNIQUE (EquipmentType, Season, MinDays),
+    CONSTRAINT chk_season_dates CHECK (
+        SeasonEnd IS NULL
+        OR SeasonEnd >= SeasonStart
+    )
+) ENGINE = InnoDB;
+-- ============================================================================
+-- SEASON ARCHIVE TABLES
+-- ============================================================================
+-- ----------------------------------------------------------------------------
+-- 21. Lift Tickets Archive: Tickets of closed seasons
+-- Filled by sp_roll_over_season (04_functions.sql), which moves each closed
+-- Lift_Tickets partition here and drops it. Compressed, since closed
+-- seasons are read only by history reports and sp_rebuild_daily_revenue.
+-- ----------------------------------------------------------------------------
+CREATE TABLE Lift_Tickets_Archive (
+    TicketID INT PRIMARY KEY,
+    CustomerID INT NOT NULL,
+    PassTypeID INT NOT NULL,
+    PurchaseDate DATETIME,
+    ValidDate DATE NOT NULL,
+    ExpirationDate DATE,
+    SalePrice DECIMAL(10, 2) NOT NULL,
+    TicketStatus ENUM('Active', 'Used', 'Expired', 'Cancelled'),
+    CreatedAt TIMESTAMP NULL,
+    UpdatedAt TIMESTAMP NULL,
+    ArchivedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) ENGINE = InnoDB ROW_FORMAT = COMPRESSED KEY_BLOCK_SIZE = 8;
+-- ----------------------------------------------------------------------------
+-- 22. Rentals Archive: Rentals of closed seasons (see Lift_Tickets_Archive)
+-- ----------------------------------------------------------------------------
+CREATE TABLE Rentals_Archive (
+    RentalID INT PRIMARY KEY,
+    CustomerID INT NOT NULL,
+    RentalDate DATETIME NOT NULL,
+    ExpectedReturnDate DATETIME,
+    ActualReturnDate DATETIME,
+    TotalPrice DECIMAL(10, 2) NOT NULL,
+    RentalStatus ENUM('Active', 'Returned', 'Overdue', 'Lost'),
+    CreatedAt TIMESTAMP NULL,
+    UpdatedAt TIMESTAMP NULL,
+    ArchivedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) ENGINE = InnoDB ROW_FORMAT = COMPRESSED KEY_BLOCK_SIZE = 8;
+-- ----------------------------------------------------------------------------
+-- 23. Rental Items Archive: Items of the rentals in Rentals_Archive
+-- ----------------------------------------------------------------------------
+CREATE TABLE Rental_Items_Archive (
+    RentalItemID INT PRIMARY KEY,
+    RentalID INT NOT NULL,
+    EquipmentID INT NOT NULL,
+    Quantity INT,
+    UnitPrice DECIMAL(10, 2) NOT NULL,
+    CreatedAt TIMESTAMP NULL,
+    ArchivedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) ENGINE = InnoDB ROW_FORMAT = COMPRESSED KEY_BLOCK_SIZE = 8;
+-- ============================================================================
+-- EVENT TABLES
+-- ============================================================================
+-- ----------------------------------------------------------------------------
+-- 24. Lift Scans: One row per ticket scan at a lift gate
+-- Written in batches by scripts/scan_ingest.py, which checks each ticket
+-- against its in-memory ticket index and marks first-scanned Active tickets
+-- 'Used'. Rejected scans are kept as well, with the reason. TicketID has no
+-- foreign key (Lift_Tickets is partitioned); unknown tickets are recorded
+-- as 'Unknown Ticket'.
+-- ----------------------------------------------------------------------------
+CREATE TABLE Lift_Scans (
+    ScanID BIGINT PRIMARY KEY AUTO_INCREMENT,
+    TicketID INT NOT NULL,
+    LiftID INT NOT NULL,
+    ScannedAt DATETIME(3) NOT NULL,
+    ScanResult ENUM(
+        'Accepted',
+        'Unknown Ticket',
+        'Not Active',
+        'Not Valid Today'
+    ) NOT NULL,
+    CreatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (LiftID) REFERENCES Lifts(LiftID) ON DELETE RESTRICT ON UPDATE CASCADE
+) ENGINE = InnoDB;
@@ -226,6 +226,26 @@ INSERT INTO Equipment (EquipmentType, Brand, Model, Size, Status, PurchaseDate,
 ('Goggles', 'Smith', 'IO Mag', 'One Size', 'Available', '2023-11-01', NULL, NULL, 'Excellent condition'),
 ('Goggles', 'Anon', 'M4', 'One Size', 'Rented', '2023-11-10', NULL, NULL, 'Good condition');
 
+-- ============================================================================
+-- RENTAL RATES (Daily rate per equipment type; 10% off rentals of 7+ days)
+-- ============================================================================
+INSERT INTO Rental_Rates (EquipmentType, Season, SeasonStart, SeasonEnd, MinDays, DailyRate, DiscountPct) VALUES
+('Ski', 'Standard', NULL, NULL, 0, 25.00, 0.0000),
+('Ski', 'Standard', NULL, NULL, 7, 25.00, 0.1000),
+('Snowboard', 'Standard', NULL, NULL, 0, 30.00, 0.0000),
+('Snowboard', 'Standard', NULL, NULL, 7, 30.00, 0.1000),
+('Boots', 'Standard', NULL, NULL, 0, 15.00, 0.0000),
+('Boots', 'Standard', NULL, NULL, 7, 15.00, 0.1000),
+('Poles', 'Standard', NULL, NULL, 0, 5.00, 0.0000),
+('Poles', 'Standard', NULL, NULL, 7, 5.00, 0.1000),
+('Helmet', 'Standard', NULL, NULL, 0, 8.00, 0.0000),
+('Helmet', 'Standard', NULL, NULL, 7, 8.00, 0.1000),
+('Goggles', 'Standard', NULL, NULL, 0, 10.00, 0.0000),
+('Goggles', 'Standard', NULL, NULL, 7, 10.00, 0.1000),
+-- Any other equipment type
+(NULL, 'Standard', NULL, NULL, 0, 20.00, 0.0000),
+(NULL, 'Standard', NULL, NULL, 7, 20.00, 0.1000);
+
 -- ============================================================================
 -- LIFT TICKETS (Individual ticket purchases)
 -- ============================================================================
@@ -290,6 +290,9 @@ ORDER BY
 -- ----------------------------------------------------------------------------
 -- View 7: Customer Activity (Masked PII)
 -- Purpose: Show multi-channel customer activity without exposing full PII
+-- Note: Each channel is aggregated per customer before joining, so a
+--       customer's tickets, lessons and rentals are never multiplied into a
+--       tickets x lessons x rentals cross product (which inflated the SUMs)
 -- ----------------------------------------------------------------------------
 CREATE OR REPLACE VIEW vw_customer_activity_masked AS
 SELECT
@@ -297,24 +300,31 @@ SELECT
     CONCAT(LEFT(c.FirstName, 1), '***') AS FirstNameMasked,
     CONCAT(LEFT(c.LastName, 1), '***') AS LastNameMasked,
     CONCAT(LEFT(c.Email, 3), '***@', SUBSTRING_INDEX(c.Email, '@', -1)) AS EmailMasked,
-    COUNT(DISTINCT lt.TicketID) AS total_tickets_purchased,
-    COUNT(DISTINCT e.EnrollmentID) AS total_lessons_enrolled,
-    COUNT(DISTINCT r.RentalID) AS total_rentals,
-    COALESCE(SUM(lt.SalePrice), 0) AS ticket_spend,
-    COALESCE(SUM(e.PaymentAmount), 0) AS lesson_spend,
-    COALESCE(SUM(r.TotalPrice), 0) AS rental_spend,
-    COALESCE(SUM(lt.SalePrice), 0)
-        + COALESCE(SUM(e.PaymentAmount), 0)
-        + COALESCE(SUM(r.TotalPrice), 0) AS total_spend
+    COALESCE(t.ticket_count, 0) AS total_tickets_purchased,
+    COALESCE(e.lesson_count, 0) AS total_lessons_enrolled,
+    COALESCE(r.rental_count, 0) AS total_rentals,
+    COALESCE(t.ticket_spend, 0) AS ticket_spend,
+    COALESCE(e.lesson_spend, 0) AS lesson_spend,
+    COALESCE(r.rental_spend, 0) AS rental_spend,
+    COALESCE(t.ticket_spend, 0)
+        + COALESCE(e.lesson_spend, 0)
+        + COALESCE(r.rental_spend, 0) AS total_spend
 FROM Customers c
-LEFT JOIN Lift_Tickets lt ON c.CustomerID = lt.CustomerID
-LEFT JOIN Enrollments e ON c.CustomerID = e.CustomerID
-LEFT JOIN Rentals r ON c.CustomerID = r.CustomerID
-GROUP BY
-    c.CustomerID,
-    c.FirstName,
-    c.LastName,
-    c.Email;
+LEFT JOIN (
+    SELECT CustomerID, COUNT(*) AS ticket_count, SUM(SalePrice) AS ticket_spend
+    FROM Lift_Tickets
+    GROUP BY CustomerID
+) t ON t.CustomerID = c.CustomerID
+LEFT JOIN (
+    SELECT CustomerID, COUNT(*) AS lesson_count, SUM(PaymentAmount) AS lesson_spend
+    FROM Enrollments
+    GROUP BY CustomerID
+) e ON e.CustomerID = c.CustomerID
+LEFT JOIN (
+    SELECT CustomerID, COUNT(*) AS rental_count, SUM(TotalPrice) AS rental_spend
+    FROM Rentals
+    GROUP BY CustomerID
+) r ON r.CustomerID = c.CustomerID;
 
 
 -- ----------------------------------------------------------------------------
@@ -338,6 +348,32 @@ SELECT
     CreatedAt
 FROM Customers;
 
+-- ============================================================================
+-- SNAPSHOT VIEWS
+-- ============================================================================
+
+-- ----------------------------------------------------------------------------
+-- View 9: Snapshot Status
+-- Purpose: Freshness of the mv_* snapshot tables (see 09_snapshots.sql)
+-- ----------------------------------------------------------------------------
+CREATE OR REPLACE VIEW vw_snapshot_status AS
+SELECT
+    SnapshotName,
+    SourceView,
+    RefreshIntervalMinutes,
+    LastRefreshCompleted,
+    LastDurationMs,
+    SnapshotRows,
+    RefreshCount,
+    TIMESTAMPDIFF(SECOND, LastRefreshCompleted, NOW()) AS staleness_seconds,
+    CASE
+        WHEN LastRefreshCompleted IS NULL THEN 'Never Refreshed'
+        WHEN LastRefreshCompleted <= NOW() - INTERVAL RefreshIntervalMinutes MINUTE THEN 'Stale'
+        ELSE 'Fresh'
+    END AS freshness_status,
+    LastError
+FROM Snapshot_Metadata;
+
 -- ============================================================================
 -- END OF VIEWS
 -- ============================================================================
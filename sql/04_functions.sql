@@ -15,7 +15,8 @@ DELIMITER $$
 -- ----------------------------------------------------------------------------
 -- Function 1: Calculate Rental Price
 -- Purpose: Calculate rental price based on equipment type, duration, and quantity
--- Business Logic: Different equipment types have different daily rates
+-- Business Logic: Daily rate and duration discount come from Rental_Rates,
+--                 so a price change is an UPDATE instead of a redeploy
 -- ----------------------------------------------------------------------------
 DROP FUNCTION IF EXISTS fn_calculate_rental_price$$
 
@@ -25,29 +26,31 @@ CREATE FUNCTION fn_calculate_rental_price(
     p_quantity INT
 )
 RETURNS DECIMAL(10,2)
-DETERMINISTIC
+NOT DETERMINISTIC  -- depends on Rental_Rates and today's season
 READS SQL DATA
 BEGIN
     DECLARE v_daily_rate DECIMAL(10,2);
+    DECLARE v_discount DECIMAL(5,4) DEFAULT 0.0000;
     DECLARE v_total_price DECIMAL(10,2);
+    DECLARE CONTINUE HANDLER FOR NOT FOUND SET v_daily_rate = NULL;
     
-    -- Set daily rates based on equipment type
-    SET v_daily_rate = CASE
-        WHEN p_equipment_type = 'Ski' THEN 25.00
-        WHEN p_equipment_type = 'Snowboard' THEN 30.00
-        WHEN p_equipment_type = 'Boots' THEN 15.00
-        WHEN p_equipment_type = 'Poles' THEN 5.00
-        WHEN p_equipment_type = 'Helmet' THEN 8.00
-        WHEN p_equipment_type = 'Goggles' THEN 10.00
-        ELSE 20.00  -- Default rate
-    END;
+    -- Rate tier for this type, falling back to the any-other-type row:
+    -- a season covering today first, then the longest tier that applies
+    SELECT DailyRate, DiscountPct
+    INTO v_daily_rate, v_discount
+    FROM Rental_Rates
+    WHERE (EquipmentType = p_equipment_type OR EquipmentType IS NULL)
+      AND MinDays <= GREATEST(p_duration_days, 0)
+      AND CURDATE() BETWEEN COALESCE(SeasonStart, CURDATE()) AND COALESCE(SeasonEnd, CURDATE())
+    ORDER BY EquipmentType IS NULL, SeasonStart IS NULL, MinDays DESC
+    LIMIT 1;
     
-    -- Calculate total: daily rate * duration * quantity
-    -- Apply discount for longer rentals (7+ days gets 10% off)
+    -- Calculate total: daily rate * duration * quantity, less the tier's
+    -- duration discount (10% for 7+ days in the standard rates)
     SET v_total_price = v_daily_rate * p_duration_days * p_quantity;
     
-    IF p_duration_days >= 7 THEN
-        SET v_total_price = v_total_price * 0.90;  -- 10% discount
+    IF v_discount > 0 THEN
+        SET v_total_price = v_total_price * (1 - v_discount);
     END IF;
     
     RETURN ROUND(v_total_price, 2);
@@ -125,47 +128,133 @@ END$$
 -- ============================================================================
 
 -- ----------------------------------------------------------------------------
--- Procedure 1: Process Equipment Rental
--- Purpose: Complete end-to-end equipment rental transaction
--- Business Logic: Validates availability, creates rental record, 
---                 updates equipment status, calculates total price
+-- Procedure 1: Process Equipment Rental (Multiple Items)
+-- Purpose: Rent a list of equipment items to one customer as one rental
+-- Business Logic: Locks and validates every item in one set-based pass,
+--                 prices all items in one join against Rental_Rates, then
+--                 inserts one Rentals row and N Rental_Items rows in a
+--                 single transaction.
+--                 trg_set_equipment_rented marks each item 'Rented'.
+-- Input: p_equipment_ids is a JSON array of EquipmentIDs, e.g. '[1, 14, 23]'
+-- Note: Starts its own transaction (commits any transaction already open)
 -- ----------------------------------------------------------------------------
-DROP PROCEDURE IF EXISTS sp_process_equipment_rental$$
+DROP PROCEDURE IF EXISTS sp_process_equipment_rental_batch$$
 
-CREATE PROCEDURE sp_process_equipment_rental(
+CREATE PROCEDURE sp_process_equipment_rental_batch(
     IN p_customer_id INT,
-    IN p_equipment_id INT,  -- Single equipment ID (simplified)
+    IN p_equipment_ids JSON,
     IN p_rental_days INT,
     OUT p_rental_id INT,
     OUT p_total_price DECIMAL(10,2),
     OUT p_status VARCHAR(50)
 )
 proc_label: BEGIN
-    DECLARE v_equipment_type VARCHAR(50);
-    DECLARE v_item_price DECIMAL(10,2);
-    DECLARE v_available BOOLEAN;
+    DECLARE v_requested INT DEFAULT 0;
+    DECLARE v_distinct INT DEFAULT 0;
+    DECLARE v_available INT DEFAULT 0;
+    DECLARE v_message TEXT;
+    
+    -- Any SQL error undoes the whole rental
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        GET DIAGNOSTICS CONDITION 1 v_message = MESSAGE_TEXT;
+        ROLLBACK;
+        DROP TEMPORARY TABLE IF EXISTS tmp_rental_request;
+        SET p_rental_id = 0;
+        SET p_total_price = 0.00;
+        SET p_status = LEFT(CONCAT('error: ', v_message), 50);
+    END;
     
     -- Initialize
+    SET p_rental_id = 0;
     SET p_total_price = 0.00;
     SET p_status = 'success';
     
-    -- Check if equipment is available
-    SET v_available = fn_check_equipment_availability(p_equipment_id);
+    IF p_equipment_ids IS NULL OR JSON_TYPE(p_equipment_ids) <> 'ARRAY'
+       OR JSON_LENGTH(p_equipment_ids) = 0 THEN
+        SET p_status = 'error: no equipment requested';
+        LEAVE proc_label;
+    END IF;
+    
+    IF p_rental_days IS NULL OR p_rental_days < 1 THEN
+        SET p_status = 'error: invalid rental duration';
+        LEAVE proc_label;
+    END IF;
+    
+    IF NOT EXISTS (SELECT 1 FROM Customers WHERE CustomerID = p_customer_id) THEN
+        SET p_status = 'error: customer not found';
+        LEAVE proc_label;
+    END IF;
+    
+    -- Unpack the JSON array into a keyed staging table
+    DROP TEMPORARY TABLE IF EXISTS tmp_rental_request;
+    CREATE TEMPORARY TABLE tmp_rental_request (
+        EquipmentID INT PRIMARY KEY,
+        UnitPrice DECIMAL(10,2)
+    ) ENGINE = MEMORY;
+    
+    SET v_requested = JSON_LENGTH(p_equipment_ids);
+    
+    INSERT IGNORE INTO tmp_rental_request (EquipmentID)
+    SELECT jt.EquipmentID
+    FROM JSON_TABLE(
+        p_equipment_ids, '$[*]' COLUMNS (EquipmentID INT PATH '$')
+    ) AS jt
+    WHERE jt.EquipmentID IS NOT NULL;
     
-    IF NOT v_available THEN
+    SELECT COUNT(*) INTO v_distinct FROM tmp_rental_request;
+    
+    IF v_distinct <> v_requested THEN
+        DROP TEMPORARY TABLE tmp_rental_request;
+        SET p_status = 'error: invalid or duplicate equipment id';
+        LEAVE proc_label;
+    END IF;
+    
+    START TRANSACTION;
+    
+    -- Lock every requested item in one pass; concurrent rentals of the same
+    -- items wait here instead of double-booking
+    SELECT COUNT(*) INTO v_available
+    FROM Equipment e
+    JOIN tmp_rental_request r ON r.EquipmentID = e.EquipmentID
+    WHERE e.Status = 'Available'
+    FOR UPDATE OF e;
+    
+    IF v_available < v_requested THEN
+        ROLLBACK;
+        DROP TEMPORARY TABLE tmp_rental_request;
         SET p_status = 'error: equipment not available';
-        SET p_rental_id = 0;
-        SET p_total_price = 0.00;
         LEAVE proc_label;
     END IF;
     
-    -- Get equipment type
-    SELECT EquipmentType INTO v_equipment_type
-    FROM Equipment
-    WHERE EquipmentID = p_equipment_id;
+    -- Price every item in one statement: the best Rental_Rates tier per type
+    -- (same choice as fn_calculate_rental_price), joined to the items
+    WITH ranked_rates AS (
+        SELECT
+            EquipmentType,
+            DailyRate,
+            DiscountPct,
+            ROW_NUMBER() OVER (
+                PARTITION BY EquipmentType
+                ORDER BY SeasonStart IS NULL, MinDays DESC
+            ) AS RateRank
+        FROM Rental_Rates
+        WHERE MinDays <= p_rental_days
+          AND CURDATE() BETWEEN COALESCE(SeasonStart, CURDATE()) AND COALESCE(SeasonEnd, CURDATE())
+    )
+    UPDATE tmp_rental_request r
+    JOIN Equipment e ON e.EquipmentID = r.EquipmentID
+    LEFT JOIN ranked_rates typed
+        ON typed.EquipmentType = e.EquipmentType AND typed.RateRank = 1
+    LEFT JOIN ranked_rates other
+        ON other.EquipmentType IS NULL AND other.RateRank = 1
+    SET r.UnitPrice = ROUND(
+        IF(typed.EquipmentType IS NULL, other.DailyRate, typed.DailyRate) * p_rental_days
+        * (1 - IF(typed.EquipmentType IS NULL, other.DiscountPct, typed.DiscountPct)),
+        2
+    );
     
-    -- Calculate rental price
-    SET v_item_price = fn_calculate_rental_price(v_equipment_type, p_rental_days, 1);
+    SELECT SUM(UnitPrice) INTO p_total_price FROM tmp_rental_request;
     
     -- Create rental record
     INSERT INTO Rentals (
@@ -178,63 +267,115 @@ proc_label: BEGIN
         p_customer_id,
         NOW(),
         DATE_ADD(NOW(), INTERVAL p_rental_days DAY),
-        v_item_price,
+        p_total_price,
         'Active'
     );
     
     SET p_rental_id = LAST_INSERT_ID();
-    SET p_total_price = v_item_price;
     
-    -- Create rental items record
+    -- Create all rental items in one statement
+    -- (trg_set_equipment_rented sets each item's Status to 'Rented')
     INSERT INTO Rental_Items (RentalID, EquipmentID, Quantity, UnitPrice)
-    VALUES (
-        p_rental_id,
-        p_equipment_id,
-        1,
-        v_item_price
-    );
+    SELECT p_rental_id, EquipmentID, 1, UnitPrice
+    FROM tmp_rental_request;
     
-    -- Update equipment status to 'Rented'
-    UPDATE Equipment
-    SET Status = 'Rented'
-    WHERE EquipmentID = p_equipment_id;
+    COMMIT;
     
+    DROP TEMPORARY TABLE tmp_rental_request;
     SET p_status = 'success';
     
 END$$
 
 -- ----------------------------------------------------------------------------
--- Procedure 2: Process Lift Ticket Purchase
--- Purpose: Complete lift ticket purchase transaction
--- Business Logic: Validates customer, creates ticket, applies pricing
+-- Procedure 2: Process Equipment Rental (Single Item)
+-- Purpose: Complete end-to-end equipment rental transaction
+-- Business Logic: One-item form of sp_process_equipment_rental_batch
+-- Note: Starts its own transaction (commits any transaction already open)
+--       and rolls it back on any SQL error
 -- ----------------------------------------------------------------------------
-DROP PROCEDURE IF EXISTS sp_process_ticket_purchase$$
+DROP PROCEDURE IF EXISTS sp_process_equipment_rental$$
 
-CREATE PROCEDURE sp_process_ticket_purchase(
+CREATE PROCEDURE sp_process_equipment_rental(
+    IN p_customer_id INT,
+    IN p_equipment_id INT,
+    IN p_rental_days INT,
+    OUT p_rental_id INT,
+    OUT p_total_price DECIMAL(10,2),
+    OUT p_status VARCHAR(50)
+)
+BEGIN
+    CALL sp_process_equipment_rental_batch(
+        p_customer_id,
+        JSON_ARRAY(p_equipment_id),
+        p_rental_days,
+        p_rental_id,
+        p_total_price,
+        p_status
+    );
+END$$
+
+-- ----------------------------------------------------------------------------
+-- Procedure 3: Process Lift Ticket Purchase (Bulk)
+-- Purpose: Sell p_quantity identical tickets in one transaction
+-- Business Logic: Validates the customer and pass type once, then creates
+--                 every ticket with one INSERT ... SELECT over a generated
+--                 sequence, so a 200-ticket group order is a single
+--                 statement. The new IDs are read back inside the
+--                 transaction and left in the session temporary table
+--                 tmp_purchased_tickets (one row per ticket) until the next
+--                 purchase in the session; p_first/p_last_ticket_id bound
+--                 them, but other orders' IDs can fall in between.
+-- Input: p_quantity from 1 to 1000
+-- Note: Starts its own transaction (commits any transaction already open)
+--       and rolls it back on any SQL error
+-- ----------------------------------------------------------------------------
+DROP PROCEDURE IF EXISTS sp_process_ticket_purchase_bulk$$
+
+CREATE PROCEDURE sp_process_ticket_purchase_bulk(
     IN p_customer_id INT,
     IN p_pass_type_id INT,
     IN p_valid_date DATE,
-    IN p_quantity INT,
-    OUT p_ticket_ids TEXT,  -- Comma-separated ticket IDs
+    IN p_quantity INT,      -- 1 to 1000
+    OUT p_first_ticket_id INT,
+    OUT p_last_ticket_id INT,
     OUT p_total_amount DECIMAL(10,2),
     OUT p_status VARCHAR(50)
 )
 proc_label: BEGIN
     DECLARE v_base_price DECIMAL(10,2);
-    DECLARE v_sale_price DECIMAL(10,2);
-    DECLARE v_ticket_id INT;
-    DECLARE v_counter INT DEFAULT 0;
-    DECLARE v_ticket_id_list TEXT DEFAULT '';
+    DECLARE v_purchased_at DATETIME DEFAULT NOW();
+    DECLARE v_message TEXT;
+    
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        GET DIAGNOSTICS CONDITION 1 v_message = MESSAGE_TEXT;
+        ROLLBACK;
+        SET p_first_ticket_id = NULL;
+        SET p_last_ticket_id = NULL;
+        SET p_total_amount = 0.00;
+        SET p_status = LEFT(CONCAT('error: ', v_message), 50);
+    END;
     
     -- Initialize
+    SET p_first_ticket_id = NULL;
+    SET p_last_ticket_id = NULL;
     SET p_total_amount = 0.00;
-    SET p_status = 'success';
+    
+    DROP TEMPORARY TABLE IF EXISTS tmp_purchased_tickets;
+    CREATE TEMPORARY TABLE tmp_purchased_tickets (
+        TicketID INT PRIMARY KEY
+    ) ENGINE = InnoDB;
+    
+    -- The sequence below is a recursive CTE, bounded by the default
+    -- cte_max_recursion_depth of 1000
+    IF p_quantity IS NULL OR p_quantity < 1 OR p_quantity > 1000 THEN
+        SET p_status = 'error: quantity must be between 1 and 1000';
+        LEAVE proc_label;
+    END IF;
     
     -- Validate customer exists
     IF NOT EXISTS (SELECT 1 FROM Customers WHERE CustomerID = p_customer_id) THEN
         SET p_status = 'error: customer not found';
-        SET p_ticket_ids = '';
-        SET p_total_amount = 0.00;
         LEAVE proc_label;
     END IF;
     
@@ -245,50 +386,1051 @@ proc_label: BEGIN
     
     IF v_base_price IS NULL THEN
         SET p_status = 'error: invalid pass type';
+        LEAVE proc_label;
+    END IF;
+    
+    -- Rows committed by other sessions after this point stay invisible, and
+    -- any committed before it got their IDs before this order did, so the
+    -- read-back below only sees this order's tickets
+    START TRANSACTION WITH CONSISTENT SNAPSHOT;
+    
+    INSERT INTO Lift_Tickets (
+        CustomerID,
+        PassTypeID,
+        PurchaseDate,
+        ValidDate,
+        ExpirationDate,
+        SalePrice,
+        TicketStatus
+    )
+    WITH RECURSIVE ticket_seq (n) AS (
+        SELECT 1
+        UNION ALL
+        SELECT n + 1 FROM ticket_seq WHERE n < p_quantity
+    )
+    SELECT
+        p_customer_id,
+        p_pass_type_id,
+        v_purchased_at,
+        p_valid_date,
+        DATE_ADD(p_valid_date, INTERVAL 1 DAY),  -- Valid for the specified date
+        v_base_price,
+        'Active'
+    FROM ticket_seq;
+    
+    -- LAST_INSERT_ID() is the first ID of the statement. With interleaved
+    -- auto-increment locking (the MySQL 8.0 default) a concurrent insert can
+    -- take IDs inside the range, so the IDs are read back in this snapshot
+    -- (PurchaseDate alone has one-second resolution)
+    SET p_first_ticket_id = LAST_INSERT_ID();
+    
+    INSERT INTO tmp_purchased_tickets (TicketID)
+    SELECT TicketID
+    FROM Lift_Tickets
+    WHERE TicketID >= p_first_ticket_id
+      AND CustomerID = p_customer_id
+      AND PurchaseDate = v_purchased_at;
+    
+    SELECT MAX(TicketID) INTO p_last_ticket_id
+    FROM tmp_purchased_tickets;
+    
+    COMMIT;
+    
+    SET p_total_amount = v_base_price * p_quantity;
+    SET p_status = 'success';
+    
+END$$
+
+-- ----------------------------------------------------------------------------
+-- Procedure 4: Process Lift Ticket Purchase
+-- Purpose: Complete lift ticket purchase transaction
+-- Business Logic: Comma-separated-ID form of sp_process_ticket_purchase_bulk,
+--                 listing the IDs it left in tmp_purchased_tickets
+-- Input: p_quantity from 1 to 1000
+-- Note: Starts its own transaction (commits any transaction already open)
+--       and rolls it back on any SQL error
+-- ----------------------------------------------------------------------------
+DROP PROCEDURE IF EXISTS sp_process_ticket_purchase$$
+
+CREATE PROCEDURE sp_process_ticket_purchase(
+    IN p_customer_id INT,
+    IN p_pass_type_id INT,
+    IN p_valid_date DATE,
+    IN p_quantity INT,
+    OUT p_ticket_ids TEXT,  -- Comma-separated ticket IDs
+    OUT p_total_amount DECIMAL(10,2),
+    OUT p_status VARCHAR(50)
+)
+BEGIN
+    DECLARE v_first_ticket_id INT;
+    DECLARE v_last_ticket_id INT;
+    
+    CALL sp_process_ticket_purchase_bulk(
+        p_customer_id,
+        p_pass_type_id,
+        p_valid_date,
+        p_quantity,
+        v_first_ticket_id,
+        v_last_ticket_id,
+        p_total_amount,
+        p_status
+    );
+    
+    -- 1000 IDs fit in 16K; the default limit of 1024 holds about 170
+    SET SESSION group_concat_max_len = GREATEST(@@SESSION.group_concat_max_len, 16384);
+    
+    -- The table may not exist when the purchase failed before creating it
+    IF v_first_ticket_id IS NULL THEN
         SET p_ticket_ids = '';
-        SET p_total_amount = 0.00;
+    ELSE
+        SELECT COALESCE(GROUP_CONCAT(TicketID ORDER BY TicketID), '') INTO p_ticket_ids
+        FROM tmp_purchased_tickets;
+    END IF;
+END$$
+
+-- ----------------------------------------------------------------------------
+-- Procedure 5: Customer Lifetime Value Segmentation
+-- Purpose: Top-N customers by lifetime value with their segment, for
+--          marketing exports
+-- Business Logic: One grouped pass per fact table (tickets, rentals,
+--                 lessons) restricted to the date range, joined once per
+--                 customer. NULL arguments use the Query 5 defaults: top 50,
+--                 VIP >= 1000, High Value >= 500, Medium Value >= 200, all
+--                 dates.
+-- Returns: One result set with the same columns as Query 5
+-- ----------------------------------------------------------------------------
+DROP PROCEDURE IF EXISTS sp_customer_lifetime_value$$
+
+CREATE PROCEDURE sp_customer_lifetime_value(
+    IN p_top_n INT,
+    IN p_vip_threshold DECIMAL(10,2),
+    IN p_high_threshold DECIMAL(10,2),
+    IN p_medium_threshold DECIMAL(10,2),
+    IN p_start_date DATE,   -- inclusive, NULL for no lower bound
+    IN p_end_date DATE      -- inclusive, NULL for no upper bound
+)
+BEGIN
+    DECLARE v_top_n INT DEFAULT COALESCE(p_top_n, 50);
+    DECLARE v_vip DECIMAL(10,2) DEFAULT COALESCE(p_vip_threshold, 1000.00);
+    DECLARE v_high DECIMAL(10,2) DEFAULT COALESCE(p_high_threshold, 500.00);
+    DECLARE v_medium DECIMAL(10,2) DEFAULT COALESCE(p_medium_threshold, 200.00);
+    -- Half-open [v_start, v_end) range so the date columns stay sargable
+    DECLARE v_start DATETIME DEFAULT COALESCE(p_start_date, '1000-01-01');
+    DECLARE v_end DATETIME DEFAULT COALESCE(DATE_ADD(p_end_date, INTERVAL 1 DAY), '9999-12-31');
+    
+    WITH ticket_totals AS (
+        SELECT
+            CustomerID,
+            COUNT(CASE WHEN TicketStatus IN ('Active', 'Used') THEN 1 END) AS total_tickets,
+            COALESCE(SUM(CASE WHEN TicketStatus IN ('Active', 'Used') THEN SalePrice END), 0) AS ticket_revenue,
+            MAX(PurchaseDate) AS last_ticket_date
+        FROM Lift_Tickets
+        WHERE PurchaseDate >= v_start AND PurchaseDate < v_end
+        GROUP BY CustomerID
+    ),
+    rental_totals AS (
+        SELECT
+            CustomerID,
+            COUNT(CASE WHEN RentalStatus IN ('Active', 'Returned') THEN 1 END) AS total_rentals,
+            COALESCE(SUM(CASE WHEN RentalStatus IN ('Active', 'Returned') THEN TotalPrice END), 0) AS rental_revenue,
+            MAX(RentalDate) AS last_rental_date
+        FROM Rentals
+        WHERE RentalDate >= v_start AND RentalDate < v_end
+        GROUP BY CustomerID
+    ),
+    lesson_totals AS (
+        SELECT
+            CustomerID,
+            COUNT(*) AS total_lessons,
+            COALESCE(SUM(PaymentAmount), 0) AS lesson_revenue,
+            MAX(EnrollmentDate) AS last_lesson_date
+        FROM Enrollments
+        WHERE EnrollmentDate >= v_start AND EnrollmentDate < v_end
+        GROUP BY CustomerID
+    ),
+    customer_value AS (
+        SELECT
+            c.CustomerID,
+            CONCAT(c.FirstName, ' ', c.LastName) AS customer_name,
+            c.Email,
+            c.City,
+            c.StateProvince,
+            COALESCE(t.total_tickets, 0) AS total_tickets,
+            COALESCE(t.ticket_revenue, 0) AS ticket_revenue,
+            COALESCE(r.total_rentals, 0) AS total_rentals,
+            COALESCE(r.rental_revenue, 0) AS rental_revenue,
+            COALESCE(l.total_lessons, 0) AS total_lessons,
+            COALESCE(l.lesson_revenue, 0) AS lesson_revenue,
+            COALESCE(t.ticket_revenue, 0)
+                + COALESCE(r.rental_revenue, 0)
+                + COALESCE(l.lesson_revenue, 0) AS lifetime_value,
+            GREATEST(t.last_ticket_date, r.last_rental_date, l.last_lesson_date) AS last_activity_date
+        FROM Customers c
+        LEFT JOIN ticket_totals t ON t.CustomerID = c.CustomerID
+        LEFT JOIN rental_totals r ON r.CustomerID = c.CustomerID
+        LEFT JOIN lesson_totals l ON l.CustomerID = c.CustomerID
+    )
+    SELECT
+        CustomerID,
+        customer_name,
+        Email,
+        City,
+        StateProvince,
+        total_tickets,
+        ticket_revenue,
+        total_rentals,
+        rental_revenue,
+        total_lessons,
+        lesson_revenue,
+        lifetime_value,
+        last_activity_date,
+        CASE
+            WHEN lifetime_value >= v_vip THEN 'VIP'
+            WHEN lifetime_value >= v_high THEN 'High Value'
+            WHEN lifetime_value >= v_medium THEN 'Medium Value'
+            ELSE 'Low Value'
+        END AS customer_segment
+    FROM customer_value
+    WHERE lifetime_value > 0
+    ORDER BY lifetime_value DESC
+    LIMIT v_top_n;
+    
+END$$
+
+-- ----------------------------------------------------------------------------
+-- Procedure 6: Apply Daily Revenue Delta
+-- Purpose: Add (p_sign = 1) or remove (p_sign = -1) one ticket, rental or
+--          enrollment from its Daily_Revenue row
+-- Business Logic: Called by the trg_daily_revenue_* triggers. Only the
+--                 statuses that count toward revenue change the totals:
+--                 Active counts as active, Active/Used tickets and
+--                 Active/Returned rentals count as booked, and every
+--                 enrollment counts as both.
+-- Returns: Nothing
+-- ----------------------------------------------------------------------------
+DROP PROCEDURE IF EXISTS sp_apply_daily_revenue$$
+
+CREATE PROCEDURE sp_apply_daily_revenue(
+    IN p_source VARCHAR(10),    -- 'Tickets', 'Rentals' or 'Lessons'
+    IN p_date DATETIME,
+    IN p_status VARCHAR(20),    -- TicketStatus or RentalStatus; ignored for lessons
+    IN p_amount DECIMAL(10,2),
+    IN p_sign INT
+)
+BEGIN
+    DECLARE v_active INT DEFAULT 1;
+    DECLARE v_booked INT DEFAULT 1;
+    
+    IF p_source = 'Tickets' THEN
+        SET v_active = IF(p_status = 'Active', 1, 0);
+        SET v_booked = IF(p_status IN ('Active', 'Used'), 1, 0);
+    ELSEIF p_source = 'Rentals' THEN
+        SET v_active = IF(p_status = 'Active', 1, 0);
+        SET v_booked = IF(p_status IN ('Active', 'Returned'), 1, 0);
+    END IF;
+    
+    IF p_date IS NOT NULL AND v_booked = 1 THEN
+        INSERT INTO Daily_Revenue
+            (RevenueDate, RevenueSource, ActiveCount, ActiveRevenue, BookedCount, BookedRevenue)
+        VALUES (
+            DATE(p_date),
+            p_source,
+            p_sign * v_active,
+            p_sign * v_active * COALESCE(p_amount, 0),
+            p_sign,
+            p_sign * COALESCE(p_amount, 0)
+        )
+        ON DUPLICATE KEY UPDATE
+            ActiveCount = ActiveCount + VALUES(ActiveCount),
+            ActiveRevenue = ActiveRevenue + VALUES(ActiveRevenue),
+            BookedCount = BookedCount + VALUES(BookedCount),
+            BookedRevenue = BookedRevenue + VALUES(BookedRevenue);
+    END IF;
+    
+END$$
+
+-- ----------------------------------------------------------------------------
+-- Procedure 7: Rebuild Daily Revenue
+-- Purpose: Recompute Daily_Revenue from Lift_Tickets, Rentals and Enrollments
+-- Business Logic: Used to backfill after a load (data is inserted before the
+--                 triggers exist) and to reconcile the incremental totals.
+--                 Same status rules as sp_apply_daily_revenue. Seasons
+--                 moved to the *_Archive tables by sp_roll_over_season
+--                 still count.
+-- Returns: Nothing
+-- ----------------------------------------------------------------------------
+DROP PROCEDURE IF EXISTS sp_rebuild_daily_revenue$$
+
+CREATE PROCEDURE sp_rebuild_daily_revenue()
+BEGIN
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+    
+    START TRANSACTION;
+    
+    DELETE FROM Daily_Revenue;
+    
+    INSERT INTO Daily_Revenue
+        (RevenueDate, RevenueSource, ActiveCount, ActiveRevenue, BookedCount, BookedRevenue)
+    SELECT
+        DATE(PurchaseDate),
+        'Tickets',
+        COUNT(CASE WHEN TicketStatus = 'Active' THEN 1 END),
+        COALESCE(SUM(CASE WHEN TicketStatus = 'Active' THEN SalePrice END), 0),
+        COUNT(*),
+        SUM(SalePrice)
+    FROM (
+        SELECT PurchaseDate, TicketStatus, SalePrice FROM Lift_Tickets
+        UNION ALL
+        SELECT PurchaseDate, TicketStatus, SalePrice FROM Lift_Tickets_Archive
+    ) t
+    WHERE PurchaseDate IS NOT NULL
+      AND TicketStatus IN ('Active', 'Used')
+    GROUP BY DATE(PurchaseDate)
+    
+    UNION ALL
+    
+    SELECT
+        DATE(RentalDate),
+        'Rentals',
+        COUNT(CASE WHEN RentalStatus = 'Active' THEN 1 END),
+        COALESCE(SUM(CASE WHEN RentalStatus = 'Active' THEN TotalPrice END), 0),
+        COUNT(*),
+        SUM(TotalPrice)
+    FROM (
+        SELECT RentalDate, RentalStatus, TotalPrice FROM Rentals
+        UNION ALL
+        SELECT RentalDate, RentalStatus, TotalPrice FROM Rentals_Archive
+    ) r
+    WHERE RentalStatus IN ('Active', 'Returned')
+    GROUP BY DATE(RentalDate)
+    
+    UNION ALL
+    
+    SELECT
+        DATE(EnrollmentDate),
+        'Lessons',
+        COUNT(*),
+        COALESCE(SUM(PaymentAmount), 0),
+        COUNT(*),
+        COALESCE(SUM(PaymentAmount), 0)
+    FROM Enrollments
+    WHERE EnrollmentDate IS NOT NULL
+    GROUP BY DATE(EnrollmentDate);
+    
+    COMMIT;
+    
+END$$
+
+-- ----------------------------------------------------------------------------
+-- Procedure 8: Refresh Snapshot
+-- Purpose: Rebuild the mv_* snapshot table of one registered reporting view
+-- Business Logic: Copies the view into <snapshot>__new, then swaps it in
+--                 with a single RENAME TABLE so readers always see a complete
+--                 snapshot. A named lock skips the refresh if another session
+--                 is already running it. Duration, row count and errors are
+--                 recorded in Snapshot_Metadata.
+-- Returns: Nothing (errors are re-raised after LastError is recorded)
+-- ----------------------------------------------------------------------------
+DROP PROCEDURE IF EXISTS sp_refresh_snapshot$$
+
+CREATE PROCEDURE sp_refresh_snapshot(
+    IN p_source_view VARCHAR(64)
+)
+proc_label: BEGIN
+    DECLARE v_snapshot VARCHAR(64);
+    DECLARE v_lock VARCHAR(64) DEFAULT LEFT(CONCAT(DATABASE(), '.', p_source_view), 64);
+    DECLARE v_started DATETIME(6);
+    DECLARE v_message TEXT;
+    
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        GET DIAGNOSTICS CONDITION 1 v_message = MESSAGE_TEXT;
+        UPDATE Snapshot_Metadata
+        SET LastError = LEFT(v_message, 255)
+        WHERE SourceView = p_source_view;
+        IF v_snapshot IS NOT NULL THEN
+            SET @mv_sql = CONCAT('DROP TABLE IF EXISTS ', v_snapshot, '__new');
+            PREPARE mv_stmt FROM @mv_sql;
+            EXECUTE mv_stmt;
+            DEALLOCATE PREPARE mv_stmt;
+        END IF;
+        DO RELEASE_LOCK(v_lock);
+        RESIGNAL;
+    END;
+    
+    -- Only registered views can be refreshed (this also keeps the dynamic
+    -- SQL below limited to known object names)
+    SELECT SnapshotName INTO v_snapshot
+    FROM Snapshot_Metadata
+    WHERE SourceView = p_source_view;
+    
+    IF v_snapshot IS NULL THEN
+        SIGNAL SQLSTATE '45000'
+        SET MESSAGE_TEXT = 'Error: View has no snapshot. Call sp_create_snapshot first.';
+    END IF;
+    
+    IF GET_LOCK(v_lock, 0) <> 1 THEN
         LEAVE proc_label;
     END IF;
     
-    -- Create tickets
-    WHILE v_counter < p_quantity DO
-        -- Calculate sale price (could apply discounts here)
-        SET v_sale_price = v_base_price;
+    SET v_started = SYSDATE(6);
+    UPDATE Snapshot_Metadata
+    SET LastRefreshStarted = v_started
+    WHERE SourceView = p_source_view;
+    
+    -- Build the new copy next to the live snapshot
+    SET @mv_sql = CONCAT('DROP TABLE IF EXISTS ', v_snapshot, '__new');
+    PREPARE mv_stmt FROM @mv_sql;
+    EXECUTE mv_stmt;
+    DEALLOCATE PREPARE mv_stmt;
+    
+    SET @mv_sql = CONCAT('CREATE TABLE ', v_snapshot, '__new AS SELECT * FROM ', p_source_view);
+    PREPARE mv_stmt FROM @mv_sql;
+    EXECUTE mv_stmt;
+    DEALLOCATE PREPARE mv_stmt;
+    
+    SET @mv_sql = CONCAT('SELECT COUNT(*) INTO @mv_rows FROM ', v_snapshot, '__new');
+    PREPARE mv_stmt FROM @mv_sql;
+    EXECUTE mv_stmt;
+    DEALLOCATE PREPARE mv_stmt;
+    
+    -- Swap: RENAME TABLE renames both tables in one atomic operation
+    IF EXISTS (
+        SELECT 1 FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = v_snapshot
+    ) THEN
+        SET @mv_sql = CONCAT('RENAME TABLE ', v_snapshot, ' TO ', v_snapshot, '__old, ',
+                             v_snapshot, '__new TO ', v_snapshot);
+        PREPARE mv_stmt FROM @mv_sql;
+        EXECUTE mv_stmt;
+        DEALLOCATE PREPARE mv_stmt;
         
-        -- Create ticket
-        INSERT INTO Lift_Tickets (
-            CustomerID,
-            PassTypeID,
-            PurchaseDate,
-            ValidDate,
-            ExpirationDate,
-            SalePrice,
-            TicketStatus
-        ) VALUES (
-            p_customer_id,
-            p_pass_type_id,
-            NOW(),
-            p_valid_date,
-            DATE_ADD(p_valid_date, INTERVAL 1 DAY),  -- Valid for the specified date
-            v_sale_price,
-            'Active'
-        );
+        SET @mv_sql = CONCAT('DROP TABLE ', v_snapshot, '__old');
+    ELSE
+        SET @mv_sql = CONCAT('RENAME TABLE ', v_snapshot, '__new TO ', v_snapshot);
+    END IF;
+    PREPARE mv_stmt FROM @mv_sql;
+    EXECUTE mv_stmt;
+    DEALLOCATE PREPARE mv_stmt;
+    
+    UPDATE Snapshot_Metadata
+    SET LastRefreshCompleted = SYSDATE(6),
+        LastDurationMs = TIMESTAMPDIFF(MICROSECOND, v_started, SYSDATE(6)) / 1000,
+        SnapshotRows = @mv_rows,
+        RefreshCount = RefreshCount + 1,
+        LastError = NULL
+    WHERE SourceView = p_source_view;
+    
+    DO RELEASE_LOCK(v_lock);
+    
+END$$
+
+-- ----------------------------------------------------------------------------
+-- Procedure 9: Create Snapshot
+-- Purpose: Register a view for snapshotting and build its first snapshot
+-- Business Logic: The snapshot of vw_<name> is mv_<name>. Calling it again
+--                 for a registered view updates its refresh interval and
+--                 refreshes it.
+-- Returns: Nothing
+-- ----------------------------------------------------------------------------
+DROP PROCEDURE IF EXISTS sp_create_snapshot$$
+
+CREATE PROCEDURE sp_create_snapshot(
+    IN p_source_view VARCHAR(64),
+    IN p_refresh_minutes INT    -- NULL for the default of 15
+)
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.VIEWS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = p_source_view
+    ) THEN
+        SIGNAL SQLSTATE '45000'
+        SET MESSAGE_TEXT = 'Error: Snapshot source must be a view in this database.';
+    END IF;
+    
+    INSERT INTO Snapshot_Metadata (SourceView, SnapshotName, RefreshIntervalMinutes)
+    VALUES (
+        p_source_view,
+        CONCAT('mv_', IF(p_source_view LIKE 'vw\_%', SUBSTRING(p_source_view, 4), p_source_view)),
+        COALESCE(p_refresh_minutes, 15)
+    )
+    ON DUPLICATE KEY UPDATE
+        RefreshIntervalMinutes = VALUES(RefreshIntervalMinutes);
+    
+    CALL sp_refresh_snapshot(p_source_view);
+    
+END$$
+
+-- ----------------------------------------------------------------------------
+-- Procedure 10: Refresh Due Snapshots
+-- Purpose: Refresh every snapshot older than its RefreshIntervalMinutes
+-- Business Logic: Run by the ev_refresh_snapshots event (09_snapshots.sql).
+--                 A failing snapshot keeps its LastError and the others are
+--                 still refreshed.
+-- Returns: Nothing
+-- ----------------------------------------------------------------------------
+DROP PROCEDURE IF EXISTS sp_refresh_due_snapshots$$
+
+CREATE PROCEDURE sp_refresh_due_snapshots()
+BEGIN
+    DECLARE v_done BOOLEAN DEFAULT FALSE;
+    DECLARE v_source_view VARCHAR(64);
+    
+    DECLARE due_cursor CURSOR FOR
+        SELECT SourceView
+        FROM Snapshot_Metadata
+        WHERE LastRefreshCompleted IS NULL
+           OR LastRefreshCompleted <= NOW() - INTERVAL RefreshIntervalMinutes MINUTE
+        ORDER BY LastRefreshCompleted;
+    
+    DECLARE CONTINUE HANDLER FOR NOT FOUND SET v_done = TRUE;
+    -- Already recorded in Snapshot_Metadata.LastError; move on to the next one
+    DECLARE CONTINUE HANDLER FOR SQLEXCEPTION BEGIN END;
+    
+    OPEN due_cursor;
+    
+    refresh_loop: LOOP
+        FETCH due_cursor INTO v_source_view;
+        IF v_done THEN
+            LEAVE refresh_loop;
+        END IF;
+        
+        CALL sp_refresh_snapshot(v_source_view);
+        -- A "no data" condition inside the call must not end the loop
+        SET v_done = FALSE;
+    END LOOP;
+    
+    CLOSE due_cursor;
+    
+END$$
+
+-- ----------------------------------------------------------------------------
+-- Procedure 11: Enroll Customer in Lesson
+-- Purpose: Enroll a customer in a scheduled lesson without overbooking
+-- Business Logic: trg_prevent_overbooking reserves the seat with a single
+--                 conditional UPDATE (CurrentEnrollment < MaxCapacity) and
+--                 checks the affected-row count, so concurrent enrollments
+--                 only wait on the lesson's own row and stay correct at
+--                 READ COMMITTED. A full lesson or a repeat enrollment is
+--                 reported in p_status instead of raised.
+-- ----------------------------------------------------------------------------
+DROP PROCEDURE IF EXISTS sp_enroll_customer$$
+
+CREATE PROCEDURE sp_enroll_customer(
+    IN p_customer_id INT,
+    IN p_lesson_id INT,
+    IN p_payment_amount DECIMAL(10,2),  -- NULL to charge the lesson price
+    OUT p_enrollment_id INT,
+    OUT p_status VARCHAR(50)
+)
+proc_label: BEGIN
+    DECLARE v_price DECIMAL(10,2);
+    DECLARE v_lesson_status VARCHAR(20);
+    DECLARE v_message TEXT;
+    
+    -- Raised by trg_prevent_overbooking
+    DECLARE EXIT HANDLER FOR SQLSTATE '45000'
+    BEGIN
+        ROLLBACK;
+        SET p_enrollment_id = 0;
+        SET p_status = 'error: lesson is full';
+    END;
+    
+    -- uk_customer_lesson
+    DECLARE EXIT HANDLER FOR 1062
+    BEGIN
+        ROLLBACK;
+        SET p_enrollment_id = 0;
+        SET p_status = 'error: already enrolled';
+    END;
+    
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        GET DIAGNOSTICS CONDITION 1 v_message = MESSAGE_TEXT;
+        ROLLBACK;
+        SET p_enrollment_id = 0;
+        SET p_status = LEFT(CONCAT('error: ', v_message), 50);
+    END;
+    
+    -- Initialize
+    SET p_enrollment_id = 0;
+    SET p_status = 'success';
+    
+    -- Validate customer exists
+    IF NOT EXISTS (SELECT 1 FROM Customers WHERE CustomerID = p_customer_id) THEN
+        SET p_status = 'error: customer not found';
+        LEAVE proc_label;
+    END IF;
+    
+    -- Validate lesson is open for enrollment
+    SELECT Price, LessonStatus INTO v_price, v_lesson_status
+    FROM Scheduled_Lessons
+    WHERE LessonID = p_lesson_id;
+    
+    IF v_lesson_status IS NULL THEN
+        SET p_status = 'error: lesson not found';
+        LEAVE proc_label;
+    END IF;
+    
+    IF v_lesson_status <> 'Scheduled' THEN
+        SET p_status = 'error: lesson is not open for enrollment';
+        LEAVE proc_label;
+    END IF;
+    
+    START TRANSACTION;
+    
+    -- The BEFORE INSERT trigger takes the seat or raises SQLSTATE 45000
+    INSERT INTO Enrollments (CustomerID, LessonID, PaymentStatus, PaymentAmount)
+    VALUES (p_customer_id, p_lesson_id, 'Paid', COALESCE(p_payment_amount, v_price, 0.00));
+    
+    SET p_enrollment_id = LAST_INSERT_ID();
+    
+    COMMIT;
+    
+END$$
+
+-- ----------------------------------------------------------------------------
+-- Procedure 12: Close Out Rentals (Bulk Return / Overdue Sweep)
+-- Purpose: Mark a batch of rentals 'Returned' (releasing their equipment)
+--          or 'Overdue' in one transaction
+-- Business Logic: Stages the batch in a keyed temporary table, locks the
+--                 rentals in one pass, then updates Equipment, Rentals and
+--                 Daily_Revenue with one join-based statement each.
+--                 @in_rental_close_out tells trg_return_equipment and
+--                 trg_daily_revenue_rental_update to skip their per-row
+--                 work, which the set-based statements already did.
+-- Input: p_rental_ids is a JSON array of RentalIDs, e.g. '[3, 8, 15]'; when
+--        NULL, every open rental expected back before p_cutoff is closed.
+--        Rentals that are already returned (or already overdue, for the
+--        sweep) are skipped.
+-- Note: Starts its own transaction (commits any transaction already open)
+-- ----------------------------------------------------------------------------
+DROP PROCEDURE IF EXISTS sp_close_out_rentals$$
+
+CREATE PROCEDURE sp_close_out_rentals(
+    IN p_rental_ids JSON,
+    IN p_cutoff DATETIME,
+    IN p_new_status VARCHAR(10),    -- 'Returned' or 'Overdue'
+    OUT p_rentals_closed INT,
+    OUT p_items_released INT,
+    OUT p_status VARCHAR(50)
+)
+proc_label: BEGIN
+    DECLARE v_returned INT DEFAULT 0;
+    DECLARE v_locked INT DEFAULT 0;
+    DECLARE v_message TEXT;
+    
+    -- Any SQL error undoes the whole batch
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        GET DIAGNOSTICS CONDITION 1 v_message = MESSAGE_TEXT;
+        ROLLBACK;
+        SET @in_rental_close_out = NULL;
+        DROP TEMPORARY TABLE IF EXISTS tmp_close_out;
+        SET p_rentals_closed = 0;
+        SET p_items_released = 0;
+        SET p_status = LEFT(CONCAT('error: ', v_message), 50);
+    END;
+    
+    -- Initialize
+    SET p_rentals_closed = 0;
+    SET p_items_released = 0;
+    SET p_status = 'success';
+    
+    IF p_new_status IS NULL OR p_new_status NOT IN ('Returned', 'Overdue') THEN
+        SET p_status = 'error: status must be Returned or Overdue';
+        LEAVE proc_label;
+    END IF;
+    
+    IF p_rental_ids IS NULL AND p_cutoff IS NULL THEN
+        SET p_status = 'error: no rental ids or cutoff given';
+        LEAVE proc_label;
+    END IF;
+    
+    IF p_rental_ids IS NOT NULL AND JSON_TYPE(p_rental_ids) <> 'ARRAY' THEN
+        SET p_status = 'error: rental ids must be a JSON array';
+        LEAVE proc_label;
+    END IF;
+    
+    SET v_returned = IF(p_new_status = 'Returned', 1, 0);
+    
+    DROP TEMPORARY TABLE IF EXISTS tmp_close_out;
+    CREATE TEMPORARY TABLE tmp_close_out (
+        RentalID INT PRIMARY KEY,
+        RentalDate DATETIME,
+        OldStatus VARCHAR(10),
+        TotalPrice DECIMAL(10,2)
+    ) ENGINE = MEMORY;
+    
+    START TRANSACTION;
+    
+    -- Stage the candidate rentals
+    IF p_rental_ids IS NOT NULL THEN
+        INSERT IGNORE INTO tmp_close_out (RentalID)
+        SELECT jt.RentalID
+        FROM JSON_TABLE(
+            p_rental_ids, '$[*]' COLUMNS (RentalID INT PATH '$')
+        ) AS jt
+        WHERE jt.RentalID IS NOT NULL;
+    ELSE
+        -- idx_rental_status_expected
+        INSERT INTO tmp_close_out (RentalID)
+        SELECT RentalID
+        FROM Rentals
+        WHERE RentalStatus IN ('Active', 'Overdue')
+          AND ExpectedReturnDate < p_cutoff;
+    END IF;
+    
+    -- Lock every candidate in one pass, so concurrent single returns wait
+    -- here instead of being counted twice
+    SELECT COUNT(*) INTO v_locked
+    FROM Rentals r
+    JOIN tmp_close_out t ON t.RentalID = r.RentalID
+    FOR UPDATE OF r;
+    
+    -- Snapshot the locked rows, then drop the ones that are not open
+    UPDATE tmp_close_out t
+    JOIN Rentals r ON r.RentalID = t.RentalID
+    SET t.RentalDate = r.RentalDate,
+        t.OldStatus = r.RentalStatus,
+        t.TotalPrice = r.TotalPrice;
+    
+    DELETE FROM tmp_close_out
+    WHERE OldStatus IS NULL
+       OR NOT (OldStatus = 'Active' OR (v_returned = 1 AND OldStatus = 'Overdue'));
+    
+    -- Release the equipment of returned rentals
+    IF v_returned = 1 THEN
+        UPDATE Equipment e
+        JOIN Rental_Items ri ON ri.EquipmentID = e.EquipmentID
+        JOIN tmp_close_out t ON t.RentalID = ri.RentalID
+        SET e.Status = 'Available'
+        WHERE e.Status = 'Rented';
+        
+        SET p_items_released = ROW_COUNT();
+    END IF;
+    
+    SET @in_rental_close_out = 1;
+    
+    UPDATE Rentals r
+    JOIN tmp_close_out t ON t.RentalID = r.RentalID
+    SET r.RentalStatus = p_new_status,
+        r.ActualReturnDate = IF(v_returned = 1, NOW(), r.ActualReturnDate);
+    
+    SET p_rentals_closed = ROW_COUNT();
+    SET @in_rental_close_out = NULL;
+    
+    -- Same deltas sp_apply_daily_revenue would apply row by row: an Active
+    -- rental stops counting as active, and only 'Returned' stays booked
+    INSERT INTO Daily_Revenue
+        (RevenueDate, RevenueSource, ActiveCount, ActiveRevenue, BookedCount, BookedRevenue)
+    SELECT
+        DATE(RentalDate),
+        'Rentals',
+        -SUM(OldStatus = 'Active'),
+        -SUM(IF(OldStatus = 'Active', TotalPrice, 0)),
+        SUM(v_returned - (OldStatus = 'Active')),
+        SUM((v_returned - (OldStatus = 'Active')) * TotalPrice)
+    FROM tmp_close_out
+    GROUP BY DATE(RentalDate)
+    ON DUPLICATE KEY UPDATE
+        ActiveCount = ActiveCount + VALUES(ActiveCount),
+        ActiveRevenue = ActiveRevenue + VALUES(ActiveRevenue),
+        BookedCount = BookedCount + VALUES(BookedCount),
+        BookedRevenue = BookedRevenue + VALUES(BookedRevenue);
+    
+    COMMIT;
+    
+    DROP TEMPORARY TABLE tmp_close_out;
+    
+END$$
+
+-- ----------------------------------------------------------------------------
+-- Procedure 13: Apply Equipment Inventory Delta
+-- Purpose: Add (p_sign = 1) or remove (p_sign = -1) one item from its
+--          Equipment_Inventory counter
+-- Business Logic: Called by the trg_equipment_inventory_* triggers, so every
+--                 status change (trg_set_equipment_rented,
+--                 trg_return_equipment, sp_close_out_rentals, maintenance)
+--                 moves the item between counters
+-- Returns: Nothing
+-- ----------------------------------------------------------------------------
+DROP PROCEDURE IF EXISTS sp_apply_equipment_inventory$$
+
+CREATE PROCEDURE sp_apply_equipment_inventory(
+    IN p_equipment_type VARCHAR(20),
+    IN p_size VARCHAR(20),
+    IN p_status VARCHAR(20),
+    IN p_sign INT
+)
+BEGIN
+    INSERT INTO Equipment_Inventory (EquipmentType, Size, Status, ItemCount)
+    VALUES (p_equipment_type, COALESCE(p_size, ''), p_status, p_sign)
+    ON DUPLICATE KEY UPDATE
+        ItemCount = ItemCount + VALUES(ItemCount);
+END$$
+
+-- ----------------------------------------------------------------------------
+-- Procedure 14: Rebuild Equipment Inventory
+-- Purpose: Recompute Equipment_Inventory from Equipment
+-- Business Logic: Used to backfill after a load (data is inserted before the
+--                 triggers exist) and to reconcile the counters
+-- Returns: Nothing
+-- ----------------------------------------------------------------------------
+DROP PROCEDURE IF EXISTS sp_rebuild_equipment_inventory$$
+
+CREATE PROCEDURE sp_rebuild_equipment_inventory()
+BEGIN
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+    
+    START TRANSACTION;
+    
+    DELETE FROM Equipment_Inventory;
+    
+    INSERT INTO Equipment_Inventory (EquipmentType, Size, Status, ItemCount)
+    SELECT EquipmentType, COALESCE(Size, ''), Status, COUNT(*)
+    FROM Equipment
+    GROUP BY EquipmentType, COALESCE(Size, ''), Status;
+    
+    COMMIT;
+    
+END$$
+
+-- ----------------------------------------------------------------------------
+-- Procedure 15: Get Equipment Stock
+-- Purpose: How many items of a type and size are in a status right now,
+--          e.g. available size-27 boots
+-- Business Logic: One primary key read of Equipment_Inventory. p_size NULL
+--                 counts every size of the type; p_status NULL means
+--                 'Available'.
+-- ----------------------------------------------------------------------------
+DROP PROCEDURE IF EXISTS sp_get_equipment_stock$$
+
+CREATE PROCEDURE sp_get_equipment_stock(
+    IN p_equipment_type VARCHAR(20),
+    IN p_size VARCHAR(20),
+    IN p_status VARCHAR(20),
+    OUT p_item_count INT
+)
+BEGIN
+    DECLARE v_status VARCHAR(20) DEFAULT COALESCE(p_status, 'Available');
+    
+    IF p_size IS NULL THEN
+        SELECT COALESCE(SUM(ItemCount), 0) INTO p_item_count
+        FROM Equipment_Inventory
+        WHERE EquipmentType = p_equipment_type
+          AND Status = v_status;
+    ELSE
+        SELECT COALESCE(SUM(ItemCount), 0) INTO p_item_count
+        FROM Equipment_Inventory
+        WHERE EquipmentType = p_equipment_type
+          AND Size = p_size
+          AND Status = v_status;
+    END IF;
+    
+END$$
+
+-- ----------------------------------------------------------------------------
+-- Procedure 16: Add Season Partitions
+-- Purpose: Make sure Lift_Tickets and Rentals have a season partition for
+--          every date up to p_through
+-- Business Logic: Seasons run July 1 - June 30 and are named p<YYYY>_<YY>.
+--                 Each missing season is split off the catch-all p_future
+--                 partition, which is normally empty, so no rows move.
+-- Returns: Nothing
+-- ----------------------------------------------------------------------------
+DROP PROCEDURE IF EXISTS sp_add_season_partitions$$
+
+CREATE PROCEDURE sp_add_season_partitions(
+    IN p_through DATE
+)
+BEGIN
+    DECLARE v_table VARCHAR(64);
+    DECLARE v_bound DATE;
+    DECLARE v_done BOOLEAN DEFAULT FALSE;
+    
+    -- End of the last season partition per table
+    DECLARE cur_tables CURSOR FOR
+        SELECT TABLE_NAME,
+               MAX(CAST(LEFT(TRIM(BOTH '''' FROM PARTITION_DESCRIPTION), 10) AS DATE))
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE()
+          AND TABLE_NAME IN ('Lift_Tickets', 'Rentals')
+          AND PARTITION_DESCRIPTION <> 'MAXVALUE'
+        GROUP BY TABLE_NAME;
+    DECLARE CONTINUE HANDLER FOR NOT FOUND SET v_done = TRUE;
+    
+    OPEN cur_tables;
+    
+    table_loop: LOOP
+        FETCH cur_tables INTO v_table, v_bound;
+        IF v_done THEN
+            LEAVE table_loop;
+        END IF;
         
-        SET v_ticket_id = LAST_INSERT_ID();
-        SET p_total_amount = p_total_amount + v_sale_price;
+        WHILE v_bound <= p_through DO
+            SET @season_sql = CONCAT(
+                'ALTER TABLE ', v_table, ' REORGANIZE PARTITION p_future INTO (',
+                'PARTITION p', YEAR(v_bound), '_', RIGHT(YEAR(v_bound) + 1, 2),
+                ' VALUES LESS THAN (''', v_bound + INTERVAL 1 YEAR, '''), ',
+                'PARTITION p_future VALUES LESS THAN (MAXVALUE))');
+            PREPARE season_stmt FROM @season_sql;
+            EXECUTE season_stmt;
+            DEALLOCATE PREPARE season_stmt;
+            
+            SET v_bound = v_bound + INTERVAL 1 YEAR;
+        END WHILE;
+    END LOOP;
+    
+    CLOSE cur_tables;
+    
+END$$
+
+-- ----------------------------------------------------------------------------
+-- Procedure 17: Roll Over Season
+-- Purpose: Move closed seasons of Lift_Tickets and Rentals to the compressed
+--          *_Archive tables, and add the partitions for the coming season
+-- Business Logic: Every season partition ending on or before
+--                 p_archive_before (NULL = start of the current season) is
+--                 copied to its archive table in one transaction, then
+--                 dropped, oldest first. Items of the moved rentals go to
+--                 Rental_Items_Archive. Dropping a partition fires no
+--                 triggers, so Daily_Revenue keeps the archived days, and
+--                 sp_rebuild_daily_revenue reads the archive tables too.
+--                 Nothing is archived while a rental before the cutoff is
+--                 still Active or Overdue. Rows already copied by a failed
+--                 run are skipped, so the procedure can simply be re-run.
+-- Returns: Tickets and rentals archived, and 'success' or an error message
+-- ----------------------------------------------------------------------------
+DROP PROCEDURE IF EXISTS sp_roll_over_season$$
+
+CREATE PROCEDURE sp_roll_over_season(
+    IN p_archive_before DATE,
+    OUT p_tickets_archived INT,
+    OUT p_rentals_archived INT,
+    OUT p_status VARCHAR(100)
+)
+proc_label: BEGIN
+    DECLARE v_cutoff DATE;
+    DECLARE v_table VARCHAR(64);
+    DECLARE v_partition VARCHAR(64);
+    DECLARE v_bound DATE;
+    DECLARE v_open_rentals INT;
+    DECLARE v_message TEXT;
+    DECLARE v_done BOOLEAN DEFAULT FALSE;
+    
+    -- Closed season partitions, oldest first
+    DECLARE cur_seasons CURSOR FOR
+        SELECT TABLE_NAME, PARTITION_NAME,
+               CAST(LEFT(TRIM(BOTH '''' FROM PARTITION_DESCRIPTION), 10) AS DATE) AS bound
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE()
+          AND TABLE_NAME IN ('Lift_Tickets', 'Rentals')
+          AND PARTITION_DESCRIPTION <> 'MAXVALUE'
+          AND CAST(LEFT(TRIM(BOTH '''' FROM PARTITION_DESCRIPTION), 10) AS DATE) <= v_cutoff
+        ORDER BY TABLE_NAME, bound;
+    DECLARE CONTINUE HANDLER FOR NOT FOUND SET v_done = TRUE;
+    
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        GET DIAGNOSTICS CONDITION 1 v_message = MESSAGE_TEXT;
+        ROLLBACK;
+        SET p_status = LEFT(CONCAT('error: ', v_message), 100);
+    END;
+    
+    SET p_tickets_archived = 0;
+    SET p_rentals_archived = 0;
+    SET p_status = 'success';
+    
+    -- Default: July 1 of the current season
+    SET v_cutoff = COALESCE(
+        p_archive_before,
+        MAKEDATE(YEAR(CURDATE()) - (MONTH(CURDATE()) < 7), 1) + INTERVAL 6 MONTH
+    );
+    
+    SELECT COUNT(*) INTO v_open_rentals
+    FROM Rentals
+    WHERE RentalDate < v_cutoff
+      AND RentalStatus IN ('Active', 'Overdue');
+    
+    IF v_open_rentals > 0 THEN
+        SET p_status = CONCAT('error: ', v_open_rentals, ' open rentals before ', v_cutoff);
+        LEAVE proc_label;
+    END IF;
+    
+    -- Partitions through next year, so new sales never land in p_future
+    CALL sp_add_season_partitions(CURDATE() + INTERVAL 1 YEAR);
+    
+    OPEN cur_seasons;
+    
+    season_loop: LOOP
+        FETCH cur_seasons INTO v_table, v_partition, v_bound;
+        IF v_done THEN
+            LEAVE season_loop;
+        END IF;
         
-        -- Add to ticket ID list
-        IF v_ticket_id_list = '' THEN
-            SET v_ticket_id_list = CAST(v_ticket_id AS CHAR);
+        -- Older partitions are already gone, so "< bound" is this partition
+        START TRANSACTION;
+        
+        IF v_table = 'Lift_Tickets' THEN
+            INSERT INTO Lift_Tickets_Archive
+                (TicketID, CustomerID, PassTypeID, PurchaseDate, ValidDate,
+                 ExpirationDate, SalePrice, TicketStatus, CreatedAt, UpdatedAt)
+            SELECT TicketID, CustomerID, PassTypeID, PurchaseDate, ValidDate,
+                   ExpirationDate, SalePrice, TicketStatus, CreatedAt, UpdatedAt
+            FROM Lift_Tickets
+            WHERE ValidDate < v_bound
+            ON DUPLICATE KEY UPDATE ArchivedAt = Lift_Tickets_Archive.ArchivedAt;
+            
+            SET p_tickets_archived = p_tickets_archived + ROW_COUNT();
         ELSE
-            SET v_ticket_id_list = CONCAT(v_ticket_id_list, ',', CAST(v_ticket_id AS CHAR));
+            INSERT INTO Rentals_Archive
+                (RentalID, CustomerID, RentalDate, ExpectedReturnDate, ActualReturnDate,
+                 TotalPrice, RentalStatus, CreatedAt, UpdatedAt)
+            SELECT RentalID, CustomerID, RentalDate, ExpectedReturnDate, ActualReturnDate,
+                   TotalPrice, RentalStatus, CreatedAt, UpdatedAt
+            FROM Rentals
+            WHERE RentalDate < v_bound
+            ON DUPLICATE KEY UPDATE ArchivedAt = Rentals_Archive.ArchivedAt;
+            
+            SET p_rentals_archived = p_rentals_archived + ROW_COUNT();
+            
+            INSERT INTO Rental_Items_Archive
+                (RentalItemID, RentalID, EquipmentID, Quantity, UnitPrice, CreatedAt)
+            SELECT ri.RentalItemID, ri.RentalID, ri.EquipmentID, ri.Quantity,
+                   ri.UnitPrice, ri.CreatedAt
+            FROM Rental_Items ri
+            JOIN Rentals r ON r.RentalID = ri.RentalID
+            WHERE r.RentalDate < v_bound
+            ON DUPLICATE KEY UPDATE ArchivedAt = Rental_Items_Archive.ArchivedAt;
         END IF;
         
-        SET v_counter = v_counter + 1;
-    END WHILE;
+        COMMIT;
+        
+        -- DDL commits implicitly, so the drop only runs after the copy is durable
+        SET @season_sql = CONCAT('ALTER TABLE ', v_table, ' DROP PARTITION ', v_partition);
+        PREPARE season_stmt FROM @season_sql;
+        EXECUTE season_stmt;
+        DEALLOCATE PREPARE season_stmt;
+        
+        -- The drop fired no cascade trigger; remove the moved rentals' items
+        IF v_table = 'Rentals' THEN
+            DELETE ri
+            FROM Rental_Items ri
+            JOIN Rentals_Archive ra ON ra.RentalID = ri.RentalID
+            WHERE ra.RentalDate < v_bound;
+        END IF;
+    END LOOP;
     
-    SET p_ticket_ids = v_ticket_id_list;
-    SET p_status = 'success';
+    CLOSE cur_seasons;
     
 END$$
 
@@ -304,8 +1446,23 @@ DELIMITER ;
 --   3. fn_calculate_ticket_refund - Calculates refund amount for ticket cancellation
 --
 -- Stored Procedures Created:
---   1. sp_process_equipment_rental - Processes complete equipment rental transaction
---   2. sp_process_ticket_purchase - Processes lift ticket purchase transaction
+--   1. sp_process_equipment_rental_batch - Rents several items in one transaction
+--   2. sp_process_equipment_rental - Processes complete equipment rental transaction
+--   3. sp_process_ticket_purchase_bulk - Sells up to 1000 tickets in one INSERT
+--   4. sp_process_ticket_purchase - Processes lift ticket purchase transaction
+--   5. sp_customer_lifetime_value - Top-N customers by lifetime value with segment
+--   6. sp_apply_daily_revenue - Adds or removes one ticket, rental or enrollment in Daily_Revenue
+--   7. sp_rebuild_daily_revenue - Recomputes Daily_Revenue, archived seasons included
+--   8. sp_refresh_snapshot - Rebuilds one reporting snapshot and swaps it in
+--   9. sp_create_snapshot - Registers a view as a snapshot and builds it
+--  10. sp_refresh_due_snapshots - Refreshes every snapshot past its interval
+--  11. sp_enroll_customer - Enrolls a customer in a lesson with a capacity check
+--  12. sp_close_out_rentals - Returns a batch of rentals or sweeps overdue ones
+--  13. sp_apply_equipment_inventory - Adds or removes one item in Equipment_Inventory
+--  14. sp_rebuild_equipment_inventory - Recomputes Equipment_Inventory from Equipment
+--  15. sp_get_equipment_stock - Stock counts by type, size and status
+--  16. sp_add_season_partitions - Adds season partitions through a date
+--  17. sp_roll_over_season - Archives closed seasons and drops their partitions
 --
--- Total: 3 Functions + 2 Procedures = 5 stored routines (exceeds requirement of ≥2)
+-- Total: 3 Functions + 17 Procedures = 20 stored routines (exceeds requirement of ≥2)
 
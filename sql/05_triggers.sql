@@ -2,9 +2,14 @@ USE ski_resort;
 
 -- ============================================================================
 -- TRIGGER 1: Prevent Lesson Overbooking
--- Purpose: Before adding a student, check if the class is already full.
+-- Purpose: Before adding a student, reserve a seat in the class.
 -- Why a trigger? A CHECK constraint cannot easily query the current count 
 -- relative to the max capacity dynamically.
+-- Why a conditional UPDATE? A plain SELECT of CurrentEnrollment lets two
+-- concurrent enrollments both see the last free seat. The UPDATE only
+-- matches while a seat is free, and its row lock makes the next enrollment
+-- for the same lesson wait and re-check the committed count, so capacity
+-- holds at READ COMMITTED without locking other lessons.
 -- ============================================================================
 DROP TRIGGER IF EXISTS trg_prevent_overbooking;
 
@@ -14,17 +19,14 @@ CREATE TRIGGER trg_prevent_overbooking
 BEFORE INSERT ON Enrollments
 FOR EACH ROW
 BEGIN
-    DECLARE current_count INT;
-    DECLARE max_cap INT;
-
-    -- Get current stats for the target lesson
-    SELECT CurrentEnrollment, MaxCapacity 
-    INTO current_count, max_cap
-    FROM Scheduled_Lessons
-    WHERE LessonID = NEW.LessonID;
+    -- Take a seat if one is left
+    UPDATE Scheduled_Lessons
+    SET CurrentEnrollment = CurrentEnrollment + 1
+    WHERE LessonID = NEW.LessonID
+      AND CurrentEnrollment < MaxCapacity;
 
-    -- Check if full
-    IF current_count >= max_cap THEN
+    -- No row matched: the class is full
+    IF ROW_COUNT() = 0 THEN
         SIGNAL SQLSTATE '45000' 
         SET MESSAGE_TEXT = 'Error: Cannot enroll. Lesson is at maximum capacity.';
     END IF;
@@ -34,23 +36,15 @@ DELIMITER ;
 
 -- ============================================================================
 -- TRIGGER 2: Sync Enrollment Counts
--- Purpose: Automatically update the 'CurrentEnrollment' counter in the 
--- Scheduled_Lessons table whenever a student is added or removed.
+-- Purpose: Give the seat back in Scheduled_Lessons when a student is
+-- removed. (Adding a student is counted by trg_prevent_overbooking, which
+-- replaces the old trg_after_enrollment_insert.)
 -- ============================================================================
 DROP TRIGGER IF EXISTS trg_after_enrollment_insert;
 DROP TRIGGER IF EXISTS trg_after_enrollment_delete;
 
 DELIMITER $$
 
-CREATE TRIGGER trg_after_enrollment_insert
-AFTER INSERT ON Enrollments
-FOR EACH ROW
-BEGIN
-    UPDATE Scheduled_Lessons
-    SET CurrentEnrollment = CurrentEnrollment + 1
-    WHERE LessonID = NEW.LessonID;
-END$$
-
 CREATE TRIGGER trg_after_enrollment_delete
 AFTER DELETE ON Enrollments
 FOR EACH ROW
@@ -98,6 +92,8 @@ DELIMITER ;
 -- TRIGGER 4: Auto-Release Equipment on Return
 -- Purpose: When a Rental is marked as "Returned" (ActualReturnDate set),
 -- automatically release all associated equipment back to 'Available'.
+-- Bulk close-outs go through sp_close_out_rentals, which releases the whole
+-- batch in one statement and sets @in_rental_close_out so this is skipped.
 -- ============================================================================
 DROP TRIGGER IF EXISTS trg_return_equipment;
 
@@ -108,18 +104,342 @@ AFTER UPDATE ON Rentals
 FOR EACH ROW
 BEGIN
     -- Only run logic if the item is being returned just now
-    IF OLD.ActualReturnDate IS NULL AND NEW.ActualReturnDate IS NOT NULL THEN
+    IF OLD.ActualReturnDate IS NULL AND NEW.ActualReturnDate IS NOT NULL
+       AND @in_rental_close_out IS NULL THEN
         
         -- Update status to 'Available' for all items in this rental
-        UPDATE Equipment
-        SET Status = 'Available'
-        WHERE EquipmentID IN (
-            SELECT EquipmentID 
-            FROM Rental_Items 
-            WHERE RentalID = NEW.RentalID
-        );
+        UPDATE Equipment e
+        JOIN Rental_Items ri ON ri.EquipmentID = e.EquipmentID
+        SET e.Status = 'Available'
+        WHERE ri.RentalID = NEW.RentalID;
         
     END IF;
 END$$
 
-DELIMITER ;
\ No newline at end of file
+DELIMITER ;
+
+-- ============================================================================
+-- TRIGGER 5: Maintain Daily Revenue
+-- Purpose: Keep the Daily_Revenue summary current so the operations
+-- dashboard (Query 9) and revenue trends (Query 12) read a few rows instead
+-- of scanning Lift_Tickets, Rentals and Enrollments on every refresh.
+-- An update removes the old row's contribution and adds the new one, so a
+-- changed date, status or price moves the amount to the right bucket.
+-- Rows loaded before these triggers exist are backfilled by the CALL below.
+-- Deletes made by ON DELETE CASCADE do not fire triggers; call
+-- sp_rebuild_daily_revenue() after deleting customers or lessons.
+-- ============================================================================
+CALL sp_rebuild_daily_revenue();
+
+DROP TRIGGER IF EXISTS trg_daily_revenue_ticket_insert;
+DROP TRIGGER IF EXISTS trg_daily_revenue_ticket_update;
+DROP TRIGGER IF EXISTS trg_daily_revenue_ticket_delete;
+DROP TRIGGER IF EXISTS trg_daily_revenue_rental_insert;
+DROP TRIGGER IF EXISTS trg_daily_revenue_rental_update;
+DROP TRIGGER IF EXISTS trg_daily_revenue_rental_delete;
+DROP TRIGGER IF EXISTS trg_daily_revenue_enrollment_insert;
+DROP TRIGGER IF EXISTS trg_daily_revenue_enrollment_update;
+DROP TRIGGER IF EXISTS trg_daily_revenue_enrollment_delete;
+
+DELIMITER $$
+
+CREATE TRIGGER trg_daily_revenue_ticket_insert
+AFTER INSERT ON Lift_Tickets
+FOR EACH ROW
+BEGIN
+    CALL sp_apply_daily_revenue('Tickets', NEW.PurchaseDate, NEW.TicketStatus, NEW.SalePrice, 1);
+END$$
+
+CREATE TRIGGER trg_daily_revenue_ticket_update
+AFTER UPDATE ON Lift_Tickets
+FOR EACH ROW
+BEGIN
+    -- Skip updates that do not touch the revenue columns
+    IF NOT (OLD.PurchaseDate <=> NEW.PurchaseDate
+            AND OLD.TicketStatus <=> NEW.TicketStatus
+            AND OLD.SalePrice <=> NEW.SalePrice) THEN
+        CALL sp_apply_daily_revenue('Tickets', OLD.PurchaseDate, OLD.TicketStatus, OLD.SalePrice, -1);
+        CALL sp_apply_daily_revenue('Tickets', NEW.PurchaseDate, NEW.TicketStatus, NEW.SalePrice, 1);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_daily_revenue_ticket_delete
+AFTER DELETE ON Lift_Tickets
+FOR EACH ROW
+BEGIN
+    CALL sp_apply_daily_revenue('Tickets', OLD.PurchaseDate, OLD.TicketStatus, OLD.SalePrice, -1);
+END$$
+
+CREATE TRIGGER trg_daily_revenue_rental_insert
+AFTER INSERT ON Rentals
+FOR EACH ROW
+BEGIN
+    CALL sp_apply_daily_revenue('Rentals', NEW.RentalDate, NEW.RentalStatus, NEW.TotalPrice, 1);
+END$$
+
+CREATE TRIGGER trg_daily_revenue_rental_update
+AFTER UPDATE ON Rentals
+FOR EACH ROW
+BEGIN
+    -- sp_close_out_rentals applies its batch's deltas in one statement
+    IF @in_rental_close_out IS NULL
+       AND NOT (OLD.RentalDate <=> NEW.RentalDate
+                AND OLD.RentalStatus <=> NEW.RentalStatus
+                AND OLD.TotalPrice <=> NEW.TotalPrice) THEN
+        CALL sp_apply_daily_revenue('Rentals', OLD.RentalDate, OLD.RentalStatus, OLD.TotalPrice, -1);
+        CALL sp_apply_daily_revenue('Rentals', NEW.RentalDate, NEW.RentalStatus, NEW.TotalPrice, 1);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_daily_revenue_rental_delete
+AFTER DELETE ON Rentals
+FOR EACH ROW
+BEGIN
+    CALL sp_apply_daily_revenue('Rentals', OLD.RentalDate, OLD.RentalStatus, OLD.TotalPrice, -1);
+END$$
+
+CREATE TRIGGER trg_daily_revenue_enrollment_insert
+AFTER INSERT ON Enrollments
+FOR EACH ROW
+BEGIN
+    CALL sp_apply_daily_revenue('Lessons', NEW.EnrollmentDate, NULL, NEW.PaymentAmount, 1);
+END$$
+
+CREATE TRIGGER trg_daily_revenue_enrollment_update
+AFTER UPDATE ON Enrollments
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.EnrollmentDate <=> NEW.EnrollmentDate
+            AND OLD.PaymentAmount <=> NEW.PaymentAmount) THEN
+        CALL sp_apply_daily_revenue('Lessons', OLD.EnrollmentDate, NULL, OLD.PaymentAmount, -1);
+        CALL sp_apply_daily_revenue('Lessons', NEW.EnrollmentDate, NULL, NEW.PaymentAmount, 1);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_daily_revenue_enrollment_delete
+AFTER DELETE ON Enrollments
+FOR EACH ROW
+BEGIN
+    CALL sp_apply_daily_revenue('Lessons', OLD.EnrollmentDate, NULL, OLD.PaymentAmount, -1);
+END$$
+
+DELIMITER ;
+
+-- ============================================================================
+-- TRIGGER 6: Maintain Equipment Inventory
+-- Purpose: Keep the Equipment_Inventory counters current so stock lookups
+-- (sp_get_equipment_stock) and Query 11 read a few counter rows instead of
+-- scanning Equipment. Every Equipment status change goes through these,
+-- including the ones made by trg_set_equipment_rented, trg_return_equipment
+-- and sp_close_out_rentals.
+-- An update moves the item from its old counter to its new one.
+-- Rows loaded before these triggers exist are backfilled by the CALL below.
+-- ============================================================================
+CALL sp_rebuild_equipment_inventory();
+
+DROP TRIGGER IF EXISTS trg_equipment_inventory_insert;
+DROP TRIGGER IF EXISTS trg_equipment_inventory_update;
+DROP TRIGGER IF EXISTS trg_equipment_inventory_delete;
+
+DELIMITER $$
+
+CREATE TRIGGER trg_equipment_inventory_insert
+AFTER INSERT ON Equipment
+FOR EACH ROW
+BEGIN
+    CALL sp_apply_equipment_inventory(NEW.EquipmentType, NEW.Size, NEW.Status, 1);
+END$$
+
+CREATE TRIGGER trg_equipment_inventory_update
+AFTER UPDATE ON Equipment
+FOR EACH ROW
+BEGIN
+    -- Skip updates that do not touch the counter key
+    IF NOT (OLD.EquipmentType <=> NEW.EquipmentType
+            AND OLD.Size <=> NEW.Size
+            AND OLD.Status <=> NEW.Status) THEN
+        CALL sp_apply_equipment_inventory(OLD.EquipmentType, OLD.Size, OLD.Status, -1);
+        CALL sp_apply_equipment_inventory(NEW.EquipmentType, NEW.Size, NEW.Status, 1);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_equipment_inventory_delete
+AFTER DELETE ON Equipment
+FOR EACH ROW
+BEGIN
+    CALL sp_apply_equipment_inventory(OLD.EquipmentType, OLD.Size, OLD.Status, -1);
+END$$
+
+DELIMITER ;
+
+-- ============================================================================
+-- TRIGGER 7: Enforce References of the Partitioned Tables
+-- Purpose: Lift_Tickets and Rentals are partitioned by season, and MySQL
+-- allows no foreign keys on or to a partitioned table. These triggers keep
+-- the rules the FOREIGN KEY clauses enforced before:
+--   Lift_Tickets -> Customers, Pass_Types   RESTRICT on delete, CASCADE on update
+--   Rentals      -> Customers               RESTRICT on delete, CASCADE on update
+--   Rental_Items -> Rentals                 CASCADE on delete and update
+-- Violations raise the same error numbers as a foreign key (1451/1452).
+-- Each check is one primary key or index probe, as the foreign key was.
+-- sp_roll_over_season drops whole partitions, which fires no triggers, and
+-- moves the matching Rental_Items rows itself.
+-- ============================================================================
+DROP TRIGGER IF EXISTS trg_lift_ticket_references_insert;
+DROP TRIGGER IF EXISTS trg_lift_ticket_references_update;
+DROP TRIGGER IF EXISTS trg_rental_references_insert;
+DROP TRIGGER IF EXISTS trg_rental_references_update;
+DROP TRIGGER IF EXISTS trg_rental_references_cascade_update;
+DROP TRIGGER IF EXISTS trg_rental_references_cascade_delete;
+DROP TRIGGER IF EXISTS trg_rental_items_references_insert;
+DROP TRIGGER IF EXISTS trg_rental_items_references_update;
+DROP TRIGGER IF EXISTS trg_customer_references_update;
+DROP TRIGGER IF EXISTS trg_customer_references_delete;
+DROP TRIGGER IF EXISTS trg_pass_type_references_update;
+DROP TRIGGER IF EXISTS trg_pass_type_references_delete;
+
+DELIMITER $$
+
+-- Child rows: the referenced parent must exist
+CREATE TRIGGER trg_lift_ticket_references_insert
+BEFORE INSERT ON Lift_Tickets
+FOR EACH ROW
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM Customers WHERE CustomerID = NEW.CustomerID) THEN
+        SIGNAL SQLSTATE '23000'
+        SET MESSAGE_TEXT = 'Error: Lift_Tickets.CustomerID does not exist in Customers.',
+            MYSQL_ERRNO = 1452;
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM Pass_Types WHERE PassTypeID = NEW.PassTypeID) THEN
+        SIGNAL SQLSTATE '23000'
+        SET MESSAGE_TEXT = 'Error: Lift_Tickets.PassTypeID does not exist in Pass_Types.',
+            MYSQL_ERRNO = 1452;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_lift_ticket_references_update
+BEFORE UPDATE ON Lift_Tickets
+FOR EACH ROW
+BEGIN
+    IF NEW.CustomerID <> OLD.CustomerID
+       AND NOT EXISTS (SELECT 1 FROM Customers WHERE CustomerID = NEW.CustomerID) THEN
+        SIGNAL SQLSTATE '23000'
+        SET MESSAGE_TEXT = 'Error: Lift_Tickets.CustomerID does not exist in Customers.',
+            MYSQL_ERRNO = 1452;
+    END IF;
+    IF NEW.PassTypeID <> OLD.PassTypeID
+       AND NOT EXISTS (SELECT 1 FROM Pass_Types WHERE PassTypeID = NEW.PassTypeID) THEN
+        SIGNAL SQLSTATE '23000'
+        SET MESSAGE_TEXT = 'Error: Lift_Tickets.PassTypeID does not exist in Pass_Types.',
+            MYSQL_ERRNO = 1452;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_rental_references_insert
+BEFORE INSERT ON Rentals
+FOR EACH ROW
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM Customers WHERE CustomerID = NEW.CustomerID) THEN
+        SIGNAL SQLSTATE '23000'
+        SET MESSAGE_TEXT = 'Error: Rentals.CustomerID does not exist in Customers.',
+            MYSQL_ERRNO = 1452;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_rental_references_update
+BEFORE UPDATE ON Rentals
+FOR EACH ROW
+BEGIN
+    IF NEW.CustomerID <> OLD.CustomerID
+       AND NOT EXISTS (SELECT 1 FROM Customers WHERE CustomerID = NEW.CustomerID) THEN
+        SIGNAL SQLSTATE '23000'
+        SET MESSAGE_TEXT = 'Error: Rentals.CustomerID does not exist in Customers.',
+            MYSQL_ERRNO = 1452;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_rental_items_references_insert
+BEFORE INSERT ON Rental_Items
+FOR EACH ROW
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM Rentals WHERE RentalID = NEW.RentalID) THEN
+        SIGNAL SQLSTATE '23000'
+        SET MESSAGE_TEXT = 'Error: Rental_Items.RentalID does not exist in Rentals.',
+            MYSQL_ERRNO = 1452;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_rental_items_references_update
+BEFORE UPDATE ON Rental_Items
+FOR EACH ROW
+BEGIN
+    IF NEW.RentalID <> OLD.RentalID
+       AND NOT EXISTS (SELECT 1 FROM Rentals WHERE RentalID = NEW.RentalID) THEN
+        SIGNAL SQLSTATE '23000'
+        SET MESSAGE_TEXT = 'Error: Rental_Items.RentalID does not exist in Rentals.',
+            MYSQL_ERRNO = 1452;
+    END IF;
+END$$
+
+-- Parent rows: Rental_Items follow their rental
+CREATE TRIGGER trg_rental_references_cascade_update
+AFTER UPDATE ON Rentals
+FOR EACH ROW
+BEGIN
+    IF NEW.RentalID <> OLD.RentalID THEN
+        UPDATE Rental_Items SET RentalID = NEW.RentalID WHERE RentalID = OLD.RentalID;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_rental_references_cascade_delete
+AFTER DELETE ON Rentals
+FOR EACH ROW
+BEGIN
+    DELETE FROM Rental_Items WHERE RentalID = OLD.RentalID;
+END$$
+
+-- Parent rows: customers and pass types in use cannot be deleted, and a
+-- changed key is carried over to their tickets and rentals
+CREATE TRIGGER trg_customer_references_update
+AFTER UPDATE ON Customers
+FOR EACH ROW
+BEGIN
+    IF NEW.CustomerID <> OLD.CustomerID THEN
+        UPDATE Lift_Tickets SET CustomerID = NEW.CustomerID WHERE CustomerID = OLD.CustomerID;
+        UPDATE Rentals SET CustomerID = NEW.CustomerID WHERE CustomerID = OLD.CustomerID;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_customer_references_delete
+BEFORE DELETE ON Customers
+FOR EACH ROW
+BEGIN
+    IF EXISTS (SELECT 1 FROM Lift_Tickets WHERE CustomerID = OLD.CustomerID)
+       OR EXISTS (SELECT 1 FROM Rentals WHERE CustomerID = OLD.CustomerID) THEN
+        SIGNAL SQLSTATE '23000'
+        SET MESSAGE_TEXT = 'Error: Cannot delete a customer with lift tickets or rentals.',
+            MYSQL_ERRNO = 1451;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_pass_type_references_update
+AFTER UPDATE ON Pass_Types
+FOR EACH ROW
+BEGIN
+    IF NEW.PassTypeID <> OLD.PassTypeID THEN
+        UPDATE Lift_Tickets SET PassTypeID = NEW.PassTypeID WHERE PassTypeID = OLD.PassTypeID;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_pass_type_references_delete
+BEFORE DELETE ON Pass_Types
+FOR EACH ROW
+BEGIN
+    IF EXISTS (SELECT 1 FROM Lift_Tickets WHERE PassTypeID = OLD.PassTypeID) THEN
+        SIGNAL SQLSTATE '23000'
+        SET MESSAGE_TEXT = 'Error: Cannot delete a pass type with lift tickets.',
+            MYSQL_ERRNO = 1451;
+    END IF;
+END$$
+
+DELIMITER ;
@@ -42,11 +42,13 @@ ON Pass_Types(CurrentPrice);
 
 -- Composite index for customer ticket history
 -- Supports: "Show all tickets for customer X ordered by purchase date"
+-- Also the customer lookup of trg_customer_references_* (no foreign key)
 CREATE INDEX idx_ticket_customer_date
 ON Lift_Tickets(CustomerID, PurchaseDate);
 
 -- Composite index for revenue and usage by pass type and status
--- Supports vw_pass_revenue_summary and operational queries
+-- Supports vw_pass_revenue_summary, operational queries and the pass type
+-- lookup of trg_pass_type_references_*
 CREATE INDEX idx_ticket_pass_status
 ON Lift_Tickets(PassTypeID, TicketStatus, SalePrice);
 
@@ -54,6 +56,11 @@ ON Lift_Tickets(PassTypeID, TicketStatus, SalePrice);
 CREATE INDEX idx_ticket_valid_status
 ON Lift_Tickets(ValidDate, TicketStatus);
 
+-- Change marker: MAX(UpdatedAt) and "changed since" polls of the in-memory
+-- ticket index (scripts/ticket_index.py)
+CREATE INDEX idx_ticket_updated
+ON Lift_Tickets(UpdatedAt);
+
 -- ----------------------------------------------------------------------------
 -- INSTRUCTORS TABLE INDEXES
 -- ----------------------------------------------------------------------------
@@ -117,6 +124,7 @@ ON Equipment(Status, EquipmentType);
 
 -- Composite index for customer rental history
 -- Supports: "Show all rentals for customer X ordered by date"
+-- Also the customer lookup of trg_customer_references_* (no foreign key)
 CREATE INDEX idx_rental_customer_date
 ON Rentals(CustomerID, RentalDate);
 
@@ -142,6 +150,47 @@ ON Rental_Items(RentalID, EquipmentID);
 CREATE INDEX idx_rental_items_equipment
 ON Rental_Items(EquipmentID, RentalID, UnitPrice);
 
+-- ----------------------------------------------------------------------------
+-- SEASON ARCHIVE TABLE INDEXES
+-- ----------------------------------------------------------------------------
+
+-- Customer history across archived seasons
+CREATE INDEX idx_ticket_archive_customer
+ON Lift_Tickets_Archive(CustomerID, PurchaseDate);
+
+CREATE INDEX idx_rental_archive_customer
+ON Rentals_Archive(CustomerID, RentalDate);
+
+-- Archived rental → items lookup
+CREATE INDEX idx_rental_items_archive_rental
+ON Rental_Items_Archive(RentalID, EquipmentID);
+
+-- ----------------------------------------------------------------------------
+-- LIFT_SCANS TABLE INDEXES
+-- ----------------------------------------------------------------------------
+
+-- Covering index for the heatmap (Query 13): a range scan over the last
+-- 7 days only, however long the scan history grows
+CREATE INDEX idx_scan_time
+ON Lift_Scans(ScannedAt, LiftID, ScanResult);
+
+-- Scans of one lift over a period; also serves the LiftID foreign key
+CREATE INDEX idx_scan_lift_time
+ON Lift_Scans(LiftID, ScannedAt, ScanResult);
+
+-- Scan history of one ticket (gate disputes, pass sharing checks)
+CREATE INDEX idx_scan_ticket_time
+ON Lift_Scans(TicketID, ScannedAt);
+
+-- ----------------------------------------------------------------------------
+-- RENTAL_RATES TABLE INDEXES
+-- ----------------------------------------------------------------------------
+
+-- Covering index for the rate lookup: type, then the longest tier that applies
+-- Supports fn_calculate_rental_price and sp_process_equipment_rental_batch
+CREATE INDEX idx_rental_rates_lookup
+ON Rental_Rates(EquipmentType, MinDays, SeasonStart, SeasonEnd, DailyRate, DiscountPct);
+
 -- ----------------------------------------------------------------------------
 -- TRAILS TABLE INDEXES
 -- ----------------------------------------------------------------------------
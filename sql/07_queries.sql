@@ -133,77 +133,84 @@ GROUP BY t.TrailID, t.TrailName, t.Difficulty, t.LengthMeters, t.ElevationDropMe
 ORDER BY t.Difficulty, accessible_lifts DESC;
 
 -- ============================================================================
--- QUERY 5: Customer Lifetime Value Analysis (Correlated Subquery)
+-- QUERY 5: Customer Lifetime Value Analysis (CTE + Single-Pass Aggregation)
 -- Purpose: Segment customers by value for marketing campaigns
--- Complexity: Correlated subqueries, aggregation, CASE expressions
+-- Complexity: CTEs, conditional aggregation, CASE expressions
+-- Note: One grouped pass per fact table instead of per-customer correlated
+--       subqueries; sp_customer_lifetime_value is the parameterised form
 -- ============================================================================
+WITH ticket_totals AS (
+    SELECT
+        CustomerID,
+        COUNT(CASE WHEN TicketStatus IN ('Active', 'Used') THEN 1 END) AS total_tickets,
+        COALESCE(SUM(CASE WHEN TicketStatus IN ('Active', 'Used') THEN SalePrice END), 0) AS ticket_revenue,
+        MAX(PurchaseDate) AS last_ticket_date
+    FROM Lift_Tickets
+    GROUP BY CustomerID
+),
+rental_totals AS (
+    SELECT
+        CustomerID,
+        COUNT(CASE WHEN RentalStatus IN ('Active', 'Returned') THEN 1 END) AS total_rentals,
+        COALESCE(SUM(CASE WHEN RentalStatus IN ('Active', 'Returned') THEN TotalPrice END), 0) AS rental_revenue,
+        MAX(RentalDate) AS last_rental_date
+    FROM Rentals
+    GROUP BY CustomerID
+),
+lesson_totals AS (
+    SELECT
+        CustomerID,
+        COUNT(*) AS total_lessons,
+        COALESCE(SUM(PaymentAmount), 0) AS lesson_revenue,
+        MAX(EnrollmentDate) AS last_lesson_date
+    FROM Enrollments
+    GROUP BY CustomerID
+),
+customer_value AS (
+    SELECT 
+        c.CustomerID,
+        CONCAT(c.FirstName, ' ', c.LastName) AS customer_name,
+        c.Email,
+        c.City,
+        c.StateProvince,
+        COALESCE(t.total_tickets, 0) AS total_tickets,
+        COALESCE(t.ticket_revenue, 0) AS ticket_revenue,
+        COALESCE(r.total_rentals, 0) AS total_rentals,
+        COALESCE(r.rental_revenue, 0) AS rental_revenue,
+        COALESCE(l.total_lessons, 0) AS total_lessons,
+        COALESCE(l.lesson_revenue, 0) AS lesson_revenue,
+        COALESCE(t.ticket_revenue, 0)
+            + COALESCE(r.rental_revenue, 0)
+            + COALESCE(l.lesson_revenue, 0) AS lifetime_value,
+        GREATEST(t.last_ticket_date, r.last_rental_date, l.last_lesson_date) AS last_activity_date
+    FROM Customers c
+    LEFT JOIN ticket_totals t ON t.CustomerID = c.CustomerID
+    LEFT JOIN rental_totals r ON r.CustomerID = c.CustomerID
+    LEFT JOIN lesson_totals l ON l.CustomerID = c.CustomerID
+)
 SELECT 
-    c.CustomerID,
-    CONCAT(c.FirstName, ' ', c.LastName) AS customer_name,
-    c.Email,
-    c.City,
-    c.StateProvince,
-    -- Total ticket purchases
-    (SELECT COUNT(*) 
-     FROM Lift_Tickets lt 
-     WHERE lt.CustomerID = c.CustomerID 
-       AND lt.TicketStatus IN ('Active', 'Used')) AS total_tickets,
-    -- Total ticket revenue
-    (SELECT COALESCE(SUM(lt.SalePrice), 0)
-     FROM Lift_Tickets lt 
-     WHERE lt.CustomerID = c.CustomerID 
-       AND lt.TicketStatus IN ('Active', 'Used')) AS ticket_revenue,
-    -- Total rental count
-    (SELECT COUNT(*) 
-     FROM Rentals r 
-     WHERE r.CustomerID = c.CustomerID 
-       AND r.RentalStatus IN ('Active', 'Returned')) AS total_rentals,
-    -- Total rental revenue
-    (SELECT COALESCE(SUM(r.TotalPrice), 0)
-     FROM Rentals r 
-     WHERE r.CustomerID = c.CustomerID 
-       AND r.RentalStatus IN ('Active', 'Returned')) AS rental_revenue,
-    -- Total lesson enrollments
-    (SELECT COUNT(*) 
-     FROM Enrollments e 
-     WHERE e.CustomerID = c.CustomerID) AS total_lessons,
-    -- Total lesson payments
-    (SELECT COALESCE(SUM(e.PaymentAmount), 0)
-     FROM Enrollments e 
-     WHERE e.CustomerID = c.CustomerID) AS lesson_revenue,
-    -- Calculate lifetime value
-    (SELECT COALESCE(SUM(lt.SalePrice), 0)
-     FROM Lift_Tickets lt 
-     WHERE lt.CustomerID = c.CustomerID 
-       AND lt.TicketStatus IN ('Active', 'Used')) +
-    (SELECT COALESCE(SUM(r.TotalPrice), 0)
-     FROM Rentals r 
-     WHERE r.CustomerID = c.CustomerID 
-       AND r.RentalStatus IN ('Active', 'Returned')) +
-    (SELECT COALESCE(SUM(e.PaymentAmount), 0)
-     FROM Enrollments e 
-     WHERE e.CustomerID = c.CustomerID) AS lifetime_value,
-    -- Last activity date
-    GREATEST(
-        (SELECT MAX(lt.PurchaseDate) FROM Lift_Tickets lt WHERE lt.CustomerID = c.CustomerID),
-        (SELECT MAX(r.RentalDate) FROM Rentals r WHERE r.CustomerID = c.CustomerID),
-        (SELECT MAX(e.EnrollmentDate) FROM Enrollments e WHERE e.CustomerID = c.CustomerID)
-    ) AS last_activity_date,
+    CustomerID,
+    customer_name,
+    Email,
+    City,
+    StateProvince,
+    total_tickets,
+    ticket_revenue,
+    total_rentals,
+    rental_revenue,
+    total_lessons,
+    lesson_revenue,
+    lifetime_value,
+    last_activity_date,
     -- Customer segment
     CASE 
-        WHEN (SELECT COALESCE(SUM(lt.SalePrice), 0) FROM Lift_Tickets lt WHERE lt.CustomerID = c.CustomerID AND lt.TicketStatus IN ('Active', 'Used')) +
-             (SELECT COALESCE(SUM(r.TotalPrice), 0) FROM Rentals r WHERE r.CustomerID = c.CustomerID AND r.RentalStatus IN ('Active', 'Returned')) +
-             (SELECT COALESCE(SUM(e.PaymentAmount), 0) FROM Enrollments e WHERE e.CustomerID = c.CustomerID) >= 1000 THEN 'VIP'
-        WHEN (SELECT COALESCE(SUM(lt.SalePrice), 0) FROM Lift_Tickets lt WHERE lt.CustomerID = c.CustomerID AND lt.TicketStatus IN ('Active', 'Used')) +
-             (SELECT COALESCE(SUM(r.TotalPrice), 0) FROM Rentals r WHERE r.CustomerID = c.CustomerID AND r.RentalStatus IN ('Active', 'Returned')) +
-             (SELECT COALESCE(SUM(e.PaymentAmount), 0) FROM Enrollments e WHERE e.CustomerID = c.CustomerID) >= 500 THEN 'High Value'
-        WHEN (SELECT COALESCE(SUM(lt.SalePrice), 0) FROM Lift_Tickets lt WHERE lt.CustomerID = c.CustomerID AND lt.TicketStatus IN ('Active', 'Used')) +
-             (SELECT COALESCE(SUM(r.TotalPrice), 0) FROM Rentals r WHERE r.CustomerID = c.CustomerID AND r.RentalStatus IN ('Active', 'Returned')) +
-             (SELECT COALESCE(SUM(e.PaymentAmount), 0) FROM Enrollments e WHERE e.CustomerID = c.CustomerID) >= 200 THEN 'Medium Value'
+        WHEN lifetime_value >= 1000 THEN 'VIP'
+        WHEN lifetime_value >= 500 THEN 'High Value'
+        WHEN lifetime_value >= 200 THEN 'Medium Value'
         ELSE 'Low Value'
     END AS customer_segment
-FROM Customers c
-HAVING lifetime_value > 0
+FROM customer_value
+WHERE lifetime_value > 0
 ORDER BY lifetime_value DESC
 LIMIT 50;
 
@@ -366,60 +373,57 @@ ORDER BY accessible_trails DESC, l.LiftName;
 -- ============================================================================
 -- QUERY 9: Daily Operations Dashboard (Report Query with KPIs)
 -- Purpose: Executive summary of resort operations
--- Complexity: Multiple aggregations, CTEs, KPIs, window functions
+-- Complexity: Multiple aggregations, CTEs, KPIs, summary table
+-- Performance: Today's sales come from the Daily_Revenue summary (three
+--              primary-key rows, kept current by triggers) instead of
+--              scanning Lift_Tickets, Rentals and Enrollments; equipment
+--              counts come from the Equipment_Inventory counters; trail
+--              and lift counts take one pass per table
 -- ============================================================================
-WITH daily_metrics AS (
+WITH revenue_today AS (
     SELECT 
-        CURDATE() AS report_date,
         -- Ticket metrics
-        (SELECT COUNT(*) 
-         FROM Lift_Tickets lt 
-         WHERE DATE(lt.PurchaseDate) = CURDATE() 
-           AND lt.TicketStatus = 'Active') AS tickets_sold_today,
-        (SELECT COALESCE(SUM(lt.SalePrice), 0)
-         FROM Lift_Tickets lt 
-         WHERE DATE(lt.PurchaseDate) = CURDATE() 
-           AND lt.TicketStatus = 'Active') AS ticket_revenue_today,
+        COALESCE(SUM(CASE WHEN RevenueSource = 'Tickets' THEN ActiveCount END), 0) AS tickets_sold_today,
+        COALESCE(SUM(CASE WHEN RevenueSource = 'Tickets' THEN ActiveRevenue END), 0) AS ticket_revenue_today,
         -- Rental metrics
-        (SELECT COUNT(*) 
-         FROM Rentals r 
-         WHERE DATE(r.RentalDate) = CURDATE() 
-           AND r.RentalStatus = 'Active') AS rentals_today,
-        (SELECT COALESCE(SUM(r.TotalPrice), 0)
-         FROM Rentals r 
-         WHERE DATE(r.RentalDate) = CURDATE() 
-           AND r.RentalStatus = 'Active') AS rental_revenue_today,
+        COALESCE(SUM(CASE WHEN RevenueSource = 'Rentals' THEN ActiveCount END), 0) AS rentals_today,
+        COALESCE(SUM(CASE WHEN RevenueSource = 'Rentals' THEN ActiveRevenue END), 0) AS rental_revenue_today,
         -- Lesson metrics
-        (SELECT COUNT(*) 
-         FROM Enrollments e 
-         WHERE DATE(e.EnrollmentDate) = CURDATE()) AS lessons_enrolled_today,
-        (SELECT COALESCE(SUM(e.PaymentAmount), 0)
-         FROM Enrollments e 
-         WHERE DATE(e.EnrollmentDate) = CURDATE()) AS lesson_revenue_today,
-        -- Equipment availability
-        (SELECT COUNT(*) 
-         FROM Equipment e 
-         WHERE e.Status = 'Available') AS equipment_available,
-        (SELECT COUNT(*) 
-         FROM Equipment e 
-         WHERE e.Status = 'Rented') AS equipment_rented,
-        (SELECT COUNT(*) 
-         FROM Equipment e 
-         WHERE e.Status = 'Maintenance') AS equipment_maintenance,
-        -- Trail status
-        (SELECT COUNT(*) 
-         FROM Trails t 
-         WHERE t.IsOpen = TRUE) AS trails_open,
-        (SELECT COUNT(*) 
-         FROM Trails t 
-         WHERE t.IsOpen = FALSE) AS trails_closed,
-        -- Lift status
-        (SELECT COUNT(*) 
-         FROM Lifts l 
-         WHERE l.IsOpen = TRUE) AS lifts_open,
-        (SELECT COUNT(*) 
-         FROM Lifts l 
-         WHERE l.IsOpen = FALSE) AS lifts_closed
+        COALESCE(SUM(CASE WHEN RevenueSource = 'Lessons' THEN ActiveCount END), 0) AS lessons_enrolled_today,
+        COALESCE(SUM(CASE WHEN RevenueSource = 'Lessons' THEN ActiveRevenue END), 0) AS lesson_revenue_today
+    FROM Daily_Revenue
+    WHERE RevenueDate = CURDATE()
+),
+equipment_status AS (
+    SELECT 
+        COALESCE(SUM(CASE WHEN Status = 'Available' THEN ItemCount END), 0) AS equipment_available,
+        COALESCE(SUM(CASE WHEN Status = 'Rented' THEN ItemCount END), 0) AS equipment_rented,
+        COALESCE(SUM(CASE WHEN Status = 'Maintenance' THEN ItemCount END), 0) AS equipment_maintenance
+    FROM Equipment_Inventory
+),
+trail_status AS (
+    SELECT 
+        COUNT(CASE WHEN IsOpen = TRUE THEN 1 END) AS trails_open,
+        COUNT(CASE WHEN IsOpen = FALSE THEN 1 END) AS trails_closed
+    FROM Trails
+),
+lift_status AS (
+    SELECT 
+        COUNT(CASE WHEN IsOpen = TRUE THEN 1 END) AS lifts_open,
+        COUNT(CASE WHEN IsOpen = FALSE THEN 1 END) AS lifts_closed
+    FROM Lifts
+),
+daily_metrics AS (
+    SELECT 
+        CURDATE() AS report_date,
+        rt.*,
+        es.*,
+        ts.*,
+        ls.*
+    FROM revenue_today rt
+    CROSS JOIN equipment_status es
+    CROSS JOIN trail_status ts
+    CROSS JOIN lift_status ls
 )
 SELECT 
     report_date,
@@ -530,83 +534,90 @@ ORDER BY total_revenue DESC
 LIMIT 100;
 
 -- ============================================================================
--- QUERY 11: Equipment Availability Status (IN Subquery)
+-- QUERY 11: Equipment Availability Status (Counter Table + Single Pass)
 -- Purpose: Real-time equipment inventory status
--- Complexity: IN subquery, aggregation, CASE expressions
+-- Complexity: CTEs, window function, aggregation, CASE expressions
+-- Performance: Status counts come from the Equipment_Inventory counters
+--              (kept current by triggers). Maintenance, age and brand stats
+--              take one grouped pass over Equipment instead of an IN
+--              subquery per row and a correlated brand subquery per type.
+--              currently_rented is the 'Rented' count, which the rental and
+--              return triggers keep in step with open rentals.
 -- ============================================================================
+WITH stock AS (
+    SELECT 
+        EquipmentType,
+        SUM(ItemCount) AS total_items,
+        SUM(CASE WHEN Status = 'Available' THEN ItemCount ELSE 0 END) AS available_count,
+        SUM(CASE WHEN Status = 'Rented' THEN ItemCount ELSE 0 END) AS rented_count,
+        SUM(CASE WHEN Status = 'Maintenance' THEN ItemCount ELSE 0 END) AS maintenance_count,
+        SUM(CASE WHEN Status = 'Retired' THEN ItemCount ELSE 0 END) AS retired_count
+    FROM Equipment_Inventory
+    WHERE Status != 'Retired'
+    GROUP BY EquipmentType
+    HAVING SUM(ItemCount) > 0
+),
+brand_stats AS (
+    SELECT 
+        EquipmentType,
+        Brand,
+        -- Most popular brand counts every item, retired ones included
+        ROW_NUMBER() OVER (PARTITION BY EquipmentType ORDER BY COUNT(*) DESC) AS brand_rank,
+        -- Check for items needing maintenance
+        COUNT(CASE 
+            WHEN Status != 'Retired'
+                 AND NextMaintenanceDate IS NOT NULL 
+                 AND NextMaintenanceDate <= DATE_ADD(CURDATE(), INTERVAL 7 DAY)
+            THEN 1 
+        END) AS maintenance_due_soon,
+        SUM(CASE WHEN Status != 'Retired' THEN DATEDIFF(CURDATE(), PurchaseDate) END) AS age_days_sum,
+        COUNT(CASE WHEN Status != 'Retired' THEN PurchaseDate END) AS age_days_count
+    FROM Equipment
+    GROUP BY EquipmentType, Brand
+),
+fleet_stats AS (
+    SELECT 
+        EquipmentType,
+        SUM(maintenance_due_soon) AS maintenance_due_soon,
+        -- Average age of equipment
+        SUM(age_days_sum) / SUM(age_days_count) AS avg_age_days,
+        MAX(CASE WHEN brand_rank = 1 THEN Brand END) AS most_popular_brand
+    FROM brand_stats
+    GROUP BY EquipmentType
+)
 SELECT 
-    e.EquipmentType,
-    COUNT(*) AS total_items,
-    COUNT(CASE WHEN e.Status = 'Available' THEN 1 END) AS available_count,
-    COUNT(CASE WHEN e.Status = 'Rented' THEN 1 END) AS rented_count,
-    COUNT(CASE WHEN e.Status = 'Maintenance' THEN 1 END) AS maintenance_count,
-    COUNT(CASE WHEN e.Status = 'Retired' THEN 1 END) AS retired_count,
-    ROUND(COUNT(CASE WHEN e.Status = 'Available' THEN 1 END) * 100.0 / COUNT(*), 2) AS availability_rate,
-    -- Check for items needing maintenance
-    COUNT(CASE 
-        WHEN e.NextMaintenanceDate IS NOT NULL 
-             AND e.NextMaintenanceDate <= DATE_ADD(CURDATE(), INTERVAL 7 DAY)
-        THEN 1 
-    END) AS maintenance_due_soon,
+    s.EquipmentType,
+    s.total_items,
+    s.available_count,
+    s.rented_count,
+    s.maintenance_count,
+    s.retired_count,
+    ROUND(s.available_count * 100.0 / s.total_items, 2) AS availability_rate,
+    f.maintenance_due_soon,
     -- Items currently in active rentals
-    COUNT(CASE 
-        WHEN e.EquipmentID IN (
-            SELECT ri.EquipmentID 
-            FROM Rental_Items ri
-            JOIN Rentals r ON ri.RentalID = r.RentalID
-            WHERE r.RentalStatus = 'Active'
-        )
-        THEN 1
-    END) AS currently_rented,
-    -- Average age of equipment
-    AVG(DATEDIFF(CURDATE(), e.PurchaseDate)) AS avg_age_days,
-    -- Most popular brand
-    (SELECT e2.Brand 
-     FROM Equipment e2 
-     WHERE e2.EquipmentType = e.EquipmentType
-     GROUP BY e2.Brand 
-     ORDER BY COUNT(*) DESC 
-     LIMIT 1) AS most_popular_brand
-FROM Equipment e
-WHERE e.Status != 'Retired'
-GROUP BY e.EquipmentType
+    s.rented_count AS currently_rented,
+    f.avg_age_days,
+    f.most_popular_brand
+FROM stock s
+JOIN fleet_stats f ON f.EquipmentType = s.EquipmentType
 ORDER BY availability_rate DESC, total_items DESC;
 
 -- ============================================================================
 -- QUERY 12: Revenue Trends Over Time (Window Function, Cumulative)
 -- Purpose: Analyze revenue trends and growth patterns
 -- Complexity: Window functions, cumulative calculations, date grouping
+-- Performance: Reads up to 90 days x 3 sources of pre-grouped rows from the
+--              Daily_Revenue summary (primary key range scan) instead of
+--              re-grouping the fact tables on every refresh
 -- ============================================================================
-WITH daily_revenue AS (
-    SELECT 
-        DATE(lt.PurchaseDate) AS revenue_date,
-        'Tickets' AS revenue_source,
-        SUM(lt.SalePrice) AS daily_revenue
-    FROM Lift_Tickets lt
-    WHERE lt.TicketStatus IN ('Active', 'Used')
-      AND lt.PurchaseDate >= DATE_SUB(CURDATE(), INTERVAL 90 DAY)
-    GROUP BY DATE(lt.PurchaseDate)
-    
-    UNION ALL
-    
-    SELECT 
-        DATE(r.RentalDate) AS revenue_date,
-        'Rentals' AS revenue_source,
-        SUM(r.TotalPrice) AS daily_revenue
-    FROM Rentals r
-    WHERE r.RentalStatus IN ('Active', 'Returned')
-      AND r.RentalDate >= DATE_SUB(CURDATE(), INTERVAL 90 DAY)
-    GROUP BY DATE(r.RentalDate)
-    
-    UNION ALL
-    
+WITH revenue_by_day AS (
     SELECT 
-        DATE(e.EnrollmentDate) AS revenue_date,
-        'Lessons' AS revenue_source,
-        SUM(e.PaymentAmount) AS daily_revenue
-    FROM Enrollments e
-    WHERE e.EnrollmentDate >= DATE_SUB(CURDATE(), INTERVAL 90 DAY)
-    GROUP BY DATE(e.EnrollmentDate)
+        dr.RevenueDate AS revenue_date,
+        CAST(dr.RevenueSource AS CHAR) AS revenue_source,
+        dr.BookedRevenue AS daily_revenue
+    FROM Daily_Revenue dr
+    WHERE dr.RevenueDate >= DATE_SUB(CURDATE(), INTERVAL 90 DAY)
+      AND dr.BookedCount > 0
 )
 SELECT 
     revenue_date,
@@ -619,20 +630,68 @@ SELECT
     ROUND((daily_revenue - LAG(daily_revenue) OVER (PARTITION BY revenue_source ORDER BY revenue_date)) * 100.0 / 
           NULLIF(LAG(daily_revenue) OVER (PARTITION BY revenue_source ORDER BY revenue_date), 0), 2) AS day_over_day_pct_change,
     RANK() OVER (PARTITION BY revenue_source ORDER BY daily_revenue DESC) AS revenue_rank
-FROM daily_revenue
+FROM revenue_by_day
 ORDER BY revenue_date DESC, revenue_source;
 
+-- ============================================================================
+-- QUERY 13: Lift Scan Heatmap by Hour (CTE + Window Function)
+-- Purpose: Real lift usage from gate scans: accepted and rejected scans per
+--          lift and hour of day over the last 7 days, with the trails each
+--          lift serves
+-- Complexity: CTEs, conditional aggregation, window function, date grouping
+-- Performance: Range scan of the 7-day window on the covering
+--              (ScannedAt, LiftID, ScanResult) index; older scans and the
+--              Lift_Scans rows are never touched (the GROUP BY rules out a
+--              skip scan on the LiftID-first index)
+-- ============================================================================
+WITH hourly_scans AS (
+    SELECT 
+        LiftID,
+        HOUR(ScannedAt) AS scan_hour,
+        COUNT(CASE WHEN ScanResult = 'Accepted' THEN 1 END) AS accepted_scans,
+        COUNT(CASE WHEN ScanResult <> 'Accepted' THEN 1 END) AS rejected_scans
+    FROM Lift_Scans
+    WHERE ScannedAt >= DATE_SUB(CURDATE(), INTERVAL 7 DAY)
+    GROUP BY LiftID, HOUR(ScannedAt)
+),
+lift_trails AS (
+    SELECT 
+        la.LiftID,
+        COUNT(*) AS trails_served,
+        GROUP_CONCAT(t.TrailName ORDER BY t.TrailName SEPARATOR ', ') AS trail_names
+    FROM Lift_Access la
+    JOIN Trails t ON la.TrailID = t.TrailID
+    GROUP BY la.LiftID
+)
+SELECT 
+    l.LiftID,
+    l.LiftName,
+    l.LiftType,
+    hs.scan_hour,
+    hs.accepted_scans,
+    hs.rejected_scans,
+    ROUND(hs.accepted_scans / 7, 1) AS avg_daily_scans,
+    ROUND(hs.rejected_scans * 100.0 / (hs.accepted_scans + hs.rejected_scans), 2) AS reject_rate,
+    -- Busiest lift in each hour of the day
+    RANK() OVER (PARTITION BY hs.scan_hour ORDER BY hs.accepted_scans DESC) AS hour_rank,
+    COALESCE(lt.trails_served, 0) AS trails_served,
+    lt.trail_names
+FROM hourly_scans hs
+JOIN Lifts l ON hs.LiftID = l.LiftID
+LEFT JOIN lift_trails lt ON l.LiftID = lt.LiftID
+ORDER BY l.LiftName, hs.scan_hour;
+
 -- ============================================================================
 -- Query Summary
 -- ============================================================================
--- Total Queries: 12
+-- Total Queries: 13
 -- Requirements Met:
---   ✓ ≥ 10 queries (12 provided)
+--   ✓ ≥ 10 queries (13 provided)
 --   ✓ Multi-table joins (≥3 tables): Queries 1, 3, 4, 8
---   ✓ Window functions: Queries 2, 7, 9, 10, 12
---   ✓ Correlated subqueries: Query 5
+--   ✓ Window functions: Queries 2, 7, 9, 10, 12, 13
+--   ✓ Correlated subqueries: Query 6
 --   ✓ EXISTS subqueries: Query 6
---   ✓ CTEs: Queries 2, 7, 9, 12
+--   ✓ CTEs: Queries 2, 5, 7, 9, 12, 13
 --   ✓ Report query with KPIs: Query 9
 --   ✓ Aggregation & grouping: All queries
 --   ✓ All queries are idempotent (can be run multiple times)
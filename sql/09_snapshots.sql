@@ -0,0 +1,47 @@
+-- ============================================================================
+-- Ski Resort Management System - Reporting Snapshots
+-- COMP 345 Final Project
+-- DBMS: MySQL 8.0+
+-- ============================================================================
+-- MySQL has no materialized views. Each reporting view below is copied into
+-- an mv_* table that analysts can query without re-running the view's joins
+-- and aggregates against the live tables:
+--
+--   vw_pass_revenue_summary          -> mv_pass_revenue_summary
+--   vw_lesson_utilization_summary    -> mv_lesson_utilization_summary
+--   vw_equipment_rental_performance  -> mv_equipment_rental_performance
+--   vw_maintenance_workload_summary  -> mv_maintenance_workload_summary
+--
+-- Refreshes build a new copy and swap it in with RENAME TABLE
+-- (sp_refresh_snapshot in 04_functions.sql). The ev_refresh_snapshots event
+-- refreshes each snapshot once its interval has passed; this requires
+-- event_scheduler = ON (the MySQL 8.0 default).
+--
+-- On demand:   CALL sp_refresh_snapshot('vw_pass_revenue_summary');
+-- Freshness:   SELECT * FROM vw_snapshot_status;
+-- ============================================================================
+
+USE ski_resort;
+
+-- ----------------------------------------------------------------------------
+-- Snapshots and refresh intervals (minutes)
+-- ----------------------------------------------------------------------------
+CALL sp_create_snapshot('vw_pass_revenue_summary', 15);
+CALL sp_create_snapshot('vw_lesson_utilization_summary', 15);
+CALL sp_create_snapshot('vw_equipment_rental_performance', 15);
+CALL sp_create_snapshot('vw_maintenance_workload_summary', 60);
+
+-- ----------------------------------------------------------------------------
+-- Scheduled refresh
+-- ----------------------------------------------------------------------------
+DROP EVENT IF EXISTS ev_refresh_snapshots;
+
+CREATE EVENT ev_refresh_snapshots
+ON SCHEDULE EVERY 1 MINUTE
+ON COMPLETION PRESERVE
+COMMENT 'Refresh mv_* snapshots that are older than their refresh interval'
+DO CALL sp_refresh_due_snapshots();
+
+-- ============================================================================
+-- END OF SNAPSHOTS
+-- ============================================================================